@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -19,10 +19,14 @@
 
 """Tools for aggregating benchmark results."""
 
+import csv
 import json
 import statistics
+from array import array
+from collections import Counter
+from math import ceil
 from pathlib import Path
-from typing import Callable, Dict, List, Tuple, cast
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
 
 from autonomy.analyse.benchmark.html import (
     BLOCK_TEMPLATE,
@@ -34,10 +38,27 @@ from autonomy.analyse.benchmark.html import (
 )
 
 
+NANOSECONDS_PER_SECOND = 10**9
+PERCENTILES = (50, 95, 99)
+SUMMARY_FIELDS = (
+    "behaviour",
+    "block",
+    "count",
+    "mean",
+    "stdev",
+    "min",
+    *(f"p{percentile}" for percentile in PERCENTILES),
+    "max",
+    "executions",
+    *(f"execution_p{percentile}" for percentile in PERCENTILES),
+    "accumulated",
+)
 STATISTICS = {
-    "Mean": statistics.mean,
-    "Maximum": max,
-    "Minimum": min,
+    "Mean": "mean",
+    "Standard deviation": "stdev",
+    "Maximum": "max",
+    "Minimum": "min",
+    **{f"{percentile}th percentile": f"p{percentile}" for percentile in PERCENTILES},
 }
 
 
@@ -52,149 +73,338 @@ class BlockTypes:  # pylint: disable=too-few-public-methods
     types = (LOCAL, CONSENSUS, TOTAL)
 
 
-def read_benchmark_data(
+class OutputFormats:  # pylint: disable=too-few-public-methods
+    """Output formats."""
+
+    HTML = "html"
+    CSV = "csv"
+    JSON = "json"
+
+    formats = (HTML, CSV, JSON)
+
+
+def percentile(ordered: Sequence[float], percentile_: float) -> float:
+    """Get a percentile of sorted values using the nearest-rank method."""
+    rank = max(1, ceil(percentile_ / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def bucket_percentile(buckets: Dict[int, int], percentile_: float) -> int:
+    """Get a percentile of histogram buckets, as the lowest value of the matching bucket."""
+    rank = max(1, ceil(percentile_ / 100 * sum(buckets.values())))
+    seen = 0
+    for lowest in sorted(buckets):
+        seen += buckets[lowest]
+        if seen >= rank:
+            return lowest
+    return max(buckets)
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Summarize a sequence of values."""
+    ordered = sorted(values)
+    summary: Dict[str, float] = {
+        "count": len(ordered),
+        "mean": statistics.fmean(ordered),
+        "stdev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "min": ordered[0],
+    }
+    for percentile_ in PERCENTILES:
+        summary[f"p{percentile_}"] = percentile(ordered, percentile_)
+    summary["max"] = ordered[-1]
+    return summary
+
+
+class Labels:
+    """Interned string labels of a categorical column."""
+
+    def __init__(self) -> None:
+        """Initialize object."""
+        self.values: List[str] = []
+        self._indexes: Dict[str, int] = {}
+
+    def intern(self, value: str) -> int:
+        """Get the index of a label, adding it if it is not known yet."""
+        index = self._indexes.get(value)
+        if index is None:
+            index = self._indexes[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+
+class BenchmarkColumns:  # pylint: disable=too-many-instance-attributes
+    """
+    Columnar store of benchmark measurements.
+
+    Every measurement is a row spread over compact typed arrays, with the
+    agent, behaviour and block names interned in lookup tables. The execution
+    histograms and the accumulated times recorded by the benchmark tool are
+    merged per behaviour and block as they are read.
+    """
+
+    def __init__(self) -> None:
+        """Initialize object."""
+        self.agents = Labels()
+        self.behaviours = Labels()
+        self.blocks = Labels()
+        self.agent = array("L")
+        self.period = array("q")
+        self.behaviour = array("L")
+        self.block = array("L")
+        self.value = array("d")
+        self.executions: Dict[Tuple[int, int], Counter] = {}
+        self.accumulated: Dict[Tuple[int, int], float] = {}
+
+    def __len__(self) -> int:
+        """Get the number of measurements."""
+        return len(self.value)
+
+    def add_period(
+        self,
+        agent: str,
+        period: int,
+        period_data: List[Dict],
+        block_type: str = BlockTypes.ALL,
+    ) -> None:
+        """Add the benchmark data of a period."""
+        agent_index = self.agents.intern(agent)
+        for behaviour_data in period_data:
+            behaviour_index = self.behaviours.intern(behaviour_data["behaviour"])
+            histograms = behaviour_data.get("histograms", {})
+            accumulated = behaviour_data.get("accumulated", {})
+            for block, value in behaviour_data["data"].items():
+                if block_type not in (BlockTypes.ALL, block):
+                    continue
+                block_index = self.blocks.intern(block)
+                self.agent.append(agent_index)
+                self.period.append(period)
+                self.behaviour.append(behaviour_index)
+                self.block.append(block_index)
+                self.value.append(value)
+
+                key = (behaviour_index, block_index)
+                if block in accumulated:
+                    self.accumulated[key] = (
+                        self.accumulated.get(key, 0.0) + accumulated[block]
+                    )
+
+                histogram = histograms.get(block)
+                if histogram is None:
+                    continue
+                buckets = self.executions.setdefault(key, Counter())
+                for lowest, count in histogram["buckets"]:
+                    buckets[lowest] += count
+
+    def group_by(self, *columns: array) -> Dict[Tuple[int, ...], array]:
+        """Group the measured values by the given columns."""
+        groups: Dict[Tuple[int, ...], array] = {}
+        for row, value in enumerate(self.value):
+            key = tuple(column[row] for column in columns)
+            values = groups.get(key)
+            if values is None:
+                values = groups[key] = array("d")
+            values.append(value)
+        return groups
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Summarize the measurements per behaviour and block, across agents and periods."""
+        rows = []
+        groups = self.group_by(self.behaviour, self.block)
+        for (behaviour, block), values in sorted(groups.items()):
+            row: Dict[str, Any] = {
+                "behaviour": self.behaviours.values[behaviour],
+                "block": self.blocks.values[block],
+                **summarize(values),
+            }
+            buckets = self.executions.get((behaviour, block))
+            if buckets:
+                row["executions"] = sum(buckets.values())
+                for percentile_ in PERCENTILES:
+                    row[f"execution_p{percentile_}"] = (
+                        bucket_percentile(buckets, percentile_) / NANOSECONDS_PER_SECOND
+                    )
+            accumulated = self.accumulated.get((behaviour, block))
+            if accumulated is not None:
+                row["accumulated"] = accumulated
+            rows.append(row)
+        return rows
+
+
+def iter_period_files(path: Path, period: int = -1) -> Iterator[Tuple[str, int, Path]]:
+    """Iterate over the benchmark files of each agent, in period order."""
+    for agent_dir in sorted(path.iterdir()):
+        if not agent_dir.is_dir():
+            continue
+        if period != -1:
+            period_file = agent_dir / f"{period}.json"
+            if period_file.exists():
+                yield agent_dir.name, period, period_file
+            continue
+        period_files = sorted(
+            (int(period_file.stem), period_file)
+            for period_file in agent_dir.glob("*.json")
+            # the other json files are not benchmark data of a period
+            if period_file.stem.isdigit()
+        )
+        for _period, period_file in period_files:
+            yield agent_dir.name, _period, period_file
+
+
+def read_benchmark_columns(
     path: Path,
     block_type: str = BlockTypes.ALL,
     period: int = -1,
-) -> Dict[str, Dict[str, List[Dict]]]:
-    """Returns logs."""
-    benchmark_data: Dict[str, Dict[str, List[Dict]]] = {}
-    for agent_dir in path.iterdir():
-        benchmark_data[agent_dir.name] = {}
-        benchmark_data_files = list(agent_dir.glob("*.json"))
-        periods = sorted(
-            tuple(map(lambda x: x.name, benchmark_data_files))
-            if period == -1
-            else (f"{period}.json",)
+) -> BenchmarkColumns:
+    """Read the benchmark data one period file at a time."""
+    columns = BenchmarkColumns()
+    for agent, _period, period_file in iter_period_files(path, period):
+        with period_file.open(encoding="utf-8") as file:
+            columns.add_period(
+                agent=agent,
+                period=_period,
+                period_data=json.load(file),
+                block_type=block_type,
+            )
+    return columns
+
+
+def create_statistics_rows(
+    behaviours: List[int], history: Mapping[int, Sequence[float]]
+) -> List[str]:
+    """Create the statistics rows of a table."""
+    summaries = {
+        behaviour: summarize(history[behaviour])
+        for behaviour in behaviours
+        if behaviour in history
+    }
+    rows = [
+        TROW_TEMPLATE.format(
+            f"""<td style="text-align: center;" colspan="{len(behaviours) + 1}">Statistics</td>"""
         )
-        for _period in periods:
-            period_name, _ = _period.split(".")
-            period_data = json.loads((agent_dir / _period).read_text())
-            if block_type == BlockTypes.ALL:
-                benchmark_data[agent_dir.name][period_name] = period_data
-                continue
+    ]
+    for name, key in STATISTICS.items():
+        cells = [TD_TEMPLATE.format(name)]
+        cells.extend(
+            TD_TEMPLATE.format(
+                summaries[behaviour][key] if behaviour in summaries else ""
+            )
+            for behaviour in behaviours
+        )
+        rows.append(TROW_TEMPLATE.format("".join(cells)))
+    return rows
 
-            benchmark_data[agent_dir.name][period_name] = [
-                {
-                    "behaviour": behaviour["behaviour"],
-                    "data": {block_type: behaviour["data"][block_type]},
-                }
-                for behaviour in period_data
-            ]
-
-    return benchmark_data
-
-
-def add_statistic(
-    name: str,
-    aggregator: Callable,
-    behaviours: List[str],
-    behaviour_history: Dict[str, List[float]],
-) -> str:
-    """Add a stastic column."""
-    rows = TD_TEMPLATE.format(name)
-    for behaviour in behaviours:
-        rows += TD_TEMPLATE.format(aggregator(behaviour_history[behaviour]))
-    return TROW_TEMPLATE.format(rows)
-
-
-def add_statistics(
-    behaviours: List[str],
-    behaviour_history: Dict[str, List[float]],
-) -> str:
-    """Add statistics."""
-    tbody = TROW_TEMPLATE.format(
-        f"""<td style="text-align: center;" colspan="{len(behaviours)}">Statistics</td>"""
-    )
-    for name, aggregator in STATISTICS.items():
-        tbody += add_statistic(
-            name=name,
-            aggregator=cast(Callable, aggregator),
-            behaviour_history=behaviour_history,
-            behaviours=behaviours,
+
+def create_agent_tables(columns: BenchmarkColumns) -> List[str]:
+    """Create a table per block for each agent."""
+    cells: Dict[Tuple[int, int], Dict[int, Dict[int, float]]] = {}
+    for row, value in enumerate(columns.value):
+        table_cells = cells.setdefault((columns.agent[row], columns.block[row]), {})
+        table_cells.setdefault(columns.period[row], {})[columns.behaviour[row]] = value
+
+    behaviours = list(range(len(columns.behaviours.values)))
+    history = columns.group_by(columns.agent, columns.block, columns.behaviour)
+    tables: List[str] = []
+    for agent, agent_name in enumerate(columns.agents.values):
+        tables.append(
+            f"""<div style="width: 100%; text-align: center"> Benchmark data for agent {agent_name}</div>\n"""
         )
-    return tbody
-
-
-def create_table_data(
-    data: Dict[str, List[Dict]],
-    blocks: Tuple[str, ...],
-) -> Tuple[List[str], List[str], Dict[str, Dict]]:
-    """Create table data."""
-    periods: List[str] = []
-    header_columns: List[str] = ["Period"]
-    tables_data: Dict[str, Dict] = {}
-    for block in blocks:
-        if block not in tables_data:
-            tables_data[block] = {}
-        for period, behaviours in data.items():
-            for behaviour in behaviours:
-                if period not in tables_data[block]:
-                    tables_data[block][period] = {}
-                tables_data[block][period][behaviour["behaviour"]] = behaviour["data"][
-                    block
-                ]
-                if behaviour["behaviour"] not in header_columns:
-                    header_columns.append(behaviour["behaviour"])
-            if period not in periods:
-                periods.append(period)
-    return periods, header_columns, tables_data
-
-
-def create_agent_table(
-    agent: str, data: Dict[str, List[Dict]], blocks: Tuple[str, ...]
-) -> str:
-    """Create agent table."""
-    tables = f"""<div style="width: 100%; text-align: center"> Benchmark data for agent {agent}</div>\n"""
-    periods, header_columns, tables_data = create_table_data(
-        data=data,
-        blocks=blocks,
-    )
-    behaviour_history: Dict[str, List[float]] = {
-        behaviour: [] for behaviour in header_columns[1:]
-    }
-    for block, block_data in tables_data.items():
-        thead = "".join(map(TH_TEMPLATE.format, header_columns))
-        tbody = ""
-        for period in sorted(periods):
-            rows = TD_TEMPLATE.format(period)
-            for behaviour_name in header_columns[1:]:
-                behaviour_history[behaviour_name].append(
-                    block_data[period][behaviour_name]
+        for block, block_name in enumerate(columns.blocks.values):
+            block_cells = cells.get((agent, block))
+            if block_cells is None:
+                continue
+            thead = "".join(
+                TH_TEMPLATE.format(name)
+                for name in ("Period", *columns.behaviours.values)
+            )
+            rows = []
+            for period in sorted(block_cells):
+                period_cells = block_cells[period]
+                rows.append(
+                    TROW_TEMPLATE.format(
+                        TD_TEMPLATE.format(period)
+                        + "".join(
+                            TD_TEMPLATE.format(period_cells.get(behaviour, ""))
+                            for behaviour in behaviours
+                        )
+                    )
+                )
+            behaviour_history = {
+                behaviour: values
+                for (_agent, _block, behaviour), values in history.items()
+                if (_agent, _block) == (agent, block)
+            }
+            rows.extend(create_statistics_rows(behaviours, behaviour_history))
+            tables.append(
+                BLOCK_TEMPLATE.format(
+                    table=TABLE_TEMPLATE.format(
+                        colspan=len(behaviours) + 1,
+                        block_type=block_name,
+                        thead=thead,
+                        tbody="".join(rows),
+                    ),
                 )
-                rows += TD_TEMPLATE.format(block_data[period][behaviour_name])
-            tbody += TROW_TEMPLATE.format(rows)
-        tbody += add_statistics(
-            behaviours=header_columns[1:], behaviour_history=behaviour_history
+            )
+    return tables
+
+
+def create_summary_table(summary: List[Dict[str, Any]]) -> str:
+    """Create the table summarizing every behaviour across agents and periods."""
+    thead = "".join(TH_TEMPLATE.format(field) for field in SUMMARY_FIELDS)
+    tbody = "".join(
+        TROW_TEMPLATE.format(
+            "".join(TD_TEMPLATE.format(row.get(field, "")) for field in SUMMARY_FIELDS)
         )
-        tables += BLOCK_TEMPLATE.format(
-            table=TABLE_TEMPLATE.format(
-                colspan=len(header_columns),
-                block_type=block,
-                thead=thead,
-                tbody=tbody,
-            ),
+        for row in summary
+    )
+    return BLOCK_TEMPLATE.format(
+        table=TABLE_TEMPLATE.format(
+            colspan=len(SUMMARY_FIELDS),
+            block_type="summary across agents and periods",
+            thead=thead,
+            tbody=tbody,
         )
-    return tables
+    )
 
 
-def aggregate(path: Path, block_type: str, period: int, output: Path) -> None:
+def write_html(columns: BenchmarkColumns, output: Path) -> None:
+    """Write the benchmark tables as HTML."""
+    tables = [create_summary_table(columns.summary()), *create_agent_tables(columns)]
+    output.write_text(HTML_TEMPLATE.format(tables="".join(tables)), encoding="utf-8")
+
+
+def write_csv(columns: BenchmarkColumns, output: Path) -> None:
+    """Write the benchmark summary as CSV, one row per behaviour and block."""
+    with output.open("w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS, restval="")
+        writer.writeheader()
+        writer.writerows(columns.summary())
+
+
+def write_json(columns: BenchmarkColumns, output: Path) -> None:
+    """Write the benchmark summary as columnar JSON, one list per field."""
+    summary = columns.summary()
+    data = {field: [row.get(field) for row in summary] for field in SUMMARY_FIELDS}
+    output.write_text(json.dumps(data), encoding="utf-8")
+
+
+WRITERS = {
+    OutputFormats.HTML: write_html,
+    OutputFormats.CSV: write_csv,
+    OutputFormats.JSON: write_json,
+}
+
+
+def aggregate(
+    path: Path,
+    block_type: str,
+    period: int,
+    output: Path,
+    output_format: Optional[str] = None,
+) -> None:
     """Benchmark Aggregator."""
-    path = Path(path)
-    benchmark_data = read_benchmark_data(
-        path,
+    columns = read_benchmark_columns(
+        Path(path),
         block_type=block_type,
         period=period,
     )
-    tables = [
-        create_agent_table(
-            agent=agent,
-            data=data,
-            blocks=(
-                BlockTypes.types if block_type == BlockTypes.ALL else (block_type,)
-            ),
-        )
-        for agent, data in benchmark_data.items()
-    ]
-
-    output.write_text(HTML_TEMPLATE.format(tables="".join(tables)), encoding="utf-8")
+    WRITERS[output_format or OutputFormats.HTML](columns, output)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2023 Valory AG
+#   Copyright 2023-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -20,11 +20,13 @@
 """Log streams"""
 
 
+import os
 import re
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Generator, List, Optional, TextIO, Tuple, cast
+from typing import Dict, Generator, List, Optional, TextIO, Tuple, cast
 
 from autonomy.analyse.logs.base import (
     ENTER_BEHAVIOUR_REGEX,
@@ -37,6 +39,11 @@ from autonomy.analyse.logs.base import (
 from autonomy.analyse.logs.db import AgentLogsDB
 
 
+def parse_log_file(file: Path) -> List[LogRow]:
+    """Parse a log file, used to parse files in worker processes."""
+    return list(LogCollection.parse(file=file))
+
+
 class LogCollection(ABC):
     """Collection of logs."""
 
@@ -59,6 +66,15 @@ class LogCollection(ABC):
     ) -> "LogCollection":
         """Create logs database."""
 
+    @abstractmethod
+    def create_agent_dbs(
+        self,
+        dbs: Dict[str, AgentLogsDB],
+        reset: bool = False,
+        max_workers: Optional[int] = None,
+    ) -> "LogCollection":
+        """Create logs databases for several agents."""
+
     @staticmethod
     def get_next_log_block(
         fp: TextIO,
@@ -68,14 +84,14 @@ class LogCollection(ABC):
         if prev_line is None:
             return None, None
 
-        line = prev_line
+        lines = [prev_line]
         while True:
             _line = fp.readline()
             if _line == "":
-                return prev_line, None
+                return "".join(lines), None
             if TIMESTAMP_REGEX.match(_line) is not None:
-                return line, _line
-            line += _line
+                return "".join(lines), _line
+            lines.append(_line)
 
     @classmethod
     def parse(cls, file: Path) -> Generator[LogRow, None, None]:
@@ -137,3 +153,34 @@ class FromDirectory(LogCollection):
             )
         )
         return self
+
+    def create_agent_dbs(
+        self,
+        dbs: Dict[str, AgentLogsDB],
+        reset: bool = False,
+        max_workers: Optional[int] = None,
+    ) -> "FromDirectory":
+        """
+        Create logs tables for several agents.
+
+        The log files are parsed in worker processes, while the rows are
+        written from this process as each file is done since sqlite allows a
+        single writer at a time.
+        """
+
+        if len(dbs) < 2:
+            for agent, db in dbs.items():
+                self.create_agent_db(agent=agent, db=db, reset=reset)
+            return self
+
+        max_workers = min(len(dbs), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(parse_log_file, self.directory / f"{agent}.txt"): agent
+                for agent in dbs
+            }
+            for future in as_completed(futures):
+                db = dbs[futures[future]]
+                db.create(reset=reset)
+                db.insert_many(logs=future.result())
+        return self
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2023 Valory AG
+#   Copyright 2023-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -22,7 +22,7 @@
 import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Iterator, List, Optional, Tuple
+from typing import Any, Iterable, List, Optional, Tuple
 
 from autonomy.analyse.logs.base import LogRow
 
@@ -44,6 +44,20 @@ QUERY_CHECK_TABLE_EXISTS = (
 )
 QUERY_DROP_TABLE = "DROP TABLE {agent};"
 QUERY_INSERT_LOG = "INSERT INTO {agent} VALUES (?, ?, ?, ?, ?, ?);"
+QUERY_CREATE_INDEX = (
+    "CREATE INDEX IF NOT EXISTS {agent}_{column} ON {agent} ({column});"
+)
+
+# The database is a cache rebuilt from the log files, so durability is traded
+# for ingestion speed: WAL keeps readers unblocked while a table is written and
+# a single sync per checkpoint is enough.
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA cache_size=-65536;",
+)
+INDEXED_COLUMNS = (PERIOD, ROUND, BEHAVIOUR, TIMESTAMP)
 
 
 class AgentLogsDB:
@@ -60,6 +74,8 @@ class AgentLogsDB:
             database=self._db_path,
             detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES,
         )
+        for pragma in PRAGMAS:
+            self._db.execute(pragma)
 
     def select(  # pylint: disable=too-many-arguments
         self,
@@ -147,15 +163,24 @@ class AgentLogsDB:
 
         return self
 
+    def create_indexes(self) -> "AgentLogsDB":
+        """Create the indexes used by the select queries."""
+        with self._db:
+            for column in INDEXED_COLUMNS:
+                self._db.execute(
+                    QUERY_CREATE_INDEX.format(agent=self.agent, column=column)
+                )
+        return self
+
     def insert_many(
         self,
-        logs: Iterator[LogRow],
+        logs: Iterable[LogRow],
     ) -> "AgentLogsDB":
-        """Insert a record"""
-        for timestamp, log_level, message, period, round_name, behaviour_name in logs:
-            self.cursor.execute(
-                QUERY_INSERT_LOG.format(agent=self.agent),
-                (timestamp, log_level, message, period, round_name, behaviour_name),
-            )
-        self._db.commit()
-        return self
+        """Insert records in a single transaction and index them."""
+        with self._db:
+            self._db.executemany(QUERY_INSERT_LOG.format(agent=self.agent), logs)
+        return self.create_indexes()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
@@ -178,6 +178,14 @@ ABCI_SKILL_MODEL_PARAMS_SCHEMA = {
         "light_slash_unit_amount",
         "serious_slash_unit_amount",
         "setup",
+        "use_merkle_app_hash",
+        "tx_verification_workers",
+        "binary_payload_encoding",
+        "pipelined_a2a_transactions",
+        "multicall2_addresses",
+        "deduplicate_ipfs_uploads",
+        "contract_state_cache_ttl",
+        "blockchain_retention",
     ],
 }
 
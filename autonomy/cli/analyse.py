@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2022-2023 Valory AG
+#   Copyright 2022-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -30,7 +30,7 @@ from aea.cli.utils.decorators import pass_ctx
 from aea.configurations.constants import PACKAGES
 from aea.configurations.data_types import PublicId
 
-from autonomy.analyse.benchmark.aggregate import BlockTypes, aggregate
+from autonomy.analyse.benchmark.aggregate import BlockTypes, OutputFormats, aggregate
 from autonomy.analyse.handlers import check_handlers
 from autonomy.analyse.logs.base import TIME_FORMAT
 from autonomy.chain.config import ChainType
@@ -405,13 +405,38 @@ def _check_dialogues(
     "--output",
     "-o",
     type=click.types.Path(file_okay=True, dir_okay=False, resolve_path=True),
-    default=BENCHMARKS_DIR,
+    default=None,
+    help="Output file, defaults to `benchmarks.<format>` in the working directory.",
 )
-def benchmark(path: Path, block_type: str, period: int, output: Path) -> None:
+@click.option(
+    "--format",
+    "-f",
+    "output_format",
+    type=click.Choice(choices=OutputFormats.formats, case_sensitive=True),
+    default=OutputFormats.HTML,
+    required=False,
+    help="Output format, CSV and JSON contain the summary across agents and periods.",
+)
+def benchmark(
+    path: Path,
+    block_type: str,
+    period: int,
+    output: Optional[Path],
+    output_format: str,
+) -> None:
     """Benchmark aggregator."""
 
+    if output is None:
+        output = BENCHMARKS_DIR.with_suffix(f".{output_format}")
+
     with reraise_as_click_exception(Exception):
-        aggregate(path=path, block_type=block_type, period=period, output=Path(output))
+        aggregate(
+            path=path,
+            block_type=block_type,
+            period=period,
+            output=Path(output),
+            output_format=output_format,
+        )
 
 
 @analyse_group.command(name="service")
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2022 Valory AG
+#   Copyright 2022-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -43,10 +43,17 @@ def hash_group() -> None:
 )
 @click.option("--vendor", type=str)
 @click.option("--no-wrap", is_flag=True)
+@click.option(
+    "--max-workers",
+    type=int,
+    default=None,
+    help="Maximum number of processes to hash the packages with, defaults to the number of CPUs.",
+)
 def generate_all(
     packages_dir: Path,
     vendor: Optional[str],
     no_wrap: bool,
+    max_workers: Optional[int],
 ) -> None:
     """Generate IPFS hashes."""
     message = (
@@ -61,7 +68,11 @@ def generate_all(
     click.echo(message=message)
     packages_dir = Path(packages_dir).absolute()
     return_code = update_hashes(
-        packages_dir, no_wrap, vendor=vendor, config_loader=load_configuration
+        packages_dir,
+        no_wrap,
+        vendor=vendor,
+        config_loader=load_configuration,
+        max_workers=max_workers,
     )
     sys.exit(return_code)
 
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2023 Valory AG
+#   Copyright 2023-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -148,16 +148,12 @@ class ParseLogs:
     def create_tables(self, reset: bool = False) -> "ParseLogs":
         """Create required tables."""
 
-        for agent, db in self._dbs.items():
-            db_exists = db.exists()
-            if db_exists and not reset:
-                continue
-
-            self._collection.create_agent_db(
-                agent=agent,
-                db=db,
-                reset=reset,
-            )
+        self._collection.create_agent_dbs(
+            dbs={
+                agent: db for agent, db in self._dbs.items() if reset or not db.exists()
+            },
+            reset=reset,
+        )
 
         return self
 
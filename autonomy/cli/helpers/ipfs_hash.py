@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2022 Valory AG
+#   Copyright 2022-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -19,9 +19,13 @@
 
 """IPFS hash helpers."""
 
+import hashlib
+import json
+import os
 import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Callable, Dict, Optional, cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
 
 import click
 from aea.cli.ipfs_hash import (
@@ -39,6 +43,15 @@ from aea.helpers.dependency_tree import DependencyTree, dump_yaml, load_yaml
 from aea.helpers.fingerprint import update_fingerprint
 
 from autonomy.configurations.base import PACKAGE_TYPE_TO_CONFIG_CLASS
+from autonomy.configurations.constants import PYCACHE
+
+
+HASH_CACHE_DIR = "autonomy"
+HASH_CACHE_VERSION = 1
+
+ConfigLoaderType = Callable[[PackageType, Path], PackageConfiguration]
+# the size, the modification time in nanoseconds and the SHA256 hash of a file, by its path relative to the package
+FilesFingerprint = Dict[str, Tuple[int, int, str]]
 
 
 def load_configuration(
@@ -60,74 +73,351 @@ def load_configuration(
     return cast(PackageConfiguration, configuration_obj)
 
 
+def update_dependency_hashes(
+    package_id: PackageId,
+    item_config: Dict,
+    public_id_to_hash_mappings: Dict[PackageId, str],
+) -> None:
+    """Update the hashes of the dependencies in a package's configuration, in place."""
+    if package_id.package_type != PackageType.SERVICE:
+        extend_public_ids(item_config, public_id_to_hash_mappings)
+        return
+
+    agent_id = PackageId(PackageType.AGENT, PublicId.from_str(item_config["agent"]))
+    item_config["agent"] = str(
+        PublicId(
+            author=agent_id.author,
+            name=agent_id.name,
+            version=agent_id.version,
+            package_hash=public_id_to_hash_mappings[agent_id],
+        )
+    )
+
+
+def get_dependencies(package_id: PackageId, item_config: Dict) -> List[PackageId]:
+    """Get the ids of a package's dependencies, without their hashes."""
+    if package_id.package_type == PackageType.SERVICE:
+        agent_id = PublicId.from_str(item_config["agent"]).without_hash()
+        return [PackageId(PackageType.AGENT, agent_id)]
+    return [
+        dependency.without_hash()
+        for dependency in DependencyTree.get_all_dependencies(item_config)
+    ]
+
+
+def get_config_file(package_id: PackageId, package_path: Path) -> Path:
+    """Get the path to the configuration file of a package."""
+    return package_path / cast(
+        str, PACKAGE_TYPE_TO_CONFIG_FILE.get(package_id.package_type.value)
+    )
+
+
+def _hash_file_content(file_path: Path) -> str:
+    """Get the SHA256 hash of a file's content."""
+    return hashlib.sha256(file_path.read_bytes()).hexdigest()
+
+
+def _iter_package_files(package_path: Path) -> List[Path]:
+    """Get the files of a package which are hashed, i.e., skipping the `__pycache__` directories."""
+    return [
+        path
+        for path in package_path.rglob("*")
+        if path.is_file() and PYCACHE not in path.relative_to(package_path).parts
+    ]
+
+
+def get_files_fingerprint(package_path: Path) -> FilesFingerprint:
+    """Get the fingerprint of the files of a package."""
+    fingerprint: FilesFingerprint = {}
+    for path in _iter_package_files(package_path):
+        stat = path.stat()
+        fingerprint[path.relative_to(package_path).as_posix()] = (
+            stat.st_size,
+            stat.st_mtime_ns,
+            _hash_file_content(path),
+        )
+    return fingerprint
+
+
+def files_unchanged(package_path: Path, fingerprint: FilesFingerprint) -> bool:
+    """
+    Check whether the files of a package match their fingerprint.
+
+    The content of a file is only hashed if its modification time has changed, e.g., after a checkout,
+    in which case its fingerprint is updated in place if the content is the same.
+
+    :param package_path: the path to the package root.
+    :param fingerprint: the fingerprint of the files, as recorded the last time the package was hashed.
+    :return: whether the files are unchanged.
+    """
+    paths = _iter_package_files(package_path)
+    if len(paths) != len(fingerprint):
+        return False
+
+    for path in paths:
+        record = fingerprint.get(path.relative_to(package_path).as_posix())
+        if record is None:
+            return False
+        size, mtime_ns, content_hash = record
+        stat = path.stat()
+        if stat.st_size != size:
+            return False
+        if stat.st_mtime_ns == mtime_ns:
+            continue
+        if _hash_file_content(path) != content_hash:
+            return False
+        fingerprint[path.relative_to(package_path).as_posix()] = (
+            size,
+            stat.st_mtime_ns,
+            content_hash,
+        )
+    return True
+
+
+def get_hash_cache_file(packages_dir: Path, name: str) -> Path:
+    """
+    Get the path to the hash cache of a packages directory, in the user's cache directory.
+
+    :param packages_dir: the path to the packages directory.
+    :param name: the name of the cache, as the commands record different cache entries.
+    :return: the path to the cache file.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    digest = hashlib.sha256(str(packages_dir.resolve()).encode()).hexdigest()[:16]
+    return Path(cache_home) / HASH_CACHE_DIR / f"{name}-{digest}.json"
+
+
+def load_hash_cache(cache_file: Path) -> Dict[str, Dict]:
+    """Load the cached package hashes, ignoring the cache if it is missing, invalid or of another version."""
+    try:
+        cache = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != HASH_CACHE_VERSION:
+        return {}
+    return cast(Dict[str, Dict], cache.get("packages", {}))
+
+
+def dump_hash_cache(cache_file: Path, packages: Dict[str, Dict]) -> None:
+    """Dump the cached package hashes. The cache is optional, so failing to write it is not an error."""
+    temp_file = cache_file.with_suffix(".tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file.write_text(
+            json.dumps({"version": HASH_CACHE_VERSION, "packages": packages}),
+            encoding="utf-8",
+        )
+        temp_file.replace(cache_file)
+    except OSError as e:  # pragma: nocover
+        click.echo(f"Could not write the hash cache to {cache_file}: {e}")
+
+
+def is_cache_entry_valid(
+    package_path: Path, hashes: Dict[str, Optional[str]], entry: Dict
+) -> bool:
+    """
+    Check whether neither the files nor the hashes of the dependencies of a package have changed since it was cached.
+
+    :param package_path: the path to the package root.
+    :param hashes: the current hashes of the packages, by their id.
+    :param entry: the cache entry of the package, its files fingerprint is updated in place if still valid.
+    :return: whether the cache entry is valid.
+    """
+    if any(
+        hashes.get(dependency) != package_hash
+        for dependency, package_hash in entry["dependencies"].items()
+    ):
+        return False
+
+    files = {path: tuple(record) for path, record in entry["files"].items()}
+    if not files_unchanged(package_path, cast(FilesFingerprint, files)):
+        return False
+
+    entry["files"] = files
+    return True
+
+
+def get_cached_hash(
+    package_path: Path,
+    hashes: Dict[str, str],
+    no_wrap: bool,
+    entry: Optional[Dict],
+) -> Optional[Tuple[str, str]]:
+    """
+    Get the cached hash of a package, if neither its files nor the hashes of its dependencies have changed.
+
+    :param package_path: the path to the package root.
+    :param hashes: the hashes of the already processed packages, by their id.
+    :param no_wrap: whether the hash is computed without the wrapper node.
+    :param entry: the cache entry of the package, if any.
+    :return: the key and the hash of the package, if they are cached.
+    """
+    if entry is None or entry["no_wrap"] != no_wrap:
+        return None
+    if not is_cache_entry_valid(
+        package_path, cast(Dict[str, Optional[str]], hashes), entry
+    ):
+        return None
+    return entry["key"], entry["hash"]
+
+
+def process_package(
+    package_id: PackageId,
+    package_path: Path,
+    public_id_to_hash_mappings: Dict[PackageId, str],
+    no_wrap: bool = False,
+    config_loader: ConfigLoaderType = load_configuration,
+) -> Tuple[str, str, Dict]:
+    """
+    Update the dependency hashes and the fingerprint of a package, and hash it.
+
+    :param package_id: the package id.
+    :param package_path: the path to the package root.
+    :param public_id_to_hash_mappings: the hashes of the packages of the previous dependency tree levels.
+    :param no_wrap: whether to compute the hash without the wrapper node.
+    :param config_loader: the configuration loader.
+    :return: the key and the hash of the package, and its cache entry.
+    """
+    config_file = get_config_file(package_id, package_path)
+    item_config, extra_config = load_yaml(config_file)
+    update_dependency_hashes(package_id, item_config, public_id_to_hash_mappings)
+    dump_yaml(config_file, item_config, extra_config)
+
+    configuration_obj = config_loader(package_id.package_type.value, package_path)
+    sort_configuration_file(configuration_obj)
+    update_fingerprint(configuration_obj)
+    key, package_hash = hash_package(
+        configuration_obj, package_id.package_type, no_wrap=no_wrap
+    )
+    entry = dict(
+        key=key,
+        hash=package_hash,
+        no_wrap=no_wrap,
+        dependencies={
+            str(dependency): public_id_to_hash_mappings.get(dependency)
+            for dependency in get_dependencies(package_id, item_config)
+        },
+        files=get_files_fingerprint(package_path),
+    )
+    return key, package_hash, entry
+
+
 # TODO: extract into utils
 # Add input validations
-def update_hashes(  # pylint: disable=too-many-locals
+def update_hashes(  # pylint: disable=too-many-locals,too-many-arguments
     packages_dir: Path,
     no_wrap: bool = False,
     vendor: Optional[str] = None,
-    config_loader: Callable[
-        [PackageType, Path], PackageConfiguration
-    ] = load_configuration,
+    config_loader: ConfigLoaderType = load_configuration,
+    max_workers: Optional[int] = None,
+    cache_file: Optional[Path] = None,
 ) -> int:
-    """Process all AEA packages, update fingerprint, and update packages.json file."""
+    """
+    Process all AEA packages, update fingerprint, and update packages.json file.
+
+    The packages of the same dependency tree level are processed in parallel, as they only depend on
+    the packages of the previous levels. The packages whose files and dependency hashes have not changed
+    since they were last hashed are skipped, using the cache stored in `cache_file`.
+
+    :param packages_dir: the path to the packages directory.
+    :param no_wrap: whether to compute the hashes without the wrapper node.
+    :param vendor: process only the packages of this author.
+    :param config_loader: the configuration loader, it should be picklable to be used by the worker processes.
+    :param max_workers: the maximum number of worker processes, the number of CPUs if not specified.
+    :param cache_file: the path to the hash cache, in the user's cache directory if not specified.
+    :return: the return code.
+    """
     return_code = 0
     package_hashes: Dict[str, str] = {}
+    cache_file = cache_file or get_hash_cache_file(packages_dir, "hash")
+    cache = load_hash_cache(cache_file)
+    updated_cache: Dict[str, Dict] = {}
+    workers = max_workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
 
     try:
         public_id_to_hash_mappings: Dict = {}
+        hashes: Dict[str, str] = {}
         dependency_tree = DependencyTree.generate(packages_dir)
         packages = [
             [package_id_and_path(package_id, packages_dir) for package_id in tree_level]
             for tree_level in dependency_tree
         ]
         packages[0] = packages[0] + list(map(to_package_id, SCAFFOLD_PACKAGES))
+        # the agents of the services are not part of the dependency tree, so they can end up
+        # in the same level, hence the services are processed after the rest of their level
+        stages = []
         for tree_level in packages:
+            stages.append(
+                [
+                    item
+                    for item in tree_level
+                    if item[0].package_type != PackageType.SERVICE
+                ]
+            )
+            stages.append(
+                [
+                    item
+                    for item in tree_level
+                    if item[0].package_type == PackageType.SERVICE
+                ]
+            )
+
+        for tree_level in stages:
+            results: Dict[Tuple[PackageId, Path], Any] = {}
+            # the workers only need the hashes of the previous levels, which are not updated while they run
+            previous_hashes = dict(public_id_to_hash_mappings)
             for package_id, package_path in tree_level:
+                entry = cache.get(str(package_path))
+                cached = get_cached_hash(package_path, hashes, no_wrap, entry)
+                if cached is not None:
+                    click.echo(
+                        "Skipping unchanged package {} of type {}".format(
+                            package_path.name, package_id.package_type
+                        )
+                    )
+                    results[package_id, package_path] = (*cached, entry)
+                    continue
+
                 click.echo(
                     "Processing package {} of type {}".format(
                         package_path.name, package_id.package_type
                     )
                 )
-
-                config_file = package_path / cast(
-                    str, PACKAGE_TYPE_TO_CONFIG_FILE.get(package_id.package_type.value)
+                args = (
+                    package_id,
+                    package_path,
+                    previous_hashes,
+                    no_wrap,
+                    config_loader,
                 )
-                item_config, extra_config = load_yaml(config_file)
-                if package_id.package_type == PackageType.SERVICE:
-                    agent_id = PackageId(
-                        PackageType.AGENT, PublicId.from_str(item_config["agent"])
-                    )
-                    item_config["agent"] = str(
-                        PublicId(
-                            author=agent_id.author,
-                            name=agent_id.name,
-                            version=agent_id.version,
-                            package_hash=public_id_to_hash_mappings[agent_id],
-                        )
-                    )
-                else:
-                    extend_public_ids(item_config, public_id_to_hash_mappings)
-
-                dump_yaml(config_file, item_config, extra_config)
-
-                configuration_obj = config_loader(
-                    package_id.package_type.value, package_path
-                )
-                sort_configuration_file(configuration_obj)
-                update_fingerprint(configuration_obj)
-                key, package_hash = hash_package(
-                    configuration_obj, package_id.package_type, no_wrap=no_wrap
+                results[package_id, package_path] = (
+                    process_package(*args)
+                    if executor is None
+                    else executor.submit(process_package, *args)
                 )
+
+            for (package_id, package_path), result in results.items():
+                if isinstance(result, Future):
+                    result = result.result()
+                key, package_hash, entry = result
+                updated_cache[str(package_path)] = entry
                 public_id_to_hash_mappings[package_id] = package_hash
+                hashes[str(package_id)] = package_hash
 
                 if vendor is not None and package_id.author != vendor:
                     continue  # pragma: nocover
                 package_hashes[key] = package_hash
+
+        dump_hash_cache(cache_file, updated_cache)
         click.echo("Done!")
 
     except Exception:  # pylint: disable=broad-except  # pragma: nocover
         traceback.print_exc()
         return_code = 1
 
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
     return return_code
@@ -20,8 +20,9 @@
 """Override for packages command."""
 
 import sys
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Tuple, cast
+from typing import Dict, Iterator, List, Optional, Tuple, cast
 from warnings import warn
 
 import click
@@ -41,7 +42,15 @@ from aea.package_manager.base import (
 from aea.package_manager.v0 import PackageManagerV0 as BasePackageManagerV0
 from aea.package_manager.v1 import PackageManagerV1 as BasePackageManagerV1
 
-from autonomy.cli.helpers.ipfs_hash import load_configuration
+from autonomy.cli.helpers.ipfs_hash import (
+    dump_hash_cache,
+    get_dependencies,
+    get_files_fingerprint,
+    get_hash_cache_file,
+    is_cache_entry_valid,
+    load_configuration,
+    load_hash_cache,
+)
 from autonomy.configurations.base import Service
 
 
@@ -75,10 +84,14 @@ def lock_packages(ctx: Context, check: bool, skip_missing: bool) -> None:
             sys.exit(return_code)
 
         click.echo("Updating hashes...")
-        get_package_manager(packages_dir).update_package_hashes(
-            selector_prompt=package_type_selector_prompt,
-            skip_missing=skip_missing,
-        ).dump()
+        package_manager = cast(
+            _PackageManagerWithHashCache, get_package_manager(packages_dir)
+        )
+        with package_manager.hash_cache(get_hash_cache_file(packages_dir, "lock")):
+            package_manager.update_package_hashes(
+                selector_prompt=package_type_selector_prompt,
+                skip_missing=skip_missing,
+            ).dump()
         click.echo("Done")
 
 
@@ -161,9 +174,80 @@ class _PackageManagerWithServicePatch(BasePackageManager):
         return []
 
 
-class PackageManagerV0(BasePackageManagerV0, _PackageManagerWithServicePatch):
+class _PackageManagerWithHashCache(BasePackageManager):
+    """Package manager which skips hashing the packages which have not changed since they were last locked."""
+
+    _hash_cache: Optional[Dict[str, Dict]] = None
+    _updated_hash_cache: Dict[str, Dict]
+
+    @contextmanager
+    def hash_cache(self, cache_file: Path) -> Iterator[None]:
+        """
+        Use the given hash cache while updating the package hashes.
+
+        The cache is only updated if the hashes are updated successfully.
+
+        :param cache_file: the path to the hash cache.
+        :yield: None
+        """
+        self._hash_cache = load_hash_cache(cache_file)
+        self._updated_hash_cache = {}
+        try:
+            yield
+            dump_hash_cache(cache_file, self._updated_hash_cache)
+        finally:
+            self._hash_cache = None
+
+    def _get_dependency_hashes(self, package_id: PackageId) -> Dict[str, Optional[str]]:
+        """Get the current hashes of the dependencies of a package."""
+        item_config, _ = load_yaml(self.get_package_config_file(package_id))
+        return {
+            str(dependency): self.get_package_hash(dependency)
+            for dependency in get_dependencies(package_id, item_config)
+        }
+
+    def _get_cache_entry(self, package_id: PackageId) -> Optional[Dict]:
+        """Get the cache entry of a package, if it is still valid."""
+        if self._hash_cache is None:
+            return None
+        package_path = self.package_path_from_package_id(package_id=package_id)
+        entry = self._hash_cache.get(str(package_path))
+        if entry is None or not is_cache_entry_valid(
+            package_path, self._get_dependency_hashes(package_id), entry
+        ):
+            return None
+        return entry
+
+    def update_fingerprints(self, package_id: PackageId) -> None:
+        """Update fingerprints for a package, unless its files have not changed since it was last locked."""
+        if self._get_cache_entry(package_id) is not None:
+            return
+        super().update_fingerprints(package_id=package_id)
+
+    def calculate_hash_from_package_id(self, package_id: PackageId) -> str:
+        """Calculate package hash from package id, reusing the cached hash if the package has not changed."""
+        if self._hash_cache is None:
+            return super().calculate_hash_from_package_id(package_id=package_id)
+
+        package_path = self.package_path_from_package_id(package_id=package_id)
+        entry = self._get_cache_entry(package_id)
+        if entry is None:
+            entry = dict(
+                hash=super().calculate_hash_from_package_id(package_id=package_id),
+                dependencies=self._get_dependency_hashes(package_id),
+                files=get_files_fingerprint(package_path),
+            )
+        self._updated_hash_cache[str(package_path)] = entry
+        return entry["hash"]
+
+
+class PackageManagerV0(
+    BasePackageManagerV0, _PackageManagerWithServicePatch, _PackageManagerWithHashCache
+):
     """Patch package manager for service component."""
 
 
-class PackageManagerV1(BasePackageManagerV1, _PackageManagerWithServicePatch):
+class PackageManagerV1(
+    BasePackageManagerV1, _PackageManagerWithServicePatch, _PackageManagerWithHashCache
+):
     """Patch package manager for service component."""
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2024 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -26,11 +26,11 @@ import signal
 import subprocess  # nosec
 import sys
 from asyncio import AbstractEventLoop, AbstractServer, CancelledError, Task
-from io import BytesIO
+from collections import deque
 from logging import Logger
 from pathlib import Path
 from threading import Event, Thread
-from typing import Any, Dict, List, Optional, Tuple, Union, cast
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union, cast
 
 import grpc
 from aea.configurations.base import PublicId
@@ -101,6 +101,7 @@ DEFAULT_P2P_LISTEN_ADDRESS = f"{_TCP}{DEFAULT_LISTEN_ADDRESS}:{DEFAULT_P2P_PORT}
 DEFAULT_RPC_LISTEN_ADDRESS = f"{_TCP}{LOCALHOST}:{DEFAULT_RPC_PORT}"
 MAX_READ_IN_BYTES = 2**20  # Max we'll consume on a read stream (1 MiB)
 MAX_VARINT_BYTES = 10  # Max size of varint we support
+READ_CHUNK_SIZE = 2**16  # Size of the chunks read from a stream at once (64 KiB)
 DEFAULT_TENDERMINT_LOG_FILE = "tendermint.log"
 
 
@@ -158,16 +159,44 @@ class _TendermintABCISerializer:
             raise EncodeVarintError(f"{log_msg}: {number}")
 
         number <<= 1  # Shift to int64
-        buf = b""
+        buf = bytearray()
         while True:
             towrite = number & 0x7F
             number >>= 7
             if number:
-                buf += bytes((towrite | 0x80,))
+                buf.append(towrite | 0x80)
             else:
-                buf += bytes((towrite,))
+                buf.append(towrite)
                 break
-        return buf
+        return bytes(buf)
+
+    @classmethod
+    def decode_varint_from_buffer(
+        cls, buffer: memoryview, offset: int = 0, max_length: int = MAX_VARINT_BYTES
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Decode a number from its varint coding, from an in-memory buffer.
+
+        :param buffer: the buffer to decode from.
+        :param offset: the offset of the varint in the buffer.
+        :param max_length: the max number of bytes that the varint can span.
+        :return: the decoded int and the offset right after the varint,
+            or None if the buffer ends before the varint is complete.
+
+        :raise: DecodeVarintError if the varint spans more than max_length bytes.
+        """
+        result = 0
+        shift = 0
+        end = min(len(buffer), offset + max_length)
+        for index in range(offset, end):
+            byte = buffer[index]
+            result |= (byte & 0x7F) << shift
+            shift += 7
+            if not byte & 0x80:
+                return result >> 1, index + 1
+        if end - offset == max_length:
+            raise DecodeVarintError("could not decode varint")
+        return None
 
     @classmethod
     async def decode_varint(
@@ -220,40 +249,101 @@ class _TendermintABCISerializer:
     @classmethod
     def write_message(cls, message: Response) -> bytes:
         """Write a message in a buffer."""
-        buffer = BytesIO(b"")
         protobuf_bytes = message.SerializeToString()
-        encoded = cls.encode_varint(len(protobuf_bytes))
-        buffer.write(encoded)
-        buffer.write(protobuf_bytes)
-        return buffer.getvalue()
+        return cls.encode_varint(len(protobuf_bytes)) + protobuf_bytes
 
 
-class VarintMessageReader:  # pylint: disable=too-few-public-methods
-    """Varint message reader."""
+class VarintMessageReader:
+    """
+    Varint message reader.
 
-    def __init__(self, reader: asyncio.StreamReader) -> None:
+    The stream is read in large chunks, which are accumulated in a buffer,
+    and all the complete varint-prefixed messages are parsed out of the buffer at once,
+    instead of awaiting the stream for every single byte of the varints.
+    """
+
+    def __init__(
+        self, reader: asyncio.StreamReader, chunk_size: int = READ_CHUNK_SIZE
+    ) -> None:
         """Initialize the reader."""
         self._reader = reader
+        self._chunk_size = chunk_size
+        self._buffer = bytearray()
+        # the offset of the data of the buffer which have not been parsed yet
+        self._offset = 0
+        self._parsed: Deque[bytes] = deque()
+
+    def _parse_messages(self) -> None:
+        """Parse all the complete messages out of the buffer."""
+        with memoryview(self._buffer) as view:
+            while True:
+                try:
+                    decoded = _TendermintABCISerializer.decode_varint_from_buffer(
+                        view, self._offset
+                    )
+                except DecodeVarintError:
+                    # the framing is lost, drop the buffered data
+                    self._offset = len(self._buffer)
+                    raise
+                if decoded is None:
+                    return
+                length, start = decoded
+                if length > MAX_READ_IN_BYTES:
+                    raise TooLargeVarint(
+                        received_size=length, max_size=MAX_READ_IN_BYTES
+                    )
+                end = start + length
+                if end > len(view):
+                    return
+                self._parsed.append(bytes(view[start:end]))
+                self._offset = end
+
+    async def _read_chunk(self) -> bool:
+        """Read the next chunk of the stream into the buffer. Return False if the EOF has been reached."""
+        data = await self._reader.read(self._chunk_size)
+        if not data:
+            return False
+        del self._buffer[: self._offset]
+        self._offset = 0
+        self._buffer += data
+        return True
+
+    async def read_messages(self) -> List[bytes]:
+        """
+        Read all the complete messages which are available, waiting until there is at least one.
+
+        :return: the messages.
+
+        :raise: EOFError if the EOF is reached right after a message.
+        :raise: DecodeVarintError if the EOF is reached in the middle of a varint or if a varint is invalid.
+        :raise: ShortBufferLengthError if the EOF is reached in the middle of a message.
+        :raise: TooLargeVarint if a message exceeds the max size.
+        """
+        while not self._parsed:
+            if not await self._read_chunk():
+                self._raise_eof()
+            self._parse_messages()
+        messages = list(self._parsed)
+        self._parsed.clear()
+        return messages
+
+    def _raise_eof(self) -> None:
+        """Raise the appropriate error, given that the EOF of the stream has been reached."""
+        with memoryview(self._buffer) as view:
+            remaining = view[self._offset :]
+            if not remaining:
+                raise EOFError()
+            decoded = _TendermintABCISerializer.decode_varint_from_buffer(remaining)
+            if decoded is None:
+                raise DecodeVarintError("could not decode varint")
+            length, start = decoded
+            raise ShortBufferLengthError(length, bytes(remaining[start:]))
 
     async def read_next_message(self) -> bytes:
         """Read next message."""
-        varint = await _TendermintABCISerializer.decode_varint(self._reader)
-        if varint > MAX_READ_IN_BYTES:
-            raise TooLargeVarint(received_size=varint, max_size=MAX_READ_IN_BYTES)
-        message_bytes = await self.read_until(varint)
-        if len(message_bytes) < varint:
-            raise ShortBufferLengthError(varint, message_bytes)
-        return message_bytes
-
-    async def read_until(self, n: int) -> bytes:
-        """Wait until n bytes are read from the stream."""
-        result = BytesIO(b"")
-        read_bytes = 0
-        while read_bytes < n:
-            data = await self._reader.read(n - read_bytes)
-            result.write(data)
-            read_bytes += len(data)
-        return result.getvalue()
+        if not self._parsed:
+            self._parsed.extend(await self.read_messages())
+        return self._parsed.popleft()
 
 
 class ABCIApplicationServicer(types_pb2_grpc.ABCIApplicationServicer):
@@ -900,6 +990,14 @@ class TcpServerChannel:  # pylint: disable=too-many-instance-attributes
         # this dictionary associates requests to socket name
         # such that responses are sent to the right receiver
         self._request_id_to_socket: Dict[DialogueLabel, str] = {}
+        # the requests of each socket which have not been responded yet, in the order that they were received;
+        # a skill may respond out of order, but Tendermint expects the responses on each socket in the order of the requests
+        self._unanswered_by_socket: Dict[str, Deque[DialogueLabel]] = {}
+        # the encoded responses which wait for the responses of earlier requests on the same socket
+        self._ready_responses: Dict[DialogueLabel, bytes] = {}
+        # the responses which have not been written to the sockets yet;
+        # they are written in a single call per event loop iteration
+        self._pending_writes: Dict[str, bytearray] = {}
 
     @property
     def is_stopped(self) -> bool:
@@ -928,6 +1026,8 @@ class TcpServerChannel:  # pylint: disable=too-many-instance-attributes
         if self.is_stopped:  # pragma: nocover
             return
         self._is_stopped = True
+        for peer_name in list(self._pending_writes):
+            self._flush_writes(peer_name)
         self._server = cast(AbstractServer, self._server)
         self._server.close()
         await self._server.wait_closed()
@@ -936,6 +1036,9 @@ class TcpServerChannel:  # pylint: disable=too-many-instance-attributes
         self._server = None
         self._streams_by_socket = {}
         self._request_id_to_socket = {}
+        self._unanswered_by_socket = {}
+        self._ready_responses = {}
+        self._pending_writes = {}
 
     async def receive_messages(
         self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
@@ -951,21 +1054,10 @@ class TcpServerChannel:  # pylint: disable=too-many-instance-attributes
         varint_message_reader = VarintMessageReader(reader)
         while not self.is_stopped:
             try:
-                message_bytes = await varint_message_reader.read_next_message()
-                if len(message_bytes) == 0:
-                    self.logger.error(
-                        f"Tendermint node {peer_name} closed connection."
-                    )  # pragma: nocover
-                    # break to the _stop if the connection stops
-                    break  # pragma: nocover
-                self.logger.debug(
-                    f"Received {len(message_bytes)} bytes from connection {peer_name}"
-                )
-                message = Request()
-                message.ParseFromString(message_bytes)
+                messages_bytes = await varint_message_reader.read_messages()
             except (
                 DecodeVarintError,
-                DecodeError,
+                ShortBufferLengthError,
             ) as e:  # pragma: nocover
                 self.logger.error(
                     f"an error occurred while reading a message: "
@@ -990,7 +1082,25 @@ class TcpServerChannel:  # pylint: disable=too-many-instance-attributes
             except CancelledError:  # pragma: nocover
                 self.logger.debug(f"Read task for peer {peer_name} cancelled.")
                 return
-            await self._handle_message(message, peer_name)
+            for message_bytes in messages_bytes:
+                await self._receive_message(message_bytes, peer_name)
+
+    async def _receive_message(self, message_bytes: bytes, peer_name: str) -> None:
+        """Parse and handle a single framed message from a peer."""
+        self.logger.debug(
+            f"Received {len(message_bytes)} bytes from connection {peer_name}"
+        )
+        message = Request()
+        try:
+            message.ParseFromString(message_bytes)
+        except DecodeError as e:  # pragma: nocover
+            self.logger.error(
+                f"an error occurred while reading a message: "
+                f"{type(e).__name__}: {e}. "
+                f"The message will be ignored."
+            )
+            return
+        await self._handle_message(message, peer_name)
 
     async def _handle_message(self, message: Request, peer_name: str) -> None:
         """Handle a single message from a peer."""
@@ -1002,9 +1112,9 @@ class TcpServerChannel:  # pylint: disable=too-many-instance-attributes
             if result is not None:
                 request, dialogue = result
                 # associate request to peer, so we remember who to reply to
-                self._request_id_to_socket[
-                    dialogue.incomplete_dialogue_label
-                ] = peer_name
+                label = dialogue.incomplete_dialogue_label
+                self._request_id_to_socket[label] = peer_name
+                self._unanswered_by_socket.setdefault(peer_name, deque()).append(label)
                 envelope = Envelope(
                     to=request.to, sender=request.sender, message=request
                 )
@@ -1028,12 +1138,61 @@ class TcpServerChannel:  # pylint: disable=too-many-instance-attributes
             return
 
         # we only deal with atomic request-response cycles, so it is safe to remove the reference
-        peer_name = self._request_id_to_socket.pop(dialogue.incomplete_dialogue_label)
+        label = dialogue.incomplete_dialogue_label
+        peer_name = self._request_id_to_socket.pop(label)
         _reader, writer = self._streams_by_socket[peer_name]
         protobuf_message = _TendermintProtocolEncoder.process(message)
-        data = _TendermintABCISerializer.write_message(protobuf_message)
+        self._ready_responses[label] = _TendermintABCISerializer.write_message(
+            protobuf_message
+        )
+        data = self._pop_ordered_responses(peer_name)
+        if not data:
+            # an earlier request of the socket has not been responded yet
+            return
         self.logger.debug(f"Writing {len(data)} bytes")
-        writer.write(data)
+        pending = self._pending_writes.get(peer_name)
+        if pending is not None:
+            # a flush is already scheduled for this peer, coalesce the response
+            pending += data
+            return
+        self._pending_writes[peer_name] = bytearray(data)
+        loop = asyncio.get_running_loop()
+        flushed = loop.create_future()
+        loop.call_soon(self._flush_writes, peer_name, flushed)
+        # wait for the coalesced responses to be written, so that draining applies to them
+        await flushed
+        try:
+            await writer.drain()
+        except ConnectionError as e:  # pragma: nocover
+            self.logger.error(f"Could not write to {peer_name}: {e}")
+
+    def _pop_ordered_responses(self, peer_name: str) -> bytes:
+        """Pop the ready responses of a peer which are not preceded by an unanswered request, in the requests' order."""
+        unanswered = self._unanswered_by_socket.get(peer_name, deque())
+        data = bytearray()
+        while unanswered and unanswered[0] in self._ready_responses:
+            data += self._ready_responses.pop(unanswered.popleft())
+        return bytes(data)
+
+    def _flush_writes(
+        self, peer_name: str, flushed: Optional[asyncio.Future] = None
+    ) -> None:
+        """Write all the pending responses of a peer with a single call, and mark the given future as done."""
+        try:
+            data = self._pending_writes.pop(peer_name, None)
+            if not data:  # pragma: nocover
+                return
+            streams = self._streams_by_socket.get(peer_name)
+            if streams is None:  # pragma: nocover
+                self.logger.warning(
+                    f"Dropping {len(data)} bytes for closed {peer_name}"
+                )
+                return
+            _reader, writer = streams
+            writer.write(data)
+        finally:
+            if flushed is not None and not flushed.done():
+                flushed.set_result(None)
 
 
 class StoppableThread(
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -27,7 +27,7 @@ import os
 import shutil
 import time
 from abc import ABC, abstractmethod
-from cmath import inf
+from collections import deque
 from contextlib import suppress
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -39,7 +39,7 @@ import docker
 import pytest
 import requests
 from _pytest.fixtures import SubRequest  # type: ignore
-from aea.configurations.base import ConnectionConfig
+from aea.configurations.base import ConnectionConfig, PublicId
 from aea.connections.base import ConnectionStates
 from aea.identity.base import Identity
 from aea.mail.base import Envelope
@@ -70,11 +70,17 @@ from packages.valory.connections.abci.connection import (
     DEFAULT_LISTEN_ADDRESS,
     DecodeVarintError,
     EncodeVarintError,
+    MAX_READ_IN_BYTES,
+    READ_CHUNK_SIZE,
     ShortBufferLengthError,
+    TcpServerChannel,
     TooLargeVarint,
     VarintMessageReader,
     _TendermintABCISerializer,
 )
+from packages.valory.connections.abci.tendermint_encoder import (
+    _TendermintProtocolEncoder,
+)
 from packages.valory.protocols.abci import AbciMessage
 from packages.valory.protocols.abci.custom_types import (
     BlockParams,
@@ -625,37 +631,160 @@ def test_dep_util() -> None:
     assert dep_utils.version_to_string((1, 0, 0)) == "1.0.0"
 
 
+def _frame(message: bytes) -> bytes:
+    """Prefix a message with its varint-encoded length."""
+    return _TendermintABCISerializer.encode_varint(len(message)) + message
+
+
 @pytest.mark.asyncio
 async def test_varint_message_reader() -> None:
     """Test VarintMessageReader"""
+    too_large = _TendermintABCISerializer.encode_varint(MAX_READ_IN_BYTES + 1)
+    vmr = VarintMessageReader(AsyncBytesIO(too_large))  # type: ignore
+    with pytest.raises(TooLargeVarint):
+        await vmr.read_next_message()
+
+    vmr = VarintMessageReader(AsyncBytesIO(_frame(b"hello")[:-1]))  # type: ignore
+    with pytest.raises(ShortBufferLengthError):
+        await vmr.read_next_message()
+
+    vmr = VarintMessageReader(AsyncBytesIO(b"\x80"))  # type: ignore
+    with pytest.raises(DecodeVarintError, match="could not decode varint"):
+        await vmr.read_next_message()
+
+    vmr = VarintMessageReader(AsyncBytesIO(b"\x80" * 11))  # type: ignore
+    with pytest.raises(DecodeVarintError, match="could not decode varint"):
+        await vmr.read_next_message()
+
+    vmr = VarintMessageReader(AsyncBytesIO(_frame(b"hello")))  # type: ignore
+    assert await vmr.read_next_message() == b"hello"
+    with pytest.raises(EOFError):
+        await vmr.read_next_message()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, READ_CHUNK_SIZE])
+@pytest.mark.asyncio
+async def test_varint_message_reader_chunks(chunk_size: int) -> None:
+    """Test that VarintMessageReader splits and reassembles the messages regardless of the chunks read."""
+    messages = [b"", b"a", b"hello", os.urandom(300), os.urandom(2**17)]
+    stream = AsyncBytesIO(b"".join(_frame(message) for message in messages))
+    vmr = VarintMessageReader(stream, chunk_size=chunk_size)  # type: ignore
+
+    received: List[bytes] = []
+    with pytest.raises(EOFError):
+        while True:
+            received.extend(await vmr.read_messages())
+    assert received == messages
 
-    async def read(nb: int) -> bytes:
-        return b"hello"
+    stream = AsyncBytesIO(b"".join(_frame(message) for message in messages))
+    vmr = VarintMessageReader(stream, chunk_size=chunk_size)  # type: ignore
+    assert [await vmr.read_next_message() for _ in messages] == messages
 
-    def patch_async_methods(value: Any) -> Callable:
-        async def decode_varint(*args: Any, **kwargs: Any) -> Any:
-            return value
 
-        return decode_varint
+@pytest.mark.asyncio
+async def test_varint_message_reader_batches() -> None:
+    """Test that all the complete messages of a chunk are returned at once."""
+    messages = [b"first", b"second", b"third"]
+    data = b"".join(_frame(message) for message in messages) + _frame(b"last")[:2]
+    vmr = VarintMessageReader(AsyncBytesIO(data))  # type: ignore
+    assert await vmr.read_messages() == messages
+    with pytest.raises(ShortBufferLengthError):
+        await vmr.read_messages()
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        (b"", None),
+        (b"\x80", None),
+        (b"\x00", (0, 1)),
+        (b"\xfe\xff\xff\xff\x1f", ((1 << 32) - 1, 5)),
+        (b"\x02rest", (1, 1)),
+    ],
+)
+def test_decode_varint_from_buffer(data: bytes, expected: Any) -> None:
+    """Test decoding a varint from an in-memory buffer."""
+    decode = _TendermintABCISerializer.decode_varint_from_buffer
+    assert decode(memoryview(data)) == expected
 
-    stream_reader = MagicMock(read=read)
-    vmr = VarintMessageReader(stream_reader)
 
-    with mock.patch.object(
-        _TendermintABCISerializer, "decode_varint", new=patch_async_methods(inf)
+@pytest.mark.asyncio
+async def test_tcp_channel_coalesces_writes() -> None:
+    """Test that the responses to a peer are written with a single call per loop iteration."""
+    channel = TcpServerChannel(PublicId("dummy_author", "dummy"), "", 0)
+    writer = MagicMock()
+    writer.drain = mock.AsyncMock()
+    channel._streams_by_socket["peer"] = (MagicMock(), writer)
+
+    datas = [b"first", b"second"]
+    envelopes = [MagicMock() for _ in datas]
+    for envelope in envelopes:
+        channel._request_id_to_socket[envelope.message] = "peer"
+    channel._unanswered_by_socket["peer"] = deque(
+        envelope.message for envelope in envelopes
+    )
+    channel._dialogues = MagicMock(
+        update=lambda message: MagicMock(incomplete_dialogue_label=message)
+    )
+    with mock.patch.object(_TendermintProtocolEncoder, "process"), mock.patch.object(
+        _TendermintABCISerializer, "write_message", side_effect=datas
     ):
-        with pytest.raises(TooLargeVarint):
-            await vmr.read_next_message()
+        await asyncio.gather(*(channel.send(envelope) for envelope in envelopes))
+        await asyncio.sleep(0)
+
+    writer.write.assert_called_once_with(bytearray(b"".join(datas)))
+    assert channel._pending_writes == {}
+
 
-    with mock.patch.object(
-        _TendermintABCISerializer, "decode_varint", new=patch_async_methods(10)
+@pytest.mark.asyncio
+async def test_tcp_channel_drains_after_write() -> None:
+    """Test that the writer is drained after the coalesced responses have been written."""
+    channel = TcpServerChannel(PublicId("dummy_author", "dummy"), "", 0)
+    calls = []
+    writer = MagicMock()
+    writer.write.side_effect = lambda data: calls.append(("write", bytes(data)))
+    writer.drain = mock.AsyncMock(side_effect=lambda: calls.append(("drain", None)))
+    channel._streams_by_socket["peer"] = (MagicMock(), writer)
+    channel._request_id_to_socket["request"] = "peer"
+    channel._unanswered_by_socket["peer"] = deque(["request"])
+    channel._dialogues = MagicMock(
+        update=lambda message: MagicMock(incomplete_dialogue_label=message)
+    )
+    with mock.patch.object(_TendermintProtocolEncoder, "process"), mock.patch.object(
+        _TendermintABCISerializer, "write_message", return_value=b"response"
     ):
-        with mock.patch.object(vmr, "read_until", new=patch_async_methods(b"")):
-            with pytest.raises(ShortBufferLengthError):
-                await vmr.read_next_message()
+        await channel.send(MagicMock(message="request"))
+
+    assert calls == [("write", b"response"), ("drain", None)]
 
-    with mock.patch.object(
-        _TendermintABCISerializer, "decode_varint", new=patch_async_methods(5)
+
+@pytest.mark.asyncio
+async def test_tcp_channel_orders_responses() -> None:
+    """Test that the responses on a socket are written in the order of its requests, even if they are sent out of order."""
+    channel = TcpServerChannel(PublicId("dummy_author", "dummy"), "", 0)
+    writer = MagicMock()
+    writer.drain = mock.AsyncMock()
+    channel._streams_by_socket["peer"] = (MagicMock(), writer)
+
+    labels = ("check_tx", "flush")
+    for label in labels:
+        channel._request_id_to_socket[label] = "peer"
+    channel._unanswered_by_socket["peer"] = deque(labels)
+    channel._dialogues = MagicMock(
+        update=lambda message: MagicMock(incomplete_dialogue_label=message)
+    )
+    with mock.patch.object(_TendermintProtocolEncoder, "process"), mock.patch.object(
+        _TendermintABCISerializer, "write_message", side_effect=[b"flush", b"check_tx"]
     ):
-        res = await vmr.read_next_message()
-        assert res == b"hello"
+        # the flush is responded before the earlier check tx
+        await channel.send(MagicMock(message="flush"))
+        await asyncio.sleep(0)
+        writer.write.assert_not_called()
+        assert channel._ready_responses == {"flush": b"flush"}
+
+        await channel.send(MagicMock(message="check_tx"))
+        await asyncio.sleep(0)
+
+    writer.write.assert_called_once_with(bytearray(b"check_txflush"))
+    assert channel._ready_responses == {}
+    assert not channel._unanswered_by_socket["peer"]
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023-2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+"""A content-addressed cache for the files downloaded from, or uploaded to, IPFS."""
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, cast
+
+
+Files = Dict[str, bytes]
+
+
+def _files_size(files: Files) -> int:
+    """Get the total size of the given files, in bytes."""
+    return sum(len(data) for data in files.values())
+
+
+class IpfsCache:
+    """
+    A size-bounded LRU cache of IPFS files, keyed by their CID.
+
+    As the content behind a CID is immutable, the entries never need to be invalidated.
+    The cache is kept in memory and, if a cache directory is given, also on the disk.
+    The latter can be shared by all the agents running on the same host.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        cache_dir: Optional[str] = None,
+        max_disk_size: int = 0,
+    ) -> None:
+        """
+        Initialize the cache.
+
+        :param max_size: the maximum total size of the files kept in memory, in bytes.
+        :param cache_dir: the directory to keep the files in, if they should also be cached on the disk.
+        :param max_disk_size: the maximum total size of the files kept on the disk, in bytes.
+        """
+        self.max_size = max_size
+        self.max_disk_size = max_disk_size
+        self.cache_dir = None if cache_dir is None else Path(cache_dir)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Files]" = OrderedDict()
+        self._size = 0
+        self._disk_entries: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_size = 0
+        self._lock = threading.Lock()
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_disk_entries()
+
+    @property
+    def size(self) -> int:
+        """Get the total size of the files kept in memory, in bytes."""
+        return self._size
+
+    @property
+    def disk_size(self) -> int:
+        """Get the total size of the files known to be kept on the disk, in bytes."""
+        return self._disk_size
+
+    @property
+    def hit_rate(self) -> float:
+        """Get the ratio of the lookups that were served by the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __contains__(self, cid: str) -> bool:
+        """Check whether the given CID is cached, without affecting the stats or the order of the entries."""
+        return cid in self._entries or cid in self._disk_entries
+
+    def get(self, cid: str) -> Optional[Files]:
+        """
+        Get the files of the given CID.
+
+        :param cid: the CID of the files.
+        :return: the cached files, or `None` on a cache miss.
+        """
+        with self._lock:
+            files = self._entries.get(cid)
+            if files is not None:
+                self._entries.move_to_end(cid)
+                self.hits += 1
+                return dict(files)
+
+        files = self._read_from_disk(cid)
+        with self._lock:
+            if files is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.disk_hits += 1
+            self._put_in_memory(cid, files)
+        return dict(files)
+
+    def put(self, cid: str, files: Files) -> None:
+        """
+        Cache the files of the given CID.
+
+        :param cid: the CID of the files.
+        :param files: the files, keyed by their names.
+        """
+        with self._lock:
+            self._put_in_memory(cid, dict(files))
+            if self.cache_dir is None or cid in self._disk_entries:
+                return
+
+        size = self._write_to_disk(cid, files)
+        if size is None:
+            return
+        with self._lock:
+            self._disk_entries[cid] = size
+            self._disk_size += size
+            self._evict_from_disk()
+
+    def _put_in_memory(self, cid: str, files: Files) -> None:
+        """Put the given files in memory, evicting the least recently used entries if needed."""
+        size = _files_size(files)
+        if size > self.max_size:
+            return
+        if cid in self._entries:
+            self._entries.move_to_end(cid)
+            return
+        self._entries[cid] = files
+        self._size += size
+        while self._size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= _files_size(evicted)
+
+    def _load_disk_entries(self) -> None:
+        """Index the entries already on the disk, e.g., from a previous run or from another agent."""
+        cache_dir = cast(Path, self.cache_dir)
+        entries = []
+        for entry in cache_dir.iterdir():
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            size = sum(file.stat().st_size for file in entry.iterdir())
+            entries.append((entry.stat().st_mtime, entry.name, size))
+        for _, cid, size in sorted(entries):
+            self._disk_entries[cid] = size
+            self._disk_size += size
+        self._evict_from_disk()
+
+    def _read_from_disk(self, cid: str) -> Optional[Files]:
+        """Read the files of the given CID from the disk, if they are cached there."""
+        if self.cache_dir is None:
+            return None
+        entry = self.cache_dir / cid
+        try:
+            files = {file.name: file.read_bytes() for file in entry.iterdir()}
+            # mark the entry as recently used for the agents that index it on startup
+            os.utime(entry)
+        except OSError:
+            return None
+        with self._lock:
+            if cid in self._disk_entries:
+                self._disk_entries.move_to_end(cid)
+            else:
+                # the entry was added by another agent sharing the directory
+                self._disk_entries[cid] = _files_size(files)
+                self._disk_size += self._disk_entries[cid]
+        return files
+
+    def _write_to_disk(self, cid: str, files: Files) -> Optional[int]:
+        """Write the files of the given CID to the disk, returning their size if they were written."""
+        cache_dir = cast(Path, self.cache_dir)
+        size = _files_size(files)
+        unsafe_names = any(
+            name in (".", "..") or os.sep in name or not name for name in files
+        )
+        if size > self.max_disk_size or unsafe_names:
+            return None
+
+        # write to a temporary directory first, so that the entry appears atomically
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".", dir=cache_dir))
+        try:
+            for name, data in files.items():
+                (tmp_dir / name).write_bytes(data)
+            tmp_dir.rename(cache_dir / cid)
+        except OSError:
+            # e.g., the same entry has been concurrently written by another agent
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return None
+        return size
+
+    def _evict_from_disk(self) -> None:
+        """Remove the least recently used entries from the disk, until its size limit is respected."""
+        cache_dir = cast(Path, self.cache_dir)
+        while self._disk_size > self.max_disk_size:
+            cid, size = self._disk_entries.popitem(last=False)
+            self._disk_size -= size
+            shutil.rmtree(cache_dir / cid, ignore_errors=True)
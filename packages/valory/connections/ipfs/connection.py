@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2023 Valory AG
+#   Copyright 2023-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -18,24 +18,30 @@
 # ------------------------------------------------------------------------------
 """A connection responsible for uploading and downloading files from IPFS."""
 import asyncio
+import io
 import os
-import tempfile
+import time
 from asyncio import Task
-from concurrent.futures import Executor
-from pathlib import Path
-from shutil import rmtree
-from typing import Any, Callable, Dict, Optional, cast
+from collections import defaultdict
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Generator, List, Optional, TypeVar, cast
 
+import ipfshttpclient
 import requests
 from aea.configurations.base import PublicId
 from aea.connections.base import Connection, ConnectionStates
 from aea.mail.base import Envelope
 from aea.protocols.base import Address, Message
 from aea.protocols.dialogue.base import Dialogue as BaseDialogue
-from aea_cli_ipfs.exceptions import DownloadError
 from aea_cli_ipfs.ipfs_utils import IPFSTool
-from ipfshttpclient.exceptions import ErrorResponse
+from ipfshttpclient.exceptions import ConnectionError as IPFSConnectionError
+from ipfshttpclient.exceptions import Error as IPFSClientError
+from ipfshttpclient.exceptions import ProtocolError as IPFSProtocolError
+from ipfshttpclient.exceptions import TimeoutError as IPFSTimeoutError
+from ipfshttpclient.multipart import StreamBase, StreamFileMixin
 
+from packages.valory.connections.ipfs.cache import IpfsCache
 from packages.valory.protocols.ipfs import IpfsMessage
 from packages.valory.protocols.ipfs.dialogues import IpfsDialogue
 from packages.valory.protocols.ipfs.dialogues import IpfsDialogues as BaseIpfsDialogues
@@ -43,6 +49,133 @@ from packages.valory.protocols.ipfs.dialogues import IpfsDialogues as BaseIpfsDi
 
 PUBLIC_ID = PublicId.from_str("valory/ipfs:0.1.0")
 
+# the protocol carries the files' content as `str`, therefore, only text files are supported
+FILE_ENCODING = "utf-8"
+# the versions of `ipfshttpclient` whose internal HTTP client is known to work with `InMemoryFilesAdder`
+SUPPORTED_IPFSHTTPCLIENT_VERSIONS = ("0.8.0a2",)
+# the unixfs types of the links returned by the `ls` endpoint
+UNIXFS_DIRECTORY = 1
+UNIXFS_FILE = 2
+DEFAULT_CACHE_MAX_SIZE = 64 * 1024 * 1024
+DEFAULT_CACHE_MAX_DISK_SIZE = 1024 * 1024 * 1024
+DEFAULT_MAX_WORKERS = 4
+# the maximum number of requests of each operation that are being processed at the same time
+DEFAULT_MAX_IN_FLIGHT = {"store_files": 2, "get_files": 4}
+# the maximum number of requests of each operation that are being processed or waiting to be
+DEFAULT_MAX_PENDING = 64
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_BACKOFF = 0.5
+# the reason of the error which is replied when there are too many pending requests, the requester should back off
+OVERLOADED_REASON = "The IPFS node is overloaded, please retry later."
+TRANSIENT_IPFS_ERRORS = (
+    IPFSConnectionError,
+    IPFSProtocolError,
+    IPFSTimeoutError,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+ReturnType = TypeVar("ReturnType")
+
+
+def encode_file(data: str) -> bytes:
+    """Encode the content of a file, as received from the protocol."""
+    return data.encode(FILE_ENCODING)
+
+
+def decode_file(data: bytes) -> str:
+    """
+    Decode the content of a file, so that it can be sent via the protocol.
+
+    :param data: the content of the file.
+    :return: the decoded content.
+    :raises ValueError: if the file is not a text file, as it cannot be represented by the protocol.
+    """
+    try:
+        return data.decode(FILE_ENCODING)
+    except UnicodeDecodeError as e:
+        raise ValueError(
+            f"The file is not a valid {FILE_ENCODING} text file and cannot be sent via the protocol: {e}"
+        ) from e
+
+
+class InMemoryFilesStream(StreamBase, StreamFileMixin):
+    """
+    Encodes in-memory files as `multipart/form-data`, ready to be added to IPFS.
+
+    If a directory name is given, the files are nested under it,
+    the same way `ipfshttpclient` streams a directory from the disk.
+    """
+
+    def __init__(self, files: Dict[str, bytes], dirname: Optional[str] = None) -> None:
+        """Initialize the stream."""
+        self.files = files
+        self.dirname = dirname
+        super().__init__(dirname or "files")
+
+    def _body(self) -> Generator[bytes, Any, Any]:
+        """Yields the body of the stream."""
+        prefix = ""
+        if self.dirname is not None:
+            # a directory is represented as a special empty file
+            yield from self._gen_file(
+                self.dirname, content_type="application/x-directory"
+            )
+            prefix = f"{self.dirname}/"
+        for filename, data in self.files.items():
+            yield from self._gen_file(prefix + filename, file=io.BytesIO(data))
+        yield from self._gen_end()
+
+
+class InMemoryFilesAdder:  # pylint: disable=too-few-public-methods
+    """
+    Adds in-memory files to IPFS, via the HTTP client of an `ipfshttpclient.Client`.
+
+    The public `Client.add` can only stream a directory from the disk, and it flattens the files' paths,
+    therefore, the request is sent via `Client._client.request`, with the same options that `Client.add` uses.
+    As this is not part of the public API, it is only used with the `ipfshttpclient` versions it is known to work with.
+    """
+
+    options = {
+        "trickle": False,
+        "only-hash": False,
+        "wrap-with-directory": True,
+        "pin": True,
+        "raw-leaves": False,
+        "nocopy": False,
+    }
+
+    def __init__(self, client: ipfshttpclient.Client) -> None:
+        """
+        Initialize the adder.
+
+        :param client: the IPFS client.
+        :raises ValueError: if the version of `ipfshttpclient` is not supported.
+        """
+        if ipfshttpclient.__version__ not in SUPPORTED_IPFSHTTPCLIENT_VERSIONS:
+            raise ValueError(
+                f"`ipfshttpclient=={ipfshttpclient.__version__}` is not supported for adding in-memory files. "
+                f"Supported versions: {SUPPORTED_IPFSHTTPCLIENT_VERSIONS}."
+            )
+        self._request = client._client.request  # pylint: disable=protected-access
+
+    def add(self, files: Dict[str, bytes], dirname: Optional[str] = None) -> str:
+        """
+        Add the given files to IPFS, wrapped with a directory, as `IPFSTool.add` does.
+
+        :param files: the content of the files, keyed by their names.
+        :param dirname: the name of the directory the files belong to, if any.
+        :return: the hash of the wrapping directory.
+        """
+        stream = InMemoryFilesStream(files, dirname)
+        response = self._request(
+            "/add",
+            decoder="json",
+            data=stream.body(),
+            headers=stream.headers(),
+            opts=self.options,
+        )
+        return response[-1]["Hash"]
+
 
 class IpfsDialogues(BaseIpfsDialogues):
     """A class to keep track of IPFS dialogues."""
@@ -87,8 +220,27 @@ class IpfsConnection(Connection):
         super().__init__(**kwargs)  # pragma: no cover
         ipfs_domain = self.configuration.config.get("ipfs_domain")
         self.ipfs_tool: IPFSTool = IPFSTool(ipfs_domain)
+        self.files_adder = InMemoryFilesAdder(self.ipfs_tool.client)
+        config = self.configuration.config
+        self.cache = IpfsCache(
+            max_size=config.get("cache_max_size", DEFAULT_CACHE_MAX_SIZE),
+            cache_dir=config.get("cache_dir"),
+            max_disk_size=config.get(
+                "cache_max_disk_size", DEFAULT_CACHE_MAX_DISK_SIZE
+            ),
+        )
+        self.max_workers: int = config.get("max_workers", DEFAULT_MAX_WORKERS)
+        self.max_in_flight: Dict[str, int] = {
+            **DEFAULT_MAX_IN_FLIGHT,
+            **config.get("max_in_flight", {}),
+        }
+        self.max_pending: int = config.get("max_pending", DEFAULT_MAX_PENDING)
+        self.max_retries: int = config.get("max_retries", DEFAULT_MAX_RETRIES)
+        self.retry_backoff: float = config.get("retry_backoff", DEFAULT_RETRY_BACKOFF)
         self.task_to_request: Dict[asyncio.Future, Envelope] = {}
         self.loop_executor: Optional[Executor] = None
+        self._in_flight_limits: Dict[str, asyncio.Semaphore] = {}
+        self._pending: Dict[str, int] = defaultdict(int)
         self.dialogues = IpfsDialogues(connection_id=PUBLIC_ID)
         self._response_envelopes: Optional[asyncio.Queue] = None
 
@@ -105,6 +257,13 @@ class IpfsConnection(Connection):
         """Set up the connection."""
         self.ipfs_tool.check_ipfs_node_running()
         self._response_envelopes = asyncio.Queue()
+        self.loop_executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="ipfs"
+        )
+        self._in_flight_limits = {
+            operation: asyncio.Semaphore(limit)
+            for operation, limit in self.max_in_flight.items()
+        }
         self.state = ConnectionStates.connected
 
     async def disconnect(self) -> None:
@@ -118,6 +277,9 @@ class IpfsConnection(Connection):
             if not task.cancelled():  # pragma: nocover
                 task.cancel()
         self._response_envelopes = None
+        if self.loop_executor is not None:
+            self.loop_executor.shutdown(wait=False)
+            self.loop_executor = None
 
         self.state = ConnectionStates.disconnected
 
@@ -132,17 +294,61 @@ class IpfsConnection(Connection):
         return await self.response_envelopes.get()
 
     def run_async(
-        self, func: Callable, *args: Any, timeout: Optional[float] = None
+        self,
+        func: Callable,
+        *args: Any,
+        timeout: Optional[float] = None,
+        operation: Optional[str] = None,
     ) -> Task:
-        """Run a function asynchronously by using threads."""
+        """
+        Run a function asynchronously by using the connection's worker threads.
+
+        If the function times out, the task fails, but the worker thread cannot be interrupted,
+        so the function should stop by itself, e.g., by respecting the same deadline.
+
+        :param func: the function to run.
+        :param args: the positional arguments of the function.
+        :param timeout: the timeout for running the function.
+        :param operation: the operation the function performs, to respect its in-flight limit.
+        :return: the task running the function.
+        """
+        task = self.loop.create_task(
+            self._run_in_executor(func, *args, timeout=timeout, operation=operation)
+        )
+        if operation is not None:
+            self._pending[operation] += 1
+            task.add_done_callback(partial(self._complete_pending, operation))
+        return task
+
+    async def _run_in_executor(
+        self,
+        func: Callable,
+        *args: Any,
+        timeout: Optional[float] = None,
+        operation: Optional[str] = None,
+    ) -> Any:
+        """
+        Run a function in the executor, waiting for an in-flight slot of its operation first.
+
+        The slot is released once the worker thread has finished, and not when the request times out,
+        so that the in-flight limit keeps bounding the load on the node while it is slow to respond.
+        """
+        limit = self._in_flight_limits.get(operation) if operation else None
+        if limit is not None:
+            await limit.acquire()
         ipfs_operation = self.loop.run_in_executor(
             self.loop_executor,
             func,
             *args,
         )
-        timely_operation = asyncio.wait_for(ipfs_operation, timeout=timeout)
-        task = self.loop.create_task(timely_operation)
-        return task
+        if limit is not None:
+            ipfs_operation.add_done_callback(lambda _: limit.release())
+        # the operation is shielded, so that a timeout does not mark it as done while its thread is still running
+        return await asyncio.wait_for(asyncio.shield(ipfs_operation), timeout=timeout)
+
+    def _complete_pending(self, operation: str, _task: asyncio.Future) -> None:
+        """Mark a pending request of the given operation as completed."""
+        self._pending[operation] -= 1
 
     def _handle_envelope(self, envelope: Envelope) -> Task:
         """Handle incoming envelopes by dispatching background tasks."""
@@ -155,11 +361,27 @@ class IpfsConnection(Connection):
             task = self.run_async(self._handle_error, err)
             return task
         dialogue = self.dialogues.update(message)
-        task = self.run_async(handler, message, dialogue)
+        operation = performative.value
+        if self._pending[operation] >= self.max_pending:
+            # let the skill know that it should back off, instead of queueing the request indefinitely
+            err = (
+                f"Too many pending `{operation}` requests ({self._pending[operation]}). "
+                f"{OVERLOADED_REASON}"
+            )
+            self.logger.warning(err)
+            return self.run_async(self._handle_error, err, dialogue)
+        timeout = message.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        task = self.run_async(
+            handler, message, dialogue, deadline, timeout=timeout, operation=operation
+        )
         return task
 
     def _handle_store_files(
-        self, message: IpfsMessage, dialogue: BaseDialogue
+        self,
+        message: IpfsMessage,
+        dialogue: BaseDialogue,
+        deadline: Optional[float] = None,
     ) -> IpfsMessage:
         """
         Handle a STORE_FILES performative.
@@ -167,6 +389,8 @@ class IpfsConnection(Connection):
         Uploads the provided files to ipfs.
 
         :param message: The ipfs request.
+        :param dialogue: the dialogue of the request.
+        :param deadline: the `time.monotonic` deadline of the request, after which it is not retried.
         :returns: the hash of the uploaded files.
         """
         files = message.files
@@ -174,12 +398,8 @@ class IpfsConnection(Connection):
             err = "No files were present."
             self.logger.error(err)
             return self._handle_error(err, dialogue)
-        if len(files) == 1:
-            # a single file needs to be stored,
-            # we don't need to create a dir
-            path, data = files.popitem()
-            self.__create_file(path, data)
-        else:
+        dirname: Optional[str] = None
+        if len(files) > 1:
             # multiple files are present, which means that it's a directory
             # we begin by checking that they belong to the same directory
             dirs = {os.path.dirname(path) for path in files.keys()}
@@ -191,26 +411,26 @@ class IpfsConnection(Connection):
                     "make sure the their path matches to one directory only."
                 )
                 return self._handle_error(err, dialogue)
-
-            # "path" is the directory, it's the same for all the files
-            path = dirs.pop()
-            os.makedirs(path, exist_ok=True)
-            for file_path, data in files.items():
-                self.__create_file(file_path, data)
+            dirname = os.path.basename(os.path.normpath(dirs.pop()))
         try:
-            # note that path will be a dir if multiple files
-            # are being uploaded.
-            _, hash_, _ = self.ipfs_tool.add(path)
+            contents = {
+                os.path.basename(path): encode_file(data)
+                for path, data in files.items()
+            }
+            hash_ = self._with_retries(
+                self._add_files, contents, dirname, deadline=deadline
+            )
             self.logger.debug(f"Successfully stored files with hash: {hash_}.")
+            # the hash's files are known, no need to download them if they are requested later
+            self.cache.put(hash_, contents)
         except (
             ValueError,
+            IPFSClientError,
             requests.exceptions.ChunkedEncodingError,
         ) as e:  # pragma: no cover
             err = str(e)
             self.logger.error(err)
             return self._handle_error(err, dialogue)
-        finally:
-            self.__remove_filepath(path)
         response_message = cast(
             IpfsMessage,
             dialogue.reply(
@@ -222,7 +442,10 @@ class IpfsConnection(Connection):
         return response_message
 
     def _handle_get_files(
-        self, message: IpfsMessage, dialogue: BaseDialogue
+        self,
+        message: IpfsMessage,
+        dialogue: BaseDialogue,
+        deadline: Optional[float] = None,
     ) -> IpfsMessage:
         """
         Handle GET_FILES performative.
@@ -230,48 +453,131 @@ class IpfsConnection(Connection):
         Downloads and returns the files resulting from the ipfs hash.
 
         :param message: The ipfs request.
+        :param dialogue: the dialogue of the request.
+        :param deadline: the `time.monotonic` deadline of the request, after which it is not retried.
         :returns: the downloaded files.
         """
-        response_body: Dict[str, str] = {}
         ipfs_hash = message.ipfs_hash
-        with tempfile.TemporaryDirectory() as tmp_dir:
+        files = self.cache.get(ipfs_hash)
+        if files is not None:
+            self.logger.debug(
+                f"Got the files with hash {ipfs_hash} from the cache. "
+                f"Cache hit rate: {self.cache.hit_rate:.2%}."
+            )
+        else:
             try:
-                self.ipfs_tool.download(ipfs_hash, tmp_dir)
+                files = self._with_retries(
+                    self._get_files, ipfs_hash, deadline=deadline
+                )
             except (
-                DownloadError,
-                PermissionError,
-                ErrorResponse,
+                ValueError,
+                IPFSClientError,
+                requests.exceptions.ChunkedEncodingError,
             ) as e:
                 err = str(e)
                 self.logger.error(err)
                 return self._handle_error(err, dialogue)
+            self.cache.put(ipfs_hash, files)
 
-            files = os.listdir(tmp_dir)
-            if len(files) > 1:
+        try:
+            response_body = {path: decode_file(data) for path, data in files.items()}
+        except ValueError as e:
+            err = f"Cannot send the files with hash {ipfs_hash}. {e}"
+            self.logger.error(err)
+            return self._handle_error(err, dialogue)
+        response_message = cast(
+            IpfsMessage,
+            dialogue.reply(
+                performative=IpfsMessage.Performative.FILES,
+                files=response_body,
+                target_message=message,
+            ),
+        )
+        return response_message
+
+    def _with_retries(
+        self,
+        func: Callable[..., ReturnType],
+        *args: Any,
+        deadline: Optional[float] = None,
+    ) -> ReturnType:
+        """
+        Perform an IPFS operation, retrying with an exponential backoff on transient errors.
+
+        If a deadline is given, the operation is not attempted once it has passed,
+        and it is not retried if the backoff would exceed it, as the requester is not waiting anymore.
+
+        :param func: the function performing the operation.
+        :param args: the positional arguments of the function.
+        :param deadline: the `time.monotonic` deadline of the operation.
+        :return: the result of the operation.
+        :raises IPFSTimeoutError: if the deadline has passed before the operation was attempted.
+        """
+        if deadline is not None and time.monotonic() >= deadline:
+            raise IPFSTimeoutError(
+                None, "The request's deadline passed before it was processed."
+            )
+        attempt = 0
+        while True:
+            try:
+                return func(*args)
+            except TRANSIENT_IPFS_ERRORS as e:
+                backoff = self.retry_backoff * 2**attempt
+                if attempt >= self.max_retries or (
+                    deadline is not None and time.monotonic() + backoff >= deadline
+                ):
+                    raise
+                attempt += 1
                 self.logger.warning(
-                    f"Multiple files or dirs found in {tmp_dir}. "
-                    f"The first will be used. "
+                    f"Transient IPFS error: {e}. "
+                    f"Retrying in {backoff} seconds ({attempt}/{self.max_retries})..."
                 )
-            downloaded_file = files.pop()
-            files_to_be_read = [downloaded_file]
-            base_dir = Path(tmp_dir)
-            if os.path.isdir(base_dir / downloaded_file):
-                base_dir = base_dir / downloaded_file
-                files_to_be_read = os.listdir(base_dir)
-
-            for file_path in files_to_be_read:
-                with open(base_dir / file_path, encoding="utf-8", mode="r") as file:
-                    response_body[file_path] = file.read()
-
-            response_message = cast(
-                IpfsMessage,
-                dialogue.reply(
-                    performative=IpfsMessage.Performative.FILES,
-                    files=response_body,
-                    target_message=message,
-                ),
+                time.sleep(backoff)
+
+    def _add_files(self, files: Dict[str, bytes], dirname: Optional[str]) -> str:
+        """
+        Add the given files to IPFS, streaming them directly from memory.
+
+        The files are wrapped with a directory, as `IPFSTool.add` does,
+        so that the resulting hash matches the one of the same files uploaded from the disk.
+
+        :param files: the content of the files, keyed by their names.
+        :param dirname: the name of the directory the files belong to, if any.
+        :return: the hash of the wrapping directory.
+        """
+        return self.files_adder.add(files, dirname)
+
+    def _get_files(self, ipfs_hash: str) -> Dict[str, bytes]:
+        """
+        Get the files that correspond to the given hash, without writing them to the disk.
+
+        The protocol can only represent a flat directory, so nested directories are not supported.
+
+        :param ipfs_hash: the hash of a file, or of a directory wrapping a file or a directory.
+        :return: the content of the files, keyed by their names.
+        :raises ValueError: if the directory contains subdirectories.
+        """
+        links = self.__list_links(ipfs_hash)
+        if len(links) == 0:
+            # the hash corresponds to a file
+            return {ipfs_hash: self.ipfs_tool.client.cat(ipfs_hash)}
+
+        if len(links) == 1 and links[0]["Type"] == UNIXFS_DIRECTORY:
+            # the hash corresponds to a wrapped directory
+            links = self.__list_links(links[0]["Hash"])
+
+        subdirs = [link["Name"] for link in links if link["Type"] == UNIXFS_DIRECTORY]
+        if subdirs:
+            raise ValueError(
+                f"The directory with hash {ipfs_hash} contains the subdirectories {subdirs}, "
+                "but nested directories are not supported."
             )
-            return response_message
+
+        return {
+            link["Name"]: self.ipfs_tool.client.cat(link["Hash"])
+            for link in links
+            if link["Type"] == UNIXFS_FILE
+        }
 
     def _handle_error(  # pylint: disable=no-self-use
         self, reason: str, dialogue: BaseDialogue
@@ -293,7 +599,14 @@ class IpfsConnection(Connection):
         :param task: the done task.
         """
         request = self.task_to_request.pop(task)
-        response_message: Optional[Message] = task.result()
+        try:
+            response_message: Optional[Message] = task.result()
+        except asyncio.TimeoutError:
+            # the worker thread may still be running, but the requester should not wait for it anymore
+            err = "The IPFS request timed out."
+            self.logger.warning(err)
+            dialogue = self.dialogues.get_dialogue(cast(IpfsMessage, request.message))
+            response_message = self._handle_error(err, cast(BaseDialogue, dialogue))
 
         response_envelope = None
         if response_message is not None:
@@ -307,17 +620,7 @@ class IpfsConnection(Connection):
         # not handling `asyncio.QueueFull` exception, because the maxsize we defined for the Queue is infinite
         self.response_envelopes.put_nowait(response_envelope)
 
-    @staticmethod
-    def __create_file(path: str, data: str) -> None:
-        """Creates a file in the specified path."""
-        with open(path, "w", encoding="utf-8") as f:
-            f.write(data)
-
-    def __remove_filepath(self, filepath: str) -> None:
-        """Remove a file or a folder. If filepath is not a file or a folder, an `IPFSInteractionError` is raised."""
-        if os.path.isfile(filepath):
-            os.remove(filepath)
-        elif os.path.isdir(filepath):
-            rmtree(filepath)
-        else:  # pragma: no cover
-            self.logger.error(f"`{filepath}` is not an existing filepath!")
+    def __list_links(self, ipfs_hash: str) -> List[Dict[str, Any]]:
+        """List the named links of the given hash, the links of a file's chunks are unnamed."""
+        (ipfs_object,) = self.ipfs_tool.client.ls(ipfs_hash)["Objects"]
+        return [link for link in ipfs_object["Links"] if link["Name"]]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2023-2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the ipfs connection's cache."""
+
+import os
+from pathlib import Path
+
+from packages.valory.connections.ipfs.cache import IpfsCache
+
+
+DUMMY_FILES = {"file1": b"12345", "file2": b"67890"}
+
+
+def test_memory_cache() -> None:
+    """Test the in-memory LRU cache."""
+    cache = IpfsCache(max_size=20)
+    assert cache.get("cid1") is None
+    cache.put("cid1", DUMMY_FILES)
+    cache.put("cid2", DUMMY_FILES)
+    assert cache.size == 20
+    assert cache.get("cid1") == DUMMY_FILES
+
+    # `cid2` is the least recently used entry
+    cache.put("cid3", DUMMY_FILES)
+    assert "cid2" not in cache
+    assert cache.get("cid1") == DUMMY_FILES
+    assert cache.get("cid3") == DUMMY_FILES
+    assert cache.size == 20
+
+    # entries larger than the cache are not kept
+    cache.put("cid4", {"file": bytes(21)})
+    assert "cid4" not in cache
+
+    assert cache.hits == 3
+    assert cache.misses == 1
+    assert cache.hit_rate == 0.75
+
+
+def test_cached_files_are_copied() -> None:
+    """Test that mutating the files does not affect the cached entries."""
+    cache = IpfsCache(max_size=20)
+    files = dict(DUMMY_FILES)
+    cache.put("cid", files)
+    files.pop("file1")
+    cached = cache.get("cid")
+    assert cached == DUMMY_FILES
+    cached.pop("file1")  # type: ignore
+    assert cache.get("cid") == DUMMY_FILES
+
+
+def test_disk_cache(tmp_path: Path) -> None:
+    """Test the on-disk cache."""
+    cache = IpfsCache(max_size=0, cache_dir=str(tmp_path), max_disk_size=20)
+    cache.put("cid1", DUMMY_FILES)
+    cache.put("cid2", DUMMY_FILES)
+    assert cache.size == 0
+    assert cache.disk_size == 20
+    assert cache.get("cid1") == DUMMY_FILES
+    assert cache.disk_hits == 1
+
+    # `cid2` is the least recently used entry
+    cache.put("cid3", DUMMY_FILES)
+    assert sorted(os.listdir(tmp_path)) == ["cid1", "cid3"]
+
+    # unsafe file names are not written to the disk
+    cache.put("cid4", {"..": b""})
+    assert sorted(os.listdir(tmp_path)) == ["cid1", "cid3"]
+
+
+def test_disk_cache_is_shared(tmp_path: Path) -> None:
+    """Test that the on-disk cache is shared between caches using the same directory."""
+    cache = IpfsCache(max_size=20, cache_dir=str(tmp_path), max_disk_size=20)
+    other_cache = IpfsCache(max_size=20, cache_dir=str(tmp_path), max_disk_size=20)
+    cache.put("cid", DUMMY_FILES)
+    assert other_cache.get("cid") == DUMMY_FILES
+    assert other_cache.disk_size == 10
+
+    # the entries on the disk are indexed on startup
+    new_cache = IpfsCache(max_size=20, cache_dir=str(tmp_path), max_disk_size=5)
+    assert "cid" not in new_cache
+    assert os.listdir(tmp_path) == []
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2023 Valory AG
+#   Copyright 2023-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -20,29 +20,43 @@
 
 """Tests for ipfs connection."""
 import asyncio
-import os
-import platform
+import re
 import tempfile
+import time
+from pathlib import Path
 from typing import Dict, List, Optional
 from unittest import mock
 from unittest.mock import MagicMock
 
+import ipfshttpclient
 import pytest
 from aea.configurations.base import ConnectionConfig
 from aea.connections.base import ConnectionStates
 from aea.mail.base import Envelope
-from aea_cli_ipfs.exceptions import DownloadError
-from aea_cli_ipfs.ipfs_utils import IPFSTool
 from aea_test_autonomy.fixture_helpers import (  # noqa: F401; pylint: disable=unused-import
     LOCAL_IPFS,
     ipfs_daemon,
     use_ipfs_daemon,
 )
+from ipfshttpclient.exceptions import ConnectionError as IPFSConnectionError
+from ipfshttpclient.exceptions import ErrorResponse
+from ipfshttpclient.exceptions import TimeoutError as IPFSTimeoutError
+from ipfshttpclient.multipart import DirectoryStream, FilesStream, StreamBase
 
 from packages.valory.connections.ipfs.connection import (
+    DEFAULT_MAX_RETRIES,
+    DEFAULT_RETRY_BACKOFF,
+    InMemoryFilesAdder,
+    InMemoryFilesStream,
     IpfsConnection,
     IpfsDialogues,
+    OVERLOADED_REASON,
     PUBLIC_ID,
+    SUPPORTED_IPFSHTTPCLIENT_VERSIONS,
+    UNIXFS_DIRECTORY,
+    UNIXFS_FILE,
+    decode_file,
+    encode_file,
 )
 from packages.valory.protocols.ipfs import IpfsMessage
 
@@ -150,6 +164,29 @@ class TestIpfsConnection:
         self.connection._handle_done_task(dummy_task)
         assert self.connection.response_envelopes.qsize() == 1
 
+    @pytest.mark.asyncio
+    async def test_handle_done_task_timeout(self) -> None:
+        """Test that _handle_done_task replies with an error when the request has timed out."""
+        await self.connection.connect()
+        skill_dialogues = IpfsDialogues(connection_id=ANY_SKILL)
+        request, _ = skill_dialogues.create(
+            counterparty=str(PUBLIC_ID),
+            performative=IpfsMessage.Performative.GET_FILES,
+            ipfs_hash="dummy_hash",
+            timeout=1.0,
+        )
+        self.connection.dialogues.update(request)
+        dummy_task = MagicMock(result=MagicMock(side_effect=asyncio.TimeoutError))
+        self.connection.task_to_request[dummy_task] = Envelope(
+            to=str(PUBLIC_ID), sender=ANY_SKILL, message=request
+        )
+        self.connection._handle_done_task(dummy_task)
+        response_envelope = self.connection.response_envelopes.get_nowait()
+        response = response_envelope.message
+        assert response.performative == IpfsMessage.Performative.ERROR
+        assert response.reason == "The IPFS request timed out."
+        assert response.target == request.message_id
+
     def test_handle_error(self) -> None:
         """Test handle_error."""
         message = self.connection._handle_error(
@@ -179,6 +216,117 @@ class TestIpfsConnection:
             await asyncio.sleep(1)
             mock_logger.assert_called_with(dummy_log)
 
+    @pytest.mark.asyncio
+    async def test_run_async_in_flight_limit(self) -> None:
+        """Test that run async respects the in-flight limit of an operation."""
+        self.connection.max_in_flight["store_files"] = 1
+        await self.connection.connect()
+        in_flight = []
+        max_in_flight = 0
+
+        def dummy_operation() -> None:
+            """A dummy handler."""
+            nonlocal max_in_flight
+            in_flight.append(None)
+            max_in_flight = max(max_in_flight, len(in_flight))
+            time.sleep(0.1)
+            in_flight.pop()
+
+        tasks = [
+            self.connection.run_async(dummy_operation, operation="store_files")
+            for _ in range(3)
+        ]
+        assert self.connection._pending["store_files"] == 3
+        await asyncio.gather(*tasks)
+        assert max_in_flight == 1
+        assert self.connection._pending["store_files"] == 0
+        await self.connection.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_run_async_timeout_holds_slot(self) -> None:
+        """Test that a timed out operation holds its in-flight slot until its thread finishes."""
+        self.connection.max_in_flight["store_files"] = 1
+        await self.connection.connect()
+        limit = self.connection._in_flight_limits["store_files"]
+        finished = asyncio.Event()
+        loop = asyncio.get_running_loop()
+
+        def dummy_operation() -> None:
+            """A dummy handler, slower than the timeout."""
+            time.sleep(0.3)
+            loop.call_soon_threadsafe(finished.set)
+
+        task = self.connection.run_async(
+            dummy_operation, timeout=0.05, operation="store_files"
+        )
+        with pytest.raises(asyncio.TimeoutError):
+            await task
+        assert self.connection._pending["store_files"] == 0
+        assert limit.locked()
+        await finished.wait()
+        # let the done callback of the operation run
+        await asyncio.sleep(0)
+        assert not limit.locked()
+        await self.connection.disconnect()
+
+    def test_handle_envelope_overloaded(self) -> None:
+        """Test that _handle_envelope rejects requests when too many are pending."""
+        self.connection._pending["get_files"] = self.connection.max_pending
+        with mock.patch.object(IpfsConnection, "run_async") as mock_run_async:
+            self.connection._handle_envelope(self.dummy_envelope)
+        func, reason, _ = mock_run_async.call_args.args
+        assert func == self.connection._handle_error
+        assert reason.startswith("Too many pending `get_files` requests")
+        assert reason.endswith(OVERLOADED_REASON)
+
+    def test_handle_envelope_deadline(self) -> None:
+        """Test that _handle_envelope runs a request within its timeout."""
+        message = IpfsMessage(performative=IpfsMessage.Performative.GET_FILES, timeout=5.0)  # type: ignore
+        envelope = Envelope(to=str(PUBLIC_ID), sender=ANY_SKILL, message=message)
+        with mock.patch.object(IpfsConnection, "run_async") as mock_run_async:
+            self.connection._handle_envelope(envelope)
+        _, _, _, deadline = mock_run_async.call_args.args
+        assert mock_run_async.call_args.kwargs["timeout"] == 5.0
+        assert 0 < deadline - time.monotonic() <= 5.0
+
+    @pytest.mark.parametrize("failures", (0, 1, DEFAULT_MAX_RETRIES))
+    def test_with_retries(self, failures: int) -> None:
+        """Test that transient IPFS errors are retried."""
+        side_effect = [IPFSConnectionError("dummy error")] * failures + ["result"]
+        func = MagicMock(side_effect=side_effect)
+        with mock.patch.object(time, "sleep") as mock_sleep:
+            assert self.connection._with_retries(func, "arg") == "result"
+        func.assert_called_with("arg")
+        assert [call.args[0] for call in mock_sleep.call_args_list] == [
+            DEFAULT_RETRY_BACKOFF * 2**attempt for attempt in range(failures)
+        ]
+
+    def test_with_retries_exhausted(self) -> None:
+        """Test that transient IPFS errors are raised when the retries are exhausted."""
+        func = MagicMock(side_effect=IPFSConnectionError("dummy error"))
+        with mock.patch.object(time, "sleep"), pytest.raises(IPFSConnectionError):
+            self.connection._with_retries(func)
+        assert func.call_count == DEFAULT_MAX_RETRIES + 1
+
+    def test_with_retries_deadline_passed(self) -> None:
+        """Test that an operation is not attempted once its deadline has passed."""
+        func = MagicMock()
+        with pytest.raises(IPFSTimeoutError):
+            self.connection._with_retries(func, deadline=time.monotonic() - 1)
+        func.assert_not_called()
+
+    def test_with_retries_deadline(self) -> None:
+        """Test that an operation is not retried if the backoff would exceed its deadline."""
+        func = MagicMock(side_effect=IPFSConnectionError("dummy error"))
+        # enough time for the first backoff only
+        deadline = time.monotonic() + DEFAULT_RETRY_BACKOFF * 2
+        with mock.patch.object(time, "sleep") as mock_sleep, pytest.raises(
+            IPFSConnectionError
+        ):
+            self.connection._with_retries(func, deadline=deadline)
+        assert func.call_count == 2
+        mock_sleep.assert_called_once_with(DEFAULT_RETRY_BACKOFF)
+
     @pytest.mark.parametrize(
         ("files", "expected_log", "log_level"),
         [
@@ -223,48 +371,107 @@ class TestIpfsConnection:
             assert message is not None
             mock_logger.assert_called_with(expected_log)
 
-    @pytest.mark.skipif(
-        platform.system() == "Windows",
-        reason="PermissionError: [Errno 13] Permission denied",
+    @pytest.mark.parametrize(
+        ("links", "expected_files"),
+        [
+            ([], {"dummy_hash": b"dummy_data"}),
+            (
+                [[{"Name": "file", "Hash": "file_hash", "Type": UNIXFS_FILE}]],
+                {"file": b"dummy_data"},
+            ),
+            (
+                [
+                    [{"Name": "dir", "Hash": "dir_hash", "Type": UNIXFS_DIRECTORY}],
+                    [
+                        {"Name": "file1", "Hash": "hash1", "Type": UNIXFS_FILE},
+                        {"Name": "file2", "Hash": "hash2", "Type": UNIXFS_FILE},
+                        {"Name": "", "Hash": "chunk_hash", "Type": UNIXFS_FILE},
+                    ],
+                ],
+                {"file1": b"dummy_data", "file2": b"dummy_data"},
+            ),
+        ],
     )
+    def test_get_files(
+        self, links: List[List[Dict]], expected_files: Dict[str, bytes]
+    ) -> None:
+        """Test _get_files"""
+        ls_responses = [{"Objects": [{"Links": links_}]} for links_ in links or [[]]]
+        with mock.patch.object(
+            self.connection.ipfs_tool.client, "ls", side_effect=ls_responses
+        ), mock.patch.object(
+            self.connection.ipfs_tool.client, "cat", return_value=b"dummy_data"
+        ):
+            files = self.connection._get_files("dummy_hash")
+        assert files == expected_files
+
+    def test_get_files_nested_dirs(self) -> None:
+        """Test that _get_files raises for directories with subdirectories."""
+        links = [
+            [{"Name": "dir", "Hash": "dir_hash", "Type": UNIXFS_DIRECTORY}],
+            [
+                {"Name": "file", "Hash": "file_hash", "Type": UNIXFS_FILE},
+                {"Name": "subdir", "Hash": "subdir_hash", "Type": UNIXFS_DIRECTORY},
+            ],
+        ]
+        ls_responses = [{"Objects": [{"Links": links_}]} for links_ in links]
+        with mock.patch.object(
+            self.connection.ipfs_tool.client, "ls", side_effect=ls_responses
+        ), pytest.raises(
+            ValueError, match=re.escape("contains the subdirectories ['subdir']")
+        ):
+            self.connection._get_files("dummy_hash")
+
     @pytest.mark.parametrize(
-        ("extra_files", "download_side_effect", "is_dir"),
+        ("data", "get_side_effect", "expected_performative"),
         [
-            ([], None, False),
-            (["dummy_unexpected_extra_file"], None, False),
-            ([], DownloadError, False),
-            ([], None, True),
+            ("ünïcødé ✓".encode(), None, IpfsMessage.Performative.FILES),
+            (b"\xff\xfe not utf-8", None, IpfsMessage.Performative.ERROR),
+            (
+                b"dummy_data",
+                ErrorResponse("dummy error", None),
+                IpfsMessage.Performative.ERROR,
+            ),
         ],
     )
     def test_handle_get_files(
         self,
-        extra_files: List[str],
-        download_side_effect: Optional[Exception],
-        is_dir: bool,
+        data: bytes,
+        get_side_effect: Optional[Exception],
+        expected_performative: IpfsMessage.Performative,
     ) -> None:
         """Test _handle_get_files"""
-        with tempfile.NamedTemporaryFile() as tmp_file, mock.patch.object(
-            os,
-            "listdir",
-        ) as mock_listdir, mock.patch.object(
-            IPFSTool, "download", side_effect=download_side_effect
+        with mock.patch.object(
+            IpfsConnection,
+            "_get_files",
+            return_value={"file": data},
+            side_effect=get_side_effect,
         ):
-            listdir_value = [extra_files + [tmp_file.name]]
-            if is_dir:
-                listdir_value = [["/tmp"]] + listdir_value  # nosec
-            mock_listdir.side_effect = listdir_value
-
-            tmp_file.write(b"dummy_data")
-            tmp_file.flush()
-
-            _, ipfs_hash, _ = self.connection.ipfs_tool.add(tmp_file.name)
             message = IpfsMessage(
-                performative=IpfsMessage.Performative.GET_FILES, ipfs_hash=ipfs_hash  # type: ignore
+                performative=IpfsMessage.Performative.GET_FILES, ipfs_hash="dummy_hash"  # type: ignore
             )
             dialogue = MagicMock()
             message = self.connection._handle_get_files(message, dialogue)
             assert message is not None
 
+        reply_kwargs = dialogue.reply.call_args.kwargs
+        assert reply_kwargs["performative"] == expected_performative
+        if expected_performative == IpfsMessage.Performative.FILES:
+            assert encode_file(reply_kwargs["files"]["file"]) == data
+
+    def test_handle_get_files_cached(self) -> None:
+        """Test that _handle_get_files does not download the files more than once."""
+        message = IpfsMessage(
+            performative=IpfsMessage.Performative.GET_FILES, ipfs_hash="dummy_hash"  # type: ignore
+        )
+        with mock.patch.object(
+            IpfsConnection, "_get_files", return_value={"file": b"dummy_data"}
+        ) as mock_get_files:
+            for _ in range(2):
+                self.connection._handle_get_files(message, MagicMock())
+        mock_get_files.assert_called_once()
+        assert self.connection.cache.hit_rate == 0.5
+
     def test_ipfs_dialogue(self) -> None:  # pylint: disable=no-self-use
         """Test 'IpfsDialogues' creation."""
         dialogues = IpfsDialogues(connection_id=str(PUBLIC_ID))
@@ -272,3 +479,64 @@ class TestIpfsConnection:
             counterparty=ANY_SKILL,
             performative=IpfsMessage.Performative.GET_FILES,
         )
+
+
+@pytest.mark.parametrize("is_dir", (True, False))
+def test_in_memory_files_stream(is_dir: bool) -> None:
+    """Test that `InMemoryFilesStream` encodes the files the same way as they are streamed from the disk."""
+    files = {"dummy_filename1": b"dummy_content", "dummy_filename2": bytes(range(256))}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        dir_path = Path(tmp_dir, "dummy_dir")
+        dir_path.mkdir()
+        for filename, data in files.items():
+            (dir_path / filename).write_bytes(data)
+
+        expected_stream: StreamBase
+        if is_dir:
+            expected_stream = DirectoryStream(str(dir_path), recursive=True)
+            stream = InMemoryFilesStream(files, "dummy_dir")
+        else:
+            expected_stream = FilesStream([str(dir_path / name) for name in files])
+            stream = InMemoryFilesStream(files)
+        stream._boundary = expected_stream._boundary
+        expected_body = b"".join(expected_stream.body())
+
+    # the `Abspath` headers are only used by the filestore, and do not affect the hash
+    expected_body = re.sub(rb"Abspath: [^\r]*\r\n", b"", expected_body)
+    # the files of a directory are streamed in the order they are listed on the disk
+    boundary = stream._boundary.encode()
+    body = b"".join(stream.body())
+    assert sorted(body.split(boundary)) == sorted(expected_body.split(boundary))
+
+
+def test_encode_decode_file() -> None:
+    """Test that text files survive the round-trip through the protocol, and that binary files are rejected."""
+    data = "ünïcødé ✓".encode()
+    assert encode_file(decode_file(data)) == data
+    assert decode_file(b"dummy_content") == "dummy_content"
+    with pytest.raises(ValueError, match="is not a valid utf-8 text file"):
+        decode_file(bytes(range(256)))
+
+
+def test_in_memory_files_adder() -> None:
+    """Test that `InMemoryFilesAdder` streams the files via the client's HTTP client."""
+    client = MagicMock()
+    client._client.request.return_value = [
+        {"Name": "dummy_filename", "Hash": "file_hash"},
+        {"Name": "", "Hash": "wrapper_hash"},
+    ]
+    adder = InMemoryFilesAdder(client)
+    assert adder.add({"dummy_filename": b"dummy_content"}) == "wrapper_hash"
+    request = client._client.request
+    request.assert_called_once()
+    assert request.call_args.args == ("/add",)
+    assert request.call_args.kwargs["opts"] == InMemoryFilesAdder.options
+
+
+def test_in_memory_files_adder_unsupported_version() -> None:
+    """Test that `InMemoryFilesAdder` is not used with an unsupported `ipfshttpclient` version."""
+    assert ipfshttpclient.__version__ in SUPPORTED_IPFSHTTPCLIENT_VERSIONS
+    with mock.patch.object(ipfshttpclient, "__version__", "0.0.0"), pytest.raises(
+        ValueError, match=re.escape("`ipfshttpclient==0.0.0` is not supported")
+    ):
+        InMemoryFilesAdder(MagicMock())
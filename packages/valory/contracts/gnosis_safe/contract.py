@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -37,6 +37,7 @@ from web3.exceptions import ContractLogicError, TransactionNotFound
 from web3.types import BlockIdentifier, Nonce, TxData, TxParams, Wei
 
 from packages.valory.contracts.gnosis_safe.encode import encode_typed_data
+from packages.valory.contracts.gnosis_safe.scanner import EventScanner
 from packages.valory.contracts.gnosis_safe_proxy_factory.contract import (
     GnosisSafeProxyFactoryContract,
 )
@@ -81,6 +82,8 @@ class GnosisSafeContract(Contract):
 
     contract_id = PUBLIC_ID
     _SENTINEL_OWNERS = "0x0000000000000000000000000000000000000001"
+    # scans the event logs incrementally, across calls
+    event_scanner = EventScanner()
 
     @classmethod
     def get_raw_transaction(
@@ -755,10 +758,12 @@ class GnosisSafeContract(Contract):
 
         ledger_api = cast(EthereumApi, ledger_api)
         factory_contract = cls.get_instance(ledger_api, contract_address)
-        entries = factory_contract.events.ExecutionSuccess.create_filter(
-            fromBlock=from_block,
-            toBlock=to_block,
-        ).get_all_entries()
+        entries = cls.event_scanner.get_logs(
+            ledger_api,
+            factory_contract.events.ExecutionSuccess(),
+            from_block=from_block,
+            to_block=to_block,
+        )
 
         return dict(
             txs=list(
@@ -793,10 +798,12 @@ class GnosisSafeContract(Contract):
         """
         ledger_api = cast(EthereumApi, ledger_api)
         safe_contract = cls.get_instance(ledger_api, contract_address)
-        entries = safe_contract.events.RemovedOwner.create_filter(
-            fromBlock=from_block,
-            toBlock=to_block,
-        ).get_all_entries()
+        entries = cls.event_scanner.get_logs(
+            ledger_api,
+            safe_contract.events.RemovedOwner(),
+            from_block=from_block,
+            to_block=to_block,
+        )
         if removed_owner is None:
             removed_owner_events = list(
                 dict(
@@ -849,11 +856,13 @@ class GnosisSafeContract(Contract):
         ledger_api = cast(EthereumApi, ledger_api)
         safe_contract = cls.get_instance(ledger_api, contract_address)
         sender_address = ledger_api.api.to_checksum_address(sender_address)
-        entries = safe_contract.events.SafeReceived.create_filter(
-            fromBlock=from_block,
-            toBlock=to_block,
+        entries = cls.event_scanner.get_logs(
+            ledger_api,
+            safe_contract.events.SafeReceived(),
+            from_block=from_block,
+            to_block=to_block,
             argument_filters=dict(sender=sender_address),
-        ).get_all_entries()
+        )
         zero_transfer_events = list(
             dict(
                 tx_hash=entry.transactionHash.hex(),
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Chunked and resumable scanner of contract event logs."""
+
+import logging
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from aea_ledger_ethereum import EthereumApi
+from requests import HTTPError, Timeout
+from web3.contract.contract import ContractEvent
+from web3.types import BlockIdentifier
+
+
+DEFAULT_MAX_CHUNK_SIZE = 10_000
+DEFAULT_MIN_CHUNK_SIZE = 1
+# the number of blocks behind the chain head which are considered final,
+# the logs of more recent blocks are queried on every scan and never checkpointed
+DEFAULT_REORG_DEPTH = 64
+DEFAULT_MAX_CHECKPOINTS = 256
+# the errors with which the RPCs reject a range of blocks which is too large,
+# e.g., too many results, a too wide range or a timeout
+RANGE_ERRORS = (ValueError, HTTPError, Timeout)
+
+ScanKey = Tuple[str, str, str, int, Tuple[Tuple[str, str], ...]]
+
+_logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """The logs of an event scanned up to a block."""
+
+    def __init__(self, last_block: int) -> None:
+        """Initialize the checkpoint."""
+        self.last_block = last_block
+        self.entries: List[Any] = []
+        # held while the checkpoint is extended, so that the same blocks are not scanned concurrently
+        self.lock = Lock()
+
+    def extend(self, last_block: int, entries: List[Any]) -> None:
+        """Extend the checkpoint with the logs of the blocks up to the given one."""
+        self.entries.extend(entries)
+        self.last_block = last_block
+
+
+class EventScanner:
+    """
+    Scanner of contract event logs.
+
+    The logs are queried in chunks of blocks, whose size is halved whenever the RPC
+    rejects the range and doubled again after each successful query. The logs of the
+    final blocks are checkpointed per chain, contract, event, filter and start block,
+    so that repeated scans only query the blocks which were not scanned yet.
+    A checkpoint is extended after each successful chunk, so that a failed scan
+    keeps the progress of the chunks which were scanned before the failure.
+    """
+
+    def __init__(
+        self,
+        max_chunk_size: int = DEFAULT_MAX_CHUNK_SIZE,
+        min_chunk_size: int = DEFAULT_MIN_CHUNK_SIZE,
+        reorg_depth: int = DEFAULT_REORG_DEPTH,
+        max_checkpoints: int = DEFAULT_MAX_CHECKPOINTS,
+    ) -> None:
+        """Initialize the scanner."""
+        self.max_chunk_size = max_chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.reorg_depth = reorg_depth
+        self.max_checkpoints = max_checkpoints
+        self.chunk_size = max_chunk_size
+        self._checkpoints: "OrderedDict[ScanKey, Checkpoint]" = OrderedDict()
+        self._lock = Lock()
+
+    @staticmethod
+    def _resolve_block(ledger_api: EthereumApi, block: BlockIdentifier) -> int:
+        """Get the number of a block."""
+        if isinstance(block, int):
+            return block
+        if block == "earliest":
+            return 0
+        if block == "latest":
+            return ledger_api.api.eth.block_number
+        if isinstance(block, str) and block.startswith("0x"):
+            return int(block, 16)
+        return ledger_api.api.eth.get_block(block)["number"]
+
+    @staticmethod
+    def _scan_key(
+        ledger_api: EthereumApi,
+        event: ContractEvent,
+        from_block: int,
+        argument_filters: Optional[Dict[str, Any]],
+    ) -> ScanKey:
+        """Get the key of a scan's checkpoint."""
+        endpoint = getattr(ledger_api.api.provider, "endpoint_uri", None)
+        filters = tuple(
+            sorted(
+                (name, repr(value)) for name, value in (argument_filters or {}).items()
+            )
+        )
+        return str(endpoint), event.address, event.event_name, from_block, filters
+
+    def _scan_chunks(
+        self,
+        event: ContractEvent,
+        from_block: int,
+        to_block: int,
+        argument_filters: Optional[Dict[str, Any]],
+    ) -> Iterator[Tuple[int, List[Any]]]:
+        """Get the logs of a range of blocks in chunks, yielding the last block and the logs of each chunk."""
+        start = from_block
+        while start <= to_block:
+            end = min(start + self.chunk_size - 1, to_block)
+            try:
+                logs = event.get_logs(
+                    argument_filters=argument_filters,
+                    fromBlock=start,
+                    toBlock=end,
+                )
+            except RANGE_ERRORS as e:
+                if self.chunk_size <= self.min_chunk_size:
+                    raise
+                self.chunk_size = max(self.min_chunk_size, self.chunk_size // 2)
+                _logger.info(
+                    f"Querying the {event.event_name} logs of blocks {start}-{end} failed with {e!r}. "
+                    f"Retrying with chunks of {self.chunk_size} blocks."
+                )
+                continue
+            yield end, logs
+            start = end + 1
+            self.chunk_size = min(self.max_chunk_size, self.chunk_size * 2)
+
+    def _get_logs(
+        self,
+        event: ContractEvent,
+        from_block: int,
+        to_block: int,
+        argument_filters: Optional[Dict[str, Any]],
+    ) -> List[Any]:
+        """Get the logs of a range of blocks, in chunks."""
+        chunks = self._scan_chunks(event, from_block, to_block, argument_filters)
+        return [entry for _end, logs in chunks for entry in logs]
+
+    def get_logs(
+        self,
+        ledger_api: EthereumApi,
+        event: ContractEvent,
+        from_block: BlockIdentifier = "earliest",
+        to_block: BlockIdentifier = "latest",
+        argument_filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Any]:
+        """
+        Get the logs of an event, resuming from the last scanned block.
+
+        :param ledger_api: the ledger API object.
+        :param event: the contract event.
+        :param from_block: from which block to search for events.
+        :param to_block: to which block to search for events.
+        :param argument_filters: the filters of the event's indexed arguments.
+        :return: the event logs, in the order in which they were emitted.
+        """
+        start = self._resolve_block(ledger_api, from_block)
+        end = self._resolve_block(ledger_api, to_block)
+        if to_block != "latest":
+            # a fixed range is not expected to be queried again
+            return self._get_logs(event, start, end, argument_filters)
+
+        key = self._scan_key(ledger_api, event, start, argument_filters)
+        final_block = end - self.reorg_depth
+        # the global lock only guards the checkpoints' registry, and it is not held during the RPCs,
+        # so that the scans of different keys do not wait for each other
+        with self._lock:
+            checkpoint = self._checkpoints.get(key)
+            if checkpoint is None:
+                checkpoint = self._checkpoints[key] = Checkpoint(start - 1)
+            self._checkpoints.move_to_end(key)
+            while len(self._checkpoints) > self.max_checkpoints:
+                self._checkpoints.popitem(last=False)
+
+        with checkpoint.lock:
+            if checkpoint.last_block < final_block:
+                chunks = self._scan_chunks(
+                    event, checkpoint.last_block + 1, final_block, argument_filters
+                )
+                for last_block, logs in chunks:
+                    checkpoint.extend(last_block, logs)
+            entries = list(checkpoint.entries)
+            tail_start = max(start, checkpoint.last_block + 1)
+
+        entries.extend(self._get_logs(event, tail_start, end, argument_filters))
+        return entries
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# ------------------------------------------------------------------------------
+#
+#   Copyright 2026 Valory AG
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+#
+# ------------------------------------------------------------------------------
+
+"""Tests for the event scanner."""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from unittest.mock import MagicMock
+
+import pytest
+
+from packages.valory.contracts.gnosis_safe.scanner import EventScanner
+
+
+class DummyEvent:
+    """An event with a log every 10 blocks, whose RPC rejects large ranges."""
+
+    address = "0xd9Db270c1B5E3Bd161E8c8503c55cEABeE709552"
+    event_name = "RemovedOwner"
+
+    def __init__(self, max_range: Optional[int] = None) -> None:
+        """Initialize the event."""
+        self.max_range = max_range
+        self.queries: List[Tuple[int, int]] = []
+
+    def get_logs(
+        self,
+        argument_filters: Optional[Dict[str, Any]],
+        fromBlock: int,  # pylint: disable=invalid-name
+        toBlock: int,  # pylint: disable=invalid-name
+    ) -> List[Dict[str, int]]:
+        """Get the logs of a range of blocks."""
+        self.queries.append((fromBlock, toBlock))
+        if self.max_range is not None and toBlock - fromBlock + 1 > self.max_range:
+            raise ValueError(
+                {"code": -32005, "message": "query returned too many results"}
+            )
+        return [
+            {"blockNumber": block}
+            for block in range(fromBlock, toBlock + 1)
+            if block % 10 == 0
+        ]
+
+
+def get_ledger_api(block_number: int) -> MagicMock:
+    """Get a ledger API whose chain is at the given block."""
+    ledger_api = MagicMock()
+    ledger_api.api.eth.block_number = block_number
+    ledger_api.api.provider.endpoint_uri = "http://localhost:8545"
+    return ledger_api
+
+
+def test_resume_scan() -> None:
+    """Test that the scans resume from the last final block."""
+    scanner = EventScanner(max_chunk_size=100, reorg_depth=5)
+    event = DummyEvent()
+
+    logs = scanner.get_logs(get_ledger_api(250), event, from_block=1)  # type: ignore
+    assert [log["blockNumber"] for log in logs] == list(range(10, 251, 10))
+    assert event.queries == [(1, 100), (101, 200), (201, 245), (246, 250)]
+
+    event.queries.clear()
+    logs = scanner.get_logs(get_ledger_api(300), event, from_block=1)  # type: ignore
+    assert [log["blockNumber"] for log in logs] == list(range(10, 301, 10))
+    assert event.queries == [(246, 295), (296, 300)]
+
+    # a different start block or filter is scanned separately
+    event.queries.clear()
+    scanner.get_logs(get_ledger_api(300), event, from_block=200)  # type: ignore
+    scanner.get_logs(
+        get_ledger_api(300),
+        event,  # type: ignore
+        from_block=1,
+        argument_filters=dict(owner="0x"),
+    )
+    assert event.queries[0] == (200, 295)
+    assert event.queries[2] == (1, 100)
+
+
+def test_fixed_range_scan() -> None:
+    """Test that a fixed range of blocks is not checkpointed."""
+    scanner = EventScanner(max_chunk_size=100)
+    event = DummyEvent()
+
+    for _ in range(2):
+        logs = scanner.get_logs(
+            get_ledger_api(1000), event, from_block="0x0", to_block=150  # type: ignore
+        )
+        assert [log["blockNumber"] for log in logs] == list(range(0, 151, 10))
+    assert event.queries == [(0, 99), (100, 150)] * 2
+
+
+def test_adaptive_chunk_size() -> None:
+    """Test that the chunks shrink when the RPC rejects the range, and grow back afterwards."""
+    scanner = EventScanner(max_chunk_size=64, reorg_depth=0)
+    event = DummyEvent(max_range=20)
+
+    logs = scanner.get_logs(get_ledger_api(99), event)  # type: ignore
+    assert [log["blockNumber"] for log in logs] == list(range(0, 100, 10))
+    assert event.queries[:3] == [(0, 63), (0, 31), (0, 15)]
+    # the chunk grows back after a successful query, and shrinks again when rejected
+    assert event.queries[3:5] == [(16, 47), (16, 31)]
+    assert all(end - start < 20 for start, end in event.queries if start > 90)
+
+
+def test_range_always_rejected() -> None:
+    """Test that the error is raised when even the smallest chunk is rejected."""
+    scanner = EventScanner(max_chunk_size=8, min_chunk_size=2)
+    event = DummyEvent(max_range=1)
+
+    with pytest.raises(ValueError):
+        scanner.get_logs(get_ledger_api(100), event)  # type: ignore
+    assert event.queries == [(0, 7), (0, 3), (0, 1)]
+
+
+def test_failed_scan_keeps_progress() -> None:
+    """Test that a failed scan keeps the logs of the chunks which were scanned before the failure."""
+    scanner = EventScanner(max_chunk_size=100, reorg_depth=5)
+    event = DummyEvent()
+    get_logs = event.get_logs
+
+    def failing_get_logs(**kwargs: Any) -> List[Dict[str, int]]:
+        """Fail to get the logs of the third chunk."""
+        if kwargs["fromBlock"] == 201:
+            raise ConnectionError("the RPC is down")
+        return get_logs(**kwargs)
+
+    event.get_logs = failing_get_logs  # type: ignore
+    with pytest.raises(ConnectionError):
+        scanner.get_logs(get_ledger_api(300), event, from_block=1)  # type: ignore
+    assert event.queries == [(1, 100), (101, 200)]
+
+    event.queries.clear()
+    event.get_logs = get_logs  # type: ignore
+    logs = scanner.get_logs(get_ledger_api(300), event, from_block=1)  # type: ignore
+    assert [log["blockNumber"] for log in logs] == list(range(10, 301, 10))
+    assert event.queries == [(201, 295), (296, 300)]
+
+
+def test_scans_of_different_keys_are_concurrent() -> None:
+    """Test that a scan does not wait for the RPCs of a scan with a different key."""
+    scanner = EventScanner(max_chunk_size=100, reorg_depth=5)
+    slow_event, fast_event = DummyEvent(), DummyEvent()
+    slow_scan_started, fast_scan_done = threading.Event(), threading.Event()
+    get_logs = slow_event.get_logs
+
+    def slow_get_logs(**kwargs: Any) -> List[Dict[str, int]]:
+        """Get the logs only once the other scan is done."""
+        slow_scan_started.set()
+        assert fast_scan_done.wait(timeout=5), "the other scan was blocked"
+        return get_logs(**kwargs)
+
+    slow_event.get_logs = slow_get_logs  # type: ignore
+    slow_scan = threading.Thread(
+        target=scanner.get_logs,
+        args=(get_ledger_api(100), slow_event),
+        kwargs=dict(from_block=1),
+    )
+    slow_scan.start()
+    assert slow_scan_started.wait(timeout=5)
+    logs = scanner.get_logs(get_ledger_api(100), fast_event, from_block=50)  # type: ignore
+    fast_scan_done.set()
+    slow_scan.join(timeout=5)
+
+    assert [log["blockNumber"] for log in logs] == list(range(50, 101, 10))
+    assert not slow_scan.is_alive()
+    assert slow_event.queries == [(1, 95), (96, 100)]
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2023 Valory AG
+#   Copyright 2023-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -19,12 +19,15 @@
 
 """This module contains a wrapper around Multicall2."""
 import logging
-from typing import Any, Callable, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from aea.common import JSONLike
 from aea.configurations.base import PublicId
+from aea.contracts import contract_registry
 from aea.contracts.base import Contract
 from aea.crypto.base import LedgerApi
+from web3._utils.abi import get_abi_output_types, map_abi_data
+from web3._utils.normalizers import BASE_RETURN_NORMALIZERS
 
 
 PUBLIC_ID = PublicId.from_str("valory/multicall2:0.1.0")
@@ -34,6 +37,15 @@ _logger = logging.getLogger(
 )
 
 
+def to_json_like(value: Any) -> Any:
+    """Convert a decoded contract call output to a JSON-like value."""
+    if isinstance(value, bytes):
+        return "0x" + value.hex()
+    if isinstance(value, (list, tuple)):
+        return [to_json_like(item) for item in value]
+    return value
+
+
 class Multicall2Contract(Contract):
     """A wrapper for the MakerDAO Multicall2."""
 
@@ -154,3 +166,80 @@ class Multicall2Contract(Contract):
         ]
         block_number = ledger_api.api.eth.block_number
         return block_number, decoded_responses
+
+    @classmethod
+    def aggregate_calls(
+        cls,
+        ledger_api: LedgerApi,
+        contract_address: Optional[str],
+        calls: List[Dict[str, Any]],
+    ) -> JSONLike:
+        """
+        Make several read-only calls, in a single `tryAggregate` call if a multicall address is given.
+
+        Each call is described by the `contract_id` and the `contract_address` of the called contract,
+        the name of its ABI function `fn_name`, and the positional `args`. The calls fail independently.
+        If no multicall address is given, the calls are made one by one.
+
+        :param ledger_api: the ledger apis.
+        :param contract_address: the multicall address, if deployed on the chain.
+        :param calls: the calls to make.
+        :return: for every call, whether it succeeded and its decoded output.
+        """
+        instances = [
+            contract_registry.make(call["contract_id"]).get_instance(
+                ledger_api, call["contract_address"]
+            )
+            for call in calls
+        ]
+        if contract_address is None:
+            return dict(
+                results=[
+                    cls._call(instance, call)
+                    for instance, call in zip(instances, calls)
+                ]
+            )
+
+        calls_and_decoders = [
+            cls.encode_function_call(
+                ledger_api, instance, call["fn_name"], list(call.get("args", ()))
+            )
+            for instance, call in zip(instances, calls)
+        ]
+        multicall = cls.get_instance(ledger_api, contract_address)
+        responses = multicall.functions.tryAggregate(
+            False, [call for call, _ in calls_and_decoders]
+        ).call()
+        results = []
+        for instance, call, (_, decoder), (success, return_data) in zip(
+            instances, calls, calls_and_decoders, responses
+        ):
+            if not success:
+                results.append(dict(success=False, data=None))
+                continue
+            outputs = cls._normalize_outputs(
+                instance, call["fn_name"], decoder(return_data)
+            )
+            data = outputs[0] if len(outputs) == 1 else outputs
+            results.append(dict(success=True, data=to_json_like(data)))
+        return dict(results=results)
+
+    @staticmethod
+    def _normalize_outputs(
+        contract_instance: Any, fn_name: str, outputs: Tuple
+    ) -> List[Any]:
+        """Normalize decoded outputs as a direct call would, e.g., checksum the addresses."""
+        function = contract_instance.get_function_by_name(fn_name)
+        output_types = get_abi_output_types(function.abi)
+        return map_abi_data(BASE_RETURN_NORMALIZERS, output_types, list(outputs))
+
+    @staticmethod
+    def _call(contract_instance: Any, call: Dict[str, Any]) -> Dict[str, Any]:
+        """Make a single read-only call."""
+        function = contract_instance.get_function_by_name(call["fn_name"])
+        try:
+            data = function(*call.get("args", ())).call()
+        except Exception as e:  # pylint: disable=broad-except
+            _logger.info(f"Call {call} failed: {e!r}")
+            return dict(success=False, data=None)
+        return dict(success=True, data=to_json_like(data))
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2023 Valory AG
+#   Copyright 2023-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -19,13 +19,19 @@
 
 """Tests for valory/multicall2 contract."""
 from pathlib import Path
-from typing import Any, Dict, cast
+from typing import Any, Dict, List, cast
+from unittest import mock
 
 from aea_test_autonomy.base_test_classes.contracts import BaseGanacheContractTest
 from aea_test_autonomy.configurations import DEFAULT_AMOUNT as DEFAULT_ETH_BALANCE
 from aea_test_autonomy.docker.base import skip_docker_tests
+from web3 import Web3
 
-from packages.valory.contracts.multicall2.contract import Multicall2Contract
+from packages.valory.contracts.multicall2 import contract as multicall2_contract
+from packages.valory.contracts.multicall2.contract import (
+    Multicall2Contract,
+    to_json_like,
+)
 
 
 DEFAULT_GAS = 10000000
@@ -78,3 +84,75 @@ class TestTokenSettingsFactory(BaseGanacheContractTest):
             assert isinstance(response[0], int)
             actual_funds = response[0]
             assert actual_funds == expected_funds
+
+
+def test_to_json_like() -> None:
+    """Test converting decoded outputs to JSON-like values."""
+    assert to_json_like((1, b"\x01\xab", ["a", (True,)])) == [
+        1,
+        "0x01ab",
+        ["a", [True]],
+    ]
+
+
+def test_aggregate_calls_one_by_one() -> None:
+    """Test making the calls one by one, when no multicall address is given."""
+    instance = mock.MagicMock()
+    function = instance.get_function_by_name.return_value
+    function.return_value.call.side_effect = (b"\x01", ValueError("reverted"))
+    calls: List[Dict[str, Any]] = [
+        dict(contract_id="valory/a:0.1.0", contract_address="a", fn_name="f", args=[1]),
+        dict(contract_id="valory/b:0.1.0", contract_address="b", fn_name="g"),
+    ]
+    with mock.patch.object(multicall2_contract, "contract_registry") as registry:
+        registry.make.return_value.get_instance.return_value = instance
+        results = Multicall2Contract.aggregate_calls(mock.MagicMock(), None, calls)
+
+    assert results == dict(
+        results=[dict(success=True, data="0x01"), dict(success=False, data=None)]
+    )
+    function.assert_has_calls([mock.call(1), mock.call()], any_order=True)
+
+
+def test_aggregate_calls_multicall() -> None:
+    """Test making the calls in a single `tryAggregate` call, when a multicall address is given."""
+    web3 = Web3()
+    owner = "0x" + "ab" * 20
+    instance = web3.eth.contract(
+        address=Web3.to_checksum_address("0x" + "11" * 20),
+        abi=[
+            dict(
+                name="getOwners",
+                type="function",
+                stateMutability="view",
+                inputs=[],
+                outputs=[dict(name="", type="address[]")],
+            )
+        ],
+    )
+    calls: List[Dict[str, Any]] = [
+        dict(contract_id="valory/a:0.1.0", contract_address="a", fn_name="getOwners"),
+        dict(contract_id="valory/a:0.1.0", contract_address="a", fn_name="getOwners"),
+    ]
+    return_data = web3.codec.encode(["address[]"], [[owner]])
+    ledger_api = mock.MagicMock(api=web3)
+    with mock.patch.object(
+        multicall2_contract, "contract_registry"
+    ) as registry, mock.patch.object(Multicall2Contract, "get_instance") as multicall:
+        registry.make.return_value.get_instance.return_value = instance
+        try_aggregate = multicall.return_value.functions.tryAggregate
+        try_aggregate.return_value.call.return_value = [
+            (True, return_data),
+            (False, b""),
+        ]
+        results = Multicall2Contract.aggregate_calls(ledger_api, "multicall", calls)
+
+    # the addresses are checksummed, as in a direct call
+    assert results == dict(
+        results=[
+            dict(success=True, data=[Web3.to_checksum_address(owner)]),
+            dict(success=False, data=None),
+        ]
+    )
+    multicall.assert_called_once_with(ledger_api, "multicall")
+    assert not try_aggregate.call_args[0][0]
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2024 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -30,9 +30,11 @@ import sys
 import textwrap
 import uuid
 from abc import ABC, ABCMeta, abstractmethod
-from collections import Counter, deque
+from bisect import bisect_left
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Executor, Future
 from copy import copy, deepcopy
-from dataclasses import asdict, astuple, dataclass, field, is_dataclass
+from dataclasses import asdict, dataclass, field, fields, is_dataclass
 from enum import Enum
 from inspect import isclass
 from math import ceil
@@ -43,6 +45,7 @@ from typing import (
     Dict,
     FrozenSet,
     Generic,
+    Iterable,
     Iterator,
     List,
     Mapping,
@@ -72,7 +75,10 @@ from packages.valory.protocols.abci.custom_types import (
     Validator,
 )
 from packages.valory.skills.abstract_round_abci.utils import (
+    canonical_decode,
+    canonical_encode,
     consensus_threshold,
+    freeze,
     is_json_serializable,
 )
 
@@ -93,6 +99,16 @@ BLOCKS_STALL_TOLERANCE = 60
 SERIOUS_OFFENCE_ENUM_MIN = 1000
 NUMBER_OF_BLOCKS_TRACKED = 10_000
 NUMBER_OF_ROUNDS_TRACKED = 50
+DEFAULT_TX_CACHE_SIZE = 1000
+MAX_DELIVERED_PAYLOAD_IDS = 100
+# the number of pruned blocks whose headers and tx hashes are kept, the older ones are only counted
+DEFAULT_PRUNED_BLOCKS_RETENTION = 10_000
+# the binary encoded transactions and payloads start with this byte, which cannot be the first byte of a json document
+BINARY_ENCODING_MAGIC = b"\xff"
+BINARY_ENCODING_VERSION = 1
+# domain separation prefixes of the Merkle tree hashes, to prevent second preimage attacks
+MERKLE_LEAF_PREFIX = b"\x00"
+MERKLE_NODE_PREFIX = b"\x01"
 
 EventType = TypeVar("EventType")
 
@@ -146,6 +162,42 @@ class AbstractRoundInternalError(ABCIAppException):
         super().__init__("internal error: " + message, *args)
 
 
+class PayloadEncoding(Enum):
+    """
+    The encodings of the transactions and their payloads.
+
+    `JSON` is the legacy encoding, which all the agents can decode.
+    `BINARY` is a compact, canonical encoding, in which the payload's fields are encoded in their definition order,
+    and the payload's class is identified by a 4-byte type id instead of its full path.
+    The binary encoded data are prefixed by a magic byte and the version of the encoding,
+    so that the agents can decode both encodings, and future versions of the binary encoding can be told apart.
+    Only enable the binary encoding once all the agents of a service are able to decode it.
+    """
+
+    JSON = "json"
+    BINARY = "binary"
+
+
+def _decode_binary_body(obj: bytes) -> Any:
+    """Check the header of binary encoded data and decode their body."""
+    version = obj[len(BINARY_ENCODING_MAGIC) : len(BINARY_ENCODING_MAGIC) + 1]
+    if version != bytes([BINARY_ENCODING_VERSION]):
+        raise TransactionNotValidError(
+            f"Unsupported binary encoding version {version!r}, expected {BINARY_ENCODING_VERSION}."
+        )
+    try:
+        return canonical_decode(obj[len(BINARY_ENCODING_MAGIC) + 1 :])
+    except ValueError as exc:
+        raise TransactionNotValidError(f"Invalid binary encoded data: {exc}") from exc
+
+
+def _binary_encode(obj: Any) -> bytes:
+    """Encode the given object using the current version of the binary encoding."""
+    return (
+        BINARY_ENCODING_MAGIC + bytes([BINARY_ENCODING_VERSION]) + canonical_encode(obj)
+    )
+
+
 class _MetaPayload(ABCMeta):
     """
     Payload metaclass.
@@ -157,6 +209,12 @@ class _MetaPayload(ABCMeta):
     """
 
     registry: Dict[str, Type["BaseTxPayload"]] = {}
+    type_ids: Dict[int, Type["BaseTxPayload"]] = {}
+
+    @staticmethod
+    def type_id(registry_key: str) -> int:
+        """Get the compact id of the payload type with the given registry key, which is used by the binary encoding."""
+        return int.from_bytes(hashlib.sha256(registry_key.encode()).digest()[:4], "big")
 
     def __new__(mcs, name: str, bases: Tuple, namespace: Dict, **kwargs: Any) -> Type:  # type: ignore
         """Create a new class object."""
@@ -171,7 +229,17 @@ class _MetaPayload(ABCMeta):
         new_cls = cast(Type[BaseTxPayload], new_cls)
         # remember association from transaction type to payload class
         _metaclass_registry_key = f"{new_cls.__module__}.{new_cls.__name__}"  # type: ignore
+        type_id = mcs.type_id(_metaclass_registry_key)
+        registered_cls = mcs.type_ids.get(type_id)
+        if registered_cls is not None:
+            registered_key = f"{registered_cls.__module__}.{registered_cls.__name__}"
+            if registered_key != _metaclass_registry_key:
+                raise ValueError(
+                    f"the type id {type_id} of payload class {_metaclass_registry_key} "
+                    f"is already registered to {registered_key}"
+                )
         mcs.registry[_metaclass_registry_key] = new_cls
+        mcs.type_ids[type_id] = new_cls
 
         return new_cls
 
@@ -184,17 +252,20 @@ class BaseTxPayload(metaclass=_MetaPayload):
     round_count: int = field(default=ROUND_COUNT_DEFAULT, init=False)
     id_: str = field(default_factory=lambda: uuid.uuid4().hex, init=False)
 
+    # the projections read the payload's fields instead of recursively copying them with `asdict`,
+    # and they are not stored on the frozen instance; the returned values are shared and should not be modified
+
     @property
     def data(self) -> Dict[str, Any]:
         """Data"""
-        excluded = ["sender", "round_count", "id_"]
-        return {k: v for k, v in asdict(self).items() if k not in excluded}
+        excluded = 3  # refers to ["sender", "round_count", "id_"]
+        return {f.name: getattr(self, f.name) for f in fields(self)[excluded:]}
 
     @property
     def values(self) -> Tuple[Any, ...]:
         """Data"""
         excluded = 3  # refers to ["sender", "round_count", "id_"]
-        return astuple(self)[excluded:]
+        return tuple(getattr(self, f.name) for f in fields(self)[excluded:])
 
     @property
     def json(self) -> Dict[str, Any]:
@@ -220,9 +291,16 @@ class BaseTxPayload(metaclass=_MetaPayload):
         object.__setattr__(new, "round_count", self.round_count)
         return new
 
-    def encode(self) -> bytes:
+    def encode(self, encoding: PayloadEncoding = PayloadEncoding.JSON) -> bytes:
         """Encode"""
-        encoded_data = json.dumps(self.json, sort_keys=True).encode()
+        if encoding == PayloadEncoding.BINARY:
+            cls = self.__class__
+            type_id = _MetaPayload.type_id(f"{cls.__module__}.{cls.__name__}")
+            encoded_data = _binary_encode(
+                [type_id, self.sender, self.round_count, self.id_, *self.values]
+            )
+        else:
+            encoded_data = json.dumps(self.json, sort_keys=True).encode()
         if sys.getsizeof(encoded_data) > MAX_READ_IN_BYTES:
             msg = f"{type(self)} must be smaller than {MAX_READ_IN_BYTES} bytes"
             raise ValueError(msg)
@@ -231,8 +309,33 @@ class BaseTxPayload(metaclass=_MetaPayload):
     @classmethod
     def decode(cls, obj: bytes) -> "BaseTxPayload":
         """Decode"""
+        if obj.startswith(BINARY_ENCODING_MAGIC):
+            return cls._decode_binary(obj)
         return cls.from_json(json.loads(obj.decode()))
 
+    @classmethod
+    def _decode_binary(cls, obj: bytes) -> "BaseTxPayload":
+        """Decode a binary encoded payload."""
+        body = _decode_binary_body(obj)
+        if not isinstance(body, list) or len(body) < 4:
+            raise TransactionNotValidError(f"Invalid binary encoded payload: {body}")
+        type_id, sender, round_count, id_, *values = body
+        payload_cls = _MetaPayload.type_ids.get(type_id)
+        if payload_cls is None:
+            raise TransactionTypeNotRecognizedError(
+                f"Unknown payload type id {type_id} in binary encoded payload."
+            )
+        # the first three fields are `sender`, `round_count` and `id_`, the rest are the payload's values
+        names = [field_.name for field_ in fields(payload_cls)[3:]]
+        if len(names) != len(values):
+            raise TransactionNotValidError(
+                f"Expected {len(names)} values for {payload_cls.__name__}, got {len(values)}."
+            )
+        payload = payload_cls(sender, **dict(zip(names, values)))  # type: ignore
+        object.__setattr__(payload, "round_count", round_count)
+        object.__setattr__(payload, "id_", id_)
+        return payload
+
 
 @dataclass(frozen=True)
 class Transaction(ABC):
@@ -240,12 +343,18 @@ class Transaction(ABC):
 
     payload: BaseTxPayload
     signature: str
+    # the encoding of the transaction, and of the payload which has been signed
+    encoding: PayloadEncoding = field(default=PayloadEncoding.JSON, compare=False)
 
     def encode(self) -> bytes:
         """Encode the transaction."""
 
-        data = dict(payload=self.payload.json, signature=self.signature)
-        encoded_data = json.dumps(data, sort_keys=True).encode()
+        if self.encoding == PayloadEncoding.BINARY:
+            payload_bytes = self.payload.encode(PayloadEncoding.BINARY)
+            encoded_data = _binary_encode([payload_bytes, self.signature])
+        else:
+            data = dict(payload=self.payload.json, signature=self.signature)
+            encoded_data = json.dumps(data, sort_keys=True).encode()
         if sys.getsizeof(encoded_data) > MAX_READ_IN_BYTES:
             raise ValueError(
                 f"Transaction must be smaller than {MAX_READ_IN_BYTES} bytes"
@@ -256,6 +365,21 @@ class Transaction(ABC):
     def decode(cls, obj: bytes) -> "Transaction":
         """Decode the transaction."""
 
+        if obj.startswith(BINARY_ENCODING_MAGIC):
+            body = _decode_binary_body(obj)
+            if (
+                not isinstance(body, list)
+                or len(body) != 2
+                or not isinstance(body[0], bytes)
+                or not body[0].startswith(BINARY_ENCODING_MAGIC)
+            ):
+                raise TransactionNotValidError(
+                    f"Invalid binary encoded transaction: {body}"
+                )
+            payload_bytes, signature = body
+            payload = BaseTxPayload.decode(payload_bytes)
+            return Transaction(payload, signature, PayloadEncoding.BINARY)
+
         data = json.loads(obj.decode())
         signature = data["signature"]
         payload = BaseTxPayload.from_json(data["payload"])
@@ -268,7 +392,7 @@ class Transaction(ABC):
         :param ledger_id: the ledger id of the address
         :raises: SignatureNotValidError: if the signature is not valid.
         """
-        payload_bytes = self.payload.encode()
+        payload_bytes = self.payload.encode(self.encoding)
         addresses = LedgerApis.recover_message(
             identifier=ledger_id, message=payload_bytes, signature=self.signature
         )
@@ -276,6 +400,128 @@ class Transaction(ABC):
             raise SignatureNotValidError(f"Signature not valid on transaction: {self}")
 
 
+def _recover_signers(ledger_id: str, message: bytes, signature: str) -> Tuple[str, ...]:
+    """Recover the addresses which may have signed the given message. Picklable, to be run by an executor."""
+    return LedgerApis.recover_message(
+        identifier=ledger_id, message=message, signature=signature
+    )
+
+
+class VerifiedTransactionCache:
+    """
+    A bounded LRU cache of the decoded and verified transactions, keyed on their raw bytes.
+
+    The same transaction is received both in a `check_tx` request, when it enters the mempool,
+    and in a `deliver_tx` request, when it is included in a block.
+    The cache allows decoding it and recovering its signer only once.
+    Only the transactions which have been decoded and verified successfully are cached.
+    The delivered transactions are evicted when their block is committed, as they are not expected again.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_TX_CACHE_SIZE) -> None:
+        """Initialize the cache."""
+        if maxsize < 1:
+            raise ValueError(f"The cache's size must be positive, got {maxsize}.")
+        self._maxsize = maxsize
+        self._transactions: "OrderedDict[bytes, Transaction]" = OrderedDict()
+        self._delivered: Set[bytes] = set()
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self) -> int:
+        """Get the number of cached transactions."""
+        return len(self._transactions)
+
+    @property
+    def hits(self) -> int:
+        """Get the number of lookups which were served from the cache."""
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """Get the number of lookups which required decoding and verifying the transaction."""
+        return self._misses
+
+    def decode_and_verify(
+        self, transaction_bytes: bytes, ledger_id: str, delivered: bool = False
+    ) -> Transaction:
+        """
+        Get the decoded and verified transaction of the given bytes.
+
+        :param transaction_bytes: the raw bytes of the transaction.
+        :param ledger_id: the ledger id of the signer's address.
+        :param delivered: whether the transaction is being delivered, in which case it is evicted on the next commit.
+        :return: the decoded and verified transaction.
+        """
+        transaction = self._transactions.get(transaction_bytes)
+        if transaction is None:
+            self._misses += 1
+            transaction = Transaction.decode(transaction_bytes)
+            transaction.verify(ledger_id)
+            self._store(transaction_bytes, transaction)
+        else:
+            self._hits += 1
+            self._transactions.move_to_end(transaction_bytes)
+
+        if delivered:
+            self._delivered.add(transaction_bytes)
+        return transaction
+
+    def verify_batch(
+        self, transactions_bytes: Iterable[bytes], ledger_id: str, executor: Executor
+    ) -> None:
+        """
+        Decode the given transactions and recover their signers concurrently, caching the valid ones.
+
+        The transactions which cannot be decoded or verified are not cached,
+        so that they are rejected with the appropriate error when they are handled.
+
+        :param transactions_bytes: the raw bytes of the transactions.
+        :param ledger_id: the ledger id of the signers' addresses.
+        :param executor: the executor to use for the recovery of the signers.
+        """
+        decoded: Dict[bytes, Transaction] = {}
+        recoveries: Dict[bytes, Future] = {}
+        for transaction_bytes in transactions_bytes:
+            if transaction_bytes in self._transactions or transaction_bytes in decoded:
+                continue
+            try:
+                transaction = Transaction.decode(transaction_bytes)
+                payload_bytes = transaction.payload.encode(transaction.encoding)
+            except Exception:  # pylint: disable=broad-except
+                continue
+            decoded[transaction_bytes] = transaction
+            recoveries[transaction_bytes] = executor.submit(
+                _recover_signers, ledger_id, payload_bytes, transaction.signature
+            )
+
+        for transaction_bytes, recovery in recoveries.items():
+            self._misses += 1
+            if recovery.exception() is not None:
+                continue
+            transaction = decoded[transaction_bytes]
+            if transaction.payload.sender in recovery.result():
+                self._store(transaction_bytes, transaction)
+
+    def _store(self, transaction_bytes: bytes, transaction: Transaction) -> None:
+        """Store a verified transaction, evicting the least recently used one if the cache is full."""
+        self._transactions[transaction_bytes] = transaction
+        if len(self._transactions) > self._maxsize:
+            evicted, _ = self._transactions.popitem(last=False)
+            self._delivered.discard(evicted)
+
+    def evict_delivered(self) -> None:
+        """Evict the transactions which have been delivered since the last eviction."""
+        for transaction_bytes in self._delivered:
+            self._transactions.pop(transaction_bytes, None)
+        self._delivered.clear()
+
+    def clear(self) -> None:
+        """Evict all the transactions."""
+        self._transactions.clear()
+        self._delivered.clear()
+
+
 class Block:  # pylint: disable=too-few-public-methods
     """Class to represent (a subset of) data of a Tendermint block."""
 
@@ -283,16 +529,62 @@ class Block:  # pylint: disable=too-few-public-methods
         self,
         header: Header,
         transactions: Sequence[Transaction],
+        transaction_hashes: Optional[Sequence[bytes]] = None,
     ) -> None:
-        """Initialize the block."""
+        """
+        Initialize the block.
+
+        :param header: the header of the block.
+        :param transactions: the transactions of the block.
+        :param transaction_hashes: the sha256 hashes of the raw bytes of the transactions, as delivered by Tendermint.
+            If not given, they are computed from the encoded transactions.
+        """
         self.header = header
         self._transactions: Tuple[Transaction, ...] = tuple(transactions)
+        self._transaction_hashes: Optional[Tuple[bytes, ...]] = (
+            None if transaction_hashes is None else tuple(transaction_hashes)
+        )
+        if self._transaction_hashes is not None and len(
+            self._transaction_hashes
+        ) != len(self._transactions):
+            raise ValueError(
+                f"expected {len(self._transactions)} transaction hashes, got {len(self._transaction_hashes)}"
+            )
 
     @property
     def transactions(self) -> Tuple[Transaction, ...]:
         """Get the transactions."""
         return self._transactions
 
+    @property
+    def transaction_hashes(self) -> Tuple[bytes, ...]:
+        """Get the sha256 hashes of the transactions, which match Tendermint's if the raw bytes were given."""
+        if self._transaction_hashes is None:
+            return tuple(
+                hashlib.sha256(transaction.encode()).digest()
+                for transaction in self._transactions
+            )
+        return self._transaction_hashes
+
+    @property
+    def timestamp(self) -> datetime.datetime:
+        """Get the block timestamp."""
+        return self.header.timestamp
+
+
+class PrunedBlock:  # pylint: disable=too-few-public-methods
+    """Class to represent the compact data which are kept for a block pruned from the blockchain."""
+
+    def __init__(self, header: Header, transaction_hashes: Iterable[bytes]) -> None:
+        """Initialize the pruned block."""
+        self.header = header
+        self.transaction_hashes: Tuple[bytes, ...] = tuple(transaction_hashes)
+
+    @classmethod
+    def from_block(cls, block: Block) -> "PrunedBlock":
+        """Prune a block, keeping only its header and the hashes of its transactions."""
+        return cls(block.header, block.transaction_hashes)
+
     @property
     def timestamp(self) -> datetime.datetime:
         """Get the block timestamp."""
@@ -304,19 +596,44 @@ class Blockchain:
     Class to represent a (naive) Tendermint blockchain.
 
     The consistency of the data in the blocks is guaranteed by Tendermint.
+
+    If a retention is given, only the latest `retention` blocks are kept in full,
+    and the older ones are pruned down to their headers and the hashes of their transactions.
+    Only the latest `pruned_retention` pruned blocks are kept, the older ones are dropped and only counted,
+    so that the memory used by the blockchain is bounded.
     """
 
-    def __init__(self, height_offset: int = 0, is_init: bool = True) -> None:
+    def __init__(
+        self,
+        height_offset: int = 0,
+        is_init: bool = True,
+        retention: Optional[int] = None,
+        pruned_retention: int = DEFAULT_PRUNED_BLOCKS_RETENTION,
+    ) -> None:
         """Initialize the blockchain."""
-        self._blocks: List[Block] = []
+        if pruned_retention < 1:
+            raise ValueError(
+                f"The pruned blocks' retention must be positive, got {pruned_retention}."
+            )
+        self._blocks: Deque[Block] = deque()
+        self._pruned_blocks: Deque[PrunedBlock] = deque(maxlen=pruned_retention)
+        self._n_dropped_blocks = 0
         self._height_offset = height_offset
         self._is_init = is_init
+        self._retention = retention
+        self._n_transactions = 0
+        self._n_transaction_hashes = 0
 
     @property
     def is_init(self) -> bool:
         """Returns true if the blockchain is initialized."""
         return self._is_init
 
+    @property
+    def retention(self) -> Optional[int]:
+        """Get the number of blocks which are kept in full, or None if all of them are."""
+        return self._retention
+
     def add_block(self, block: Block) -> None:
         """Add a block to the list."""
         expected_height = self.height + 1
@@ -331,6 +648,22 @@ class Blockchain:
                 f"expected height {expected_height}, got {actual_height}"
             )
         self._blocks.append(block)
+        self._n_transactions += len(block.transactions)
+        if self._retention is not None and len(self._blocks) > self._retention:
+            self._prune_oldest_block()
+
+    def _prune_oldest_block(self) -> None:
+        """Prune the oldest block which is kept in full."""
+        block = self._blocks.popleft()
+        pruned_block = PrunedBlock.from_block(block)
+        if len(self._pruned_blocks) == self._pruned_blocks.maxlen:
+            # the oldest pruned block is evicted from the ring buffer on append
+            dropped_block = self._pruned_blocks[0]
+            self._n_dropped_blocks += 1
+            self._n_transaction_hashes -= len(dropped_block.transaction_hashes)
+        self._pruned_blocks.append(pruned_block)
+        self._n_transactions -= len(block.transactions)
+        self._n_transaction_hashes += len(pruned_block.transaction_hashes)
 
     @property
     def height(self) -> int:
@@ -347,13 +680,26 @@ class Blockchain:
     @property
     def length(self) -> int:
         """Get the blockchain length."""
-        return len(self._blocks)
+        return self._n_dropped_blocks + len(self._pruned_blocks) + len(self._blocks)
 
     @property
     def blocks(self) -> Tuple[Block, ...]:
-        """Get the blocks."""
+        """
+        Get the blocks which are kept in full.
+
+        If a retention is given, these are only the latest `retention` blocks,
+        the older ones are available via `pruned_blocks`, as long as they have not been dropped.
+        Use `length` to get the number of all the blocks of the blockchain.
+
+        :return: the blocks which are kept in full.
+        """
         return tuple(self._blocks)
 
+    @property
+    def pruned_blocks(self) -> Tuple[PrunedBlock, ...]:
+        """Get the pruned blocks which have not been dropped yet."""
+        return tuple(self._pruned_blocks)
+
     @property
     def last_block(
         self,
@@ -361,12 +707,24 @@ class Blockchain:
         """Returns the last stored block."""
         return self._blocks[-1]
 
+    @property
+    def memory_stats(self) -> Dict[str, int]:
+        """Get the number of the blocks, transactions and transaction hashes which are stored, and of the dropped blocks."""
+        return {
+            "blocks": len(self._blocks),
+            "pruned_blocks": len(self._pruned_blocks),
+            "dropped_blocks": self._n_dropped_blocks,
+            "transactions": self._n_transactions,
+            "transaction_hashes": self._n_transaction_hashes,
+        }
+
 
 class BlockBuilder:
     """Helper class to build a block."""
 
     _current_header: Optional[Header] = None
     _current_transactions: List[Transaction] = []
+    _current_transaction_hashes: List[Optional[bytes]] = []
 
     def __init__(self) -> None:
         """Initialize the block builder."""
@@ -376,6 +734,7 @@ class BlockBuilder:
         """Reset the temporary data structures."""
         self._current_header = None
         self._current_transactions = []
+        self._current_transaction_hashes = []
 
     @property
     def header(self) -> Header:
@@ -400,18 +759,174 @@ class BlockBuilder:
         """Get the sequence of transactions."""
         return tuple(self._current_transactions)
 
-    def add_transaction(self, transaction: Transaction) -> None:
-        """Add a transaction."""
+    def add_transaction(
+        self, transaction: Transaction, transaction_bytes: Optional[bytes] = None
+    ) -> None:
+        """
+        Add a transaction.
+
+        :param transaction: the transaction.
+        :param transaction_bytes: the raw bytes of the transaction, as delivered by Tendermint.
+        """
         self._current_transactions.append(transaction)
+        self._current_transaction_hashes.append(
+            None
+            if transaction_bytes is None
+            else hashlib.sha256(transaction_bytes).digest()
+        )
 
     def get_block(self) -> Block:
         """Get the block."""
+        hashes = self._current_transaction_hashes
+        # the hashes are computed from the encoded transactions if any of the raw bytes is missing
+        transaction_hashes = None if None in hashes else cast(List[bytes], hashes)
         return Block(
             self.header,
             self._current_transactions,
+            transaction_hashes,
         )
 
 
+class MerkleTree:
+    """
+    A binary Merkle tree over a sequence of leaves, which can be updated incrementally.
+
+    All the levels of the tree are cached, so that appending or replacing a leaf
+    only recomputes the nodes on the path from that leaf to the root, i.e., O(log n) hashes.
+    If a level has an odd number of nodes, its last node is promoted to the next level as is.
+    """
+
+    EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+    def __init__(self, leaves: Iterable[bytes] = ()) -> None:
+        """Initialize the tree, given the hashes of its leaves."""
+        self._levels: List[List[bytes]] = []
+        self.rebuild(leaves)
+
+    @staticmethod
+    def hash_leaf(data: bytes) -> bytes:
+        """Hash the data of a leaf."""
+        return hashlib.sha256(MERKLE_LEAF_PREFIX + data).digest()
+
+    @staticmethod
+    def hash_node(left: bytes, right: bytes) -> bytes:
+        """Hash an inner node, given its children."""
+        return hashlib.sha256(MERKLE_NODE_PREFIX + left + right).digest()
+
+    def __len__(self) -> int:
+        """Get the number of leaves."""
+        return len(self._levels[0])
+
+    @property
+    def leaves(self) -> Tuple[bytes, ...]:
+        """Get the hashes of the leaves."""
+        return tuple(self._levels[0])
+
+    @property
+    def root(self) -> bytes:
+        """Get the root hash of the tree."""
+        if len(self) == 0:
+            return self.EMPTY_ROOT
+        return self._levels[-1][0]
+
+    @classmethod
+    def _parent(cls, level: List[bytes], left_index: int) -> bytes:
+        """Get the parent of the node with the given index and of its sibling on its right, if any."""
+        if left_index + 1 < len(level):
+            return cls.hash_node(level[left_index], level[left_index + 1])
+        return level[left_index]
+
+    def rebuild(self, leaves: Iterable[bytes]) -> None:
+        """Rebuild the whole tree from the given hashes of its leaves."""
+        level = list(leaves)
+        self._levels = [level]
+        while len(level) > 1:
+            level = [self._parent(level, i) for i in range(0, len(level), 2)]
+            self._levels.append(level)
+
+    def append(self, leaf: bytes) -> None:
+        """Append the hash of a leaf."""
+        self._levels[0].append(leaf)
+        self._update_path(len(self) - 1)
+
+    def update(self, index: int, leaf: bytes) -> None:
+        """Replace the hash of the leaf with the given index."""
+        self._levels[0][index] = leaf
+        self._update_path(index)
+
+    def _update_path(self, index: int) -> None:
+        """Recompute the nodes on the path from the leaf with the given index to the root."""
+        depth = 0
+        while len(self._levels[depth]) > 1:
+            parent_index = index // 2
+            parent = self._parent(self._levels[depth], parent_index * 2)
+            if depth + 1 == len(self._levels):
+                self._levels.append([])
+            upper_level = self._levels[depth + 1]
+            if parent_index == len(upper_level):
+                upper_level.append(parent)
+            else:
+                upper_level[parent_index] = parent
+            index = parent_index
+            depth += 1
+
+
+class _PeriodCommitment:
+    """
+    The Merkle commitment of the data of a single period of an `AbciAppDB`.
+
+    Every history entry is hashed once, when it is inserted, as a leaf of the history's Merkle tree.
+    The history roots are, in turn, the leaves of a Merkle tree over the lexicographically sorted keys.
+    The roots of the changed histories are propagated to the keys' tree lazily, when the root is requested.
+    """
+
+    def __init__(self, data: Dict[str, List[Any]]) -> None:
+        """Initialize the commitment, given the data of the period in the database's internal format."""
+        self._histories = {
+            key: MerkleTree(map(self._hash_value, history))
+            for key, history in data.items()
+        }
+        self._keys = sorted(self._histories)
+        self._tree = MerkleTree(map(self._hash_key, self._keys))
+        self._changed_keys: Set[str] = set()
+
+    @staticmethod
+    def _hash_value(value: Any) -> bytes:
+        """Hash a history entry."""
+        return MerkleTree.hash_leaf(json.dumps(value, sort_keys=True).encode())
+
+    def _hash_key(self, key: str) -> bytes:
+        """Hash a key, along with the root of its history."""
+        data = json.dumps([key, self._histories[key].root.hex()])
+        return MerkleTree.hash_leaf(data.encode())
+
+    def append(self, key: str, value: Any) -> None:
+        """Append an entry to the history of the given key."""
+        history = self._histories.setdefault(key, MerkleTree())
+        history.append(self._hash_value(value))
+        self._changed_keys.add(key)
+
+    def truncate(self, depth: int) -> None:
+        """Keep only the latest `depth` entries of every history."""
+        for key, history in self._histories.items():
+            if len(history) > depth:
+                history.rebuild(history.leaves[-depth:])
+                self._changed_keys.add(key)
+
+    @property
+    def root(self) -> bytes:
+        """Get the root hash of the period's data."""
+        new_keys = self._changed_keys.difference(self._keys)
+        if new_keys:
+            self._keys = sorted(self._histories)
+            self._tree.rebuild(map(self._hash_key, self._keys))
+        else:
+            for key in self._changed_keys:
+                self._tree.update(bisect_left(self._keys, key), self._hash_key(key))
+        self._changed_keys.clear()
+        return self._tree.root
+
+
 class AbciAppDB:
     """Class to represent all data replicated across agents.
 
@@ -469,24 +984,25 @@ class AbciAppDB:
     The parameters cleanup_history_depth and cleanup_history_depth_current can also be configured in skill.yaml so they are used automatically
     when the cleanup method is called from AbciApp.cleanup().
 
-    # Memory warning
+    # Immutability
     -----------------------------------
     The database is implemented in such a way to avoid indirect modification of its contents.
-    It copies all the mutable data structures*, which means that it consumes more memory than expected.
-    This is necessary because otherwise it would risk chance of modification from the behaviour side,
-    which is a safety concern.
-
-    The effect of this on the memory usage should not be a big concern, because:
+    Every value is frozen once, when it enters the database, i.e., lists and dictionaries are converted
+    to their read-only counterparts (see `FrozenList` and `FrozenDict` in the `utils` module).
+    Therefore, the getters hand out the stored values themselves instead of copies,
+    and any attempt to modify them in-place from the behaviour side raises a `TypeError`.
+    Use `list(value)` or `dict(value)` to obtain a mutable (shallow) copy, if needed.
 
-        1. The synchronized data of the agents are not intended to store large amount of data.
-         IPFS should be used in such cases, and only the hash should be synchronized in the db.
-        2. The data are automatically wiped after a predefined `cleanup_history` depth as described above.
-        3. The retrieved data are only meant to be used for a short amount of time,
-         e.g., to perform a decision on a behaviour, which means that the gc will collect them before they are noticed.
+    Since frozen values cannot change, they are structurally shared instead of copied,
+    e.g., the values of the `cross_period_persisted_keys` are carried over to a new period by reference.
 
-    * the in-built `copy` module is used, which automatically detects if an item is immutable and skips copying it.
-    For more information take a look at the `_deepcopy_atomic` method and its usage:
-    https://github.com/python/cpython/blob/3.10/Lib/copy.py#L182-L183
+    # Hashing
+    -----------------------------------
+    By default, the hash of the database is the sha256 of its whole serialized data, which is recomputed on every block.
+    If `use_merkle_hash` is set, a Merkle commitment of the data is maintained instead. Every value is hashed once,
+    when it is inserted, and only the paths of the updated histories are recomputed when the hash is requested.
+    The Merkle root is a different commitment than the legacy hash, therefore all the agents of a service
+    should be configured to use the same hashing mode.
     """
 
     DB_DATA_KEY = "db_data"
@@ -507,6 +1023,7 @@ class AbciAppDB:
         setup_data: Dict[str, List[Any]],
         cross_period_persisted_keys: Optional[FrozenSet[str]] = None,
         logger: Optional[logging.Logger] = None,
+        use_merkle_hash: bool = False,
     ) -> None:
         """Initialize the AbciApp database.
 
@@ -517,12 +1034,14 @@ class AbciAppDB:
         :param setup_data: the setup data
         :param cross_period_persisted_keys: data keys that will be kept after a new period starts
         :param logger: the logger of the abci app
+        :param use_merkle_hash: whether to use an incrementally updated Merkle root as the hash of the data
         """
         self.logger = logger or _logger
         AbciAppDB._check_data(setup_data)
-        self._setup_data = deepcopy(setup_data)
+        self._setup_data: Dict[str, List[Any]] = freeze(setup_data)
         self._data: Dict[int, Dict[str, List[Any]]] = {
-            RESET_COUNT_START: self.setup_data  # the key represents the reset index
+            # the key represents the reset index
+            RESET_COUNT_START: self._as_histories(self.setup_data)
         }
         self._round_count = ROUND_COUNT_DEFAULT  # ensures first round is indexed at 0!
 
@@ -531,6 +1050,9 @@ class AbciAppDB:
         )
         self._cross_period_check()
         self.slashing_config: str = ""
+        self._commitments: Optional[Dict[int, _PeriodCommitment]] = (
+            self._build_commitments() if use_merkle_hash else None
+        )
 
     def _cross_period_check(self) -> None:
         """Check the cross period keys against the setup data."""
@@ -551,7 +1073,7 @@ class AbciAppDB:
         :return: the setup_data
         """
         # do not return data if no value has been set
-        return {k: v for k, v in deepcopy(self._setup_data).items() if len(v)}
+        return {k: v for k, v in self._setup_data.items() if len(v)}
 
     @staticmethod
     def _check_data(data: Any) -> None:
@@ -567,6 +1089,22 @@ class AbciAppDB:
 
         AbciAppDB.validate(data)
 
+    @staticmethod
+    def _as_histories(data: Dict[str, List[Any]]) -> Dict[str, List[Any]]:
+        """Get the internal, appendable histories of the given data, with all their values frozen."""
+        return {
+            key: [freeze(value) for value in history] for key, history in data.items()
+        }
+
+    def _build_commitments(self) -> Dict[int, _PeriodCommitment]:
+        """Build the Merkle commitments of all the periods from scratch."""
+        return {index: _PeriodCommitment(data) for index, data in self._data.items()}
+
+    @property
+    def use_merkle_hash(self) -> bool:
+        """Whether an incrementally updated Merkle root is used as the hash of the data."""
+        return self._commitments is not None
+
     @property
     def reset_index(self) -> int:
         """Get the current reset index."""
@@ -591,7 +1129,7 @@ class AbciAppDB:
     def get(self, key: str, default: Any = VALUE_NOT_PROVIDED) -> Optional[Any]:
         """Given a key, get its last for the current reset index."""
         if key in self._data[self.reset_index]:
-            return deepcopy(self._data[self.reset_index][key][-1])
+            return self._data[self.reset_index][key][-1]
         if default != VALUE_NOT_PROVIDED:
             return default
         raise ValueError(
@@ -621,8 +1159,11 @@ class AbciAppDB:
 
         # Append new data to the key history
         data = self._data[self.reset_index]
-        for key, value in deepcopy(kwargs).items():
+        for key, value in kwargs.items():
+            value = freeze(value)
             data.setdefault(key, []).append(value)
+            if self._commitments is not None:
+                self._commitments[self.reset_index].append(key, value)
 
     def create(self, **kwargs: Any) -> None:
         """Add a new entry to the data.
@@ -649,13 +1190,15 @@ class AbciAppDB:
     def _create_from_keys(self, **kwargs: Any) -> None:
         """Add a new entry to the data using the provided key-value pairs."""
         AbciAppDB._check_data(kwargs)
-        self._data[self.reset_index + 1] = deepcopy(kwargs)
+        reset_index = self.reset_index + 1
+        self._data[reset_index] = self._as_histories(kwargs)
+        if self._commitments is not None:
+            self._commitments[reset_index] = _PeriodCommitment(self._data[reset_index])
 
     def get_latest_from_reset_index(self, reset_index: int) -> Dict[str, Any]:
         """Get the latest key-value pairs from the data dictionary for the specified period."""
         return {
-            key: values[-1]
-            for key, values in deepcopy(self._data.get(reset_index, {})).items()
+            key: values[-1] for key, values in self._data.get(reset_index, {}).items()
         }
 
     def get_latest(self) -> Dict[str, Any]:
@@ -687,6 +1230,8 @@ class AbciAppDB:
             key: self._data[key]
             for key in sorted(self._data.keys())[-cleanup_history_depth:]
         }
+        if self._commitments is not None:
+            self._commitments = {key: self._commitments[key] for key in self._data}
         if cleanup_history_depth_current:
             self.cleanup_current_histories(cleanup_history_depth_current)
 
@@ -699,6 +1244,8 @@ class AbciAppDB:
             key: history[-cleanup_history_depth_current:]
             for key, history in self._data[self.reset_index].items()
         }
+        if self._commitments is not None:
+            self._commitments[self.reset_index].truncate(cleanup_history_depth_current)
 
     def serialize(self) -> str:
         """Serialize the data of the database to a string."""
@@ -748,11 +1295,18 @@ class AbciAppDB:
             ) from exc
 
         self._check_data(dict(tuple(db_data.values())[0]))
-        self._data = db_data
+        self._data = {
+            index: self._as_histories(content) for index, content in db_data.items()
+        }
         self.slashing_config = slashing_config
+        if self._commitments is not None:
+            self._commitments = self._build_commitments()
 
     def hash(self) -> bytes:
         """Create a hash of the data."""
+        if self._commitments is not None:
+            return self._merkle_hash(self._commitments)
+
         # Compute the sha256 hash of the serialized data
         sha256 = hashlib.sha256()
         data = self.serialize()
@@ -761,6 +1315,17 @@ class AbciAppDB:
         self.logger.debug(f"root hash: {hash_.hex()}; data: {data}")
         return hash_
 
+    def _merkle_hash(self, commitments: Dict[int, _PeriodCommitment]) -> bytes:
+        """Get the Merkle root of the data, committing to the roots of all the periods and to the slashing config."""
+        periods_tree = MerkleTree(
+            MerkleTree.hash_leaf(json.dumps([index, commitment.root.hex()]).encode())
+            for index, commitment in sorted(commitments.items())
+        )
+        slashing_config_leaf = MerkleTree.hash_leaf(self.slashing_config.encode())
+        hash_ = MerkleTree.hash_node(periods_tree.root, slashing_config_leaf)
+        self.logger.debug(f"root hash: {hash_.hex()}")
+        return hash_
+
     @staticmethod
     def data_to_lists(data: Dict[str, Any]) -> Dict[str, List[Any]]:
         """Convert Dict[str, Any] to Dict[str, List[Any]]."""
@@ -1227,10 +1792,15 @@ class AbstractRound(Generic[EventType], ABC, metaclass=_MetaAbstractRound):
         if len(votes_by_participant) == 0:
             return
 
-        votes = votes_by_participant.values()
-        vote_count = Counter(tuple(sorted(v.data.items())) for v in votes)
-        largest_nb_votes = max(vote_count.values())
-        nb_votes_received = sum(vote_count.values())
+        if isinstance(votes_by_participant, _PayloadCollection):
+            # the collected payloads are of the same class, therefore, counting their values
+            # is equivalent to counting their data, and the count is kept up to date incrementally
+            largest_nb_votes = votes_by_participant.tally("values").max_count
+        else:
+            votes = votes_by_participant.values()
+            vote_count = Counter(tuple(sorted(v.data.items())) for v in votes)
+            largest_nb_votes = max(vote_count.values())
+        nb_votes_received = len(votes_by_participant)
         nb_remaining_votes = nb_participants - nb_votes_received
 
         if (
@@ -1296,6 +1866,156 @@ class DegenerateRound(AbstractRound, ABC):
         )
 
 
+class _Tally:
+    """
+    A count of hashable items, which keeps track of the most common item as items are added.
+
+    Ties are broken in favour of the item which was counted first, as in `Counter.most_common`.
+    """
+
+    def __init__(self, items: Iterable[Any] = ()) -> None:
+        """Count the given items."""
+        self.count: Counter = Counter()
+        self.max_count = 0
+        self.most_common: Any = None
+        self._positions: Dict[Any, int] = {}
+        for item in items:
+            self.add(item)
+
+    def add(self, item: Any) -> None:
+        """Count an item."""
+        count = self.count[item] + 1
+        self.count[item] = count
+        position = self._positions.setdefault(item, len(self._positions))
+        if count > self.max_count or (
+            count == self.max_count and position < self._positions[self.most_common]
+        ):
+            self.max_count, self.most_common = count, item
+
+
+def _payload_values(payload: BaseTxPayload) -> Tuple[Any, ...]:
+    """Get the values of a payload, which is what the collection rounds vote on."""
+    return payload.values
+
+
+def _payload_vote(payload: BaseTxPayload) -> Optional[bool]:
+    """Get the vote of a payload, which is what the voting rounds vote on."""
+    if not hasattr(payload, "vote"):
+        raise ValueError(f"payload {payload} has no attribute `vote`")
+    return payload.vote
+
+
+# a mapping of the names of the tallies that a collection keeps to the functions that get the tallied item of a payload
+TallyKeys = Dict[str, Callable[[BaseTxPayload], Any]]
+
+
+class _PayloadCollection(Dict[str, BaseTxPayload]):
+    """
+    The payloads of a collection round, mapped to their senders.
+
+    It keeps tallies of the payloads, e.g., of their values, up to date as new senders' payloads are added,
+    so that the votes are not recounted over all the payloads every time that they are checked.
+    Any other modification triggers a recount, which preserves the order of the tallied items,
+    i.e., the order in which ties are broken.
+    If the tallied items of a payload cannot be obtained or are not hashable, the tally is recounted on access,
+    so that the corresponding error is raised when the tally is used, and not when the payload is collected.
+    """
+
+    def __init__(
+        self,
+        payloads: Optional[Mapping[str, BaseTxPayload]] = None,
+        tally_keys: Optional[TallyKeys] = None,
+    ) -> None:
+        """Initialize the collection."""
+        super().__init__(payloads or {})
+        self.tally_keys: TallyKeys = tally_keys or {"values": _payload_values}
+        self._tallies: Dict[str, Optional[_Tally]] = {}
+        self._recount()
+
+    def __reduce__(self) -> Tuple[Type["_PayloadCollection"], Tuple[Dict, TallyKeys]]:
+        """Pickle the collection, so that its tallies are recounted when unpickled."""
+        return type(self), (dict(self), self.tally_keys)
+
+    def _count(self, name: str) -> _Tally:
+        """Count the tallied items of all the payloads."""
+        key = self.tally_keys[name]
+        return _Tally(key(payload) for payload in dict.values(self))
+
+    def _recount(self) -> None:
+        """Recount all the tallies."""
+        for name in self.tally_keys:
+            try:
+                self._tallies[name] = self._count(name)
+            except (TypeError, ValueError):
+                self._tallies[name] = None
+
+    def tally(self, name: str) -> _Tally:
+        """Get the tally with the given name. It should not be modified."""
+        tally = self._tallies[name]
+        if tally is None:
+            return self._count(name)
+        return tally
+
+    @property
+    def values_count(self) -> Counter:
+        """Get the count of the payloads' values. The returned counter should not be modified."""
+        return self.tally("values").count
+
+    def __setitem__(self, sender: str, payload: BaseTxPayload) -> None:
+        """Add the payload of a sender."""
+        replacing = sender in self
+        super().__setitem__(sender, payload)
+        if replacing:
+            self._recount()
+            return
+        for name, key in self.tally_keys.items():
+            tally = self._tallies[name]
+            if tally is None:
+                continue
+            try:
+                tally.add(key(payload))
+            except (TypeError, ValueError):
+                self._tallies[name] = None
+
+    def __delitem__(self, sender: str) -> None:
+        """Remove the payload of a sender."""
+        super().__delitem__(sender)
+        self._recount()
+
+    def __ior__(self, other: Any) -> "_PayloadCollection":  # type: ignore
+        """Update the collection in place."""
+        self.update(other)
+        return self
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        """Update the collection."""
+        super().update(*args, **kwargs)
+        self._recount()
+
+    def setdefault(self, sender: str, payload: BaseTxPayload) -> BaseTxPayload:  # type: ignore
+        """Add the payload of a sender, if the sender has not sent a payload already."""
+        if sender not in self:
+            self[sender] = payload
+        return self[sender]
+
+    def pop(self, *args: Any) -> Any:
+        """Remove the payload of a sender and return it."""
+        payload = super().pop(*args)
+        self._recount()
+        return payload
+
+    def popitem(self) -> Tuple[str, BaseTxPayload]:
+        """Remove the last added payload and return it along with its sender."""
+        item = super().popitem()
+        self._recount()
+        return item
+
+    def clear(self) -> None:
+        """Remove all the payloads."""
+        super().clear()
+        self._recount()
+
+
 class CollectionRound(AbstractRound, ABC):
     """
     CollectionRound.
@@ -1309,11 +2029,28 @@ class CollectionRound(AbstractRound, ABC):
     """
 
     _allow_rejoin_payloads: bool = False
+    # the tallies of the collected payloads which are kept up to date as payloads are collected
+    _tally_keys: TallyKeys = {"values": _payload_values}
 
     def __init__(self, *args: Any, **kwargs: Any):
         """Initialize the collection round."""
         super().__init__(*args, **kwargs)
-        self.collection: Dict[str, BaseTxPayload] = {}
+        self._collection = _PayloadCollection(tally_keys=self._tally_keys)
+
+    @property
+    def collection(self) -> Dict[str, BaseTxPayload]:
+        """Get the collected payloads, mapped to their senders."""
+        return self._collection
+
+    @collection.setter
+    def collection(self, collection: Dict[str, BaseTxPayload]) -> None:
+        """Set the collected payloads."""
+        if (
+            not isinstance(collection, _PayloadCollection)
+            or collection.tally_keys != self._tally_keys
+        ):
+            collection = _PayloadCollection(collection, self._tally_keys)
+        self._collection = collection
 
     @staticmethod
     def serialize_collection(
@@ -1351,8 +2088,13 @@ class CollectionRound(AbstractRound, ABC):
 
     @property
     def payload_values_count(self) -> Counter:
-        """Get count of payload values."""
-        return Counter(map(lambda p: p.values, self.payloads))
+        """Get count of payload values. The returned counter is maintained incrementally and should not be modified."""
+        return self._collection.values_count
+
+    @property
+    def collection_tally(self) -> _Tally:
+        """Get the tally of the payloads' values, which is maintained incrementally and should not be modified."""
+        return self._collection.tally("values")
 
     def process_payload(self, payload: BaseTxPayload) -> None:
         """Process payload."""
@@ -1534,10 +2276,9 @@ class CollectSameUntilThresholdRound(CollectionRound, ABC):
         self,
     ) -> bool:
         """Check if the threshold has been reached."""
-        counts = self.payload_values_count.values()
-        return any(
-            count >= self.synchronized_data.consensus_threshold for count in counts
-        )
+        max_count = self.collection_tally.max_count
+        # as before the tally, the threshold is not looked up while no payload has been collected
+        return max_count > 0 and max_count >= self.synchronized_data.consensus_threshold
 
     @property
     def most_voted_payload(
@@ -1555,12 +2296,10 @@ class CollectSameUntilThresholdRound(CollectionRound, ABC):
         self,
     ) -> Tuple[Any, ...]:
         """Get the most voted payload values."""
-        most_voted_payload_values, max_votes = self.payload_values_count.most_common()[
-            0
-        ]
-        if max_votes < self.synchronized_data.consensus_threshold:
+        tally = self.collection_tally
+        if tally.max_count < self.synchronized_data.consensus_threshold:
             raise ABCIAppInternalError("not enough votes")
-        return most_voted_payload_values
+        return tally.most_common
 
     def end_block(self) -> Optional[Tuple[BaseSynchronizedData, Enum]]:
         """Process the end of the block."""
@@ -1705,17 +2444,12 @@ class VotingRound(CollectionRound, ABC):
     none_event: Any
     no_majority_event: Any
     collection_key: str
+    _tally_keys: TallyKeys = {**CollectionRound._tally_keys, "vote": _payload_vote}
 
     @property
     def vote_count(self) -> Counter:
-        """Get agent payload vote count"""
-
-        def parse_payload(payload: Any) -> Optional[bool]:
-            if not hasattr(payload, "vote"):
-                raise ValueError(f"payload {payload} has no attribute `vote`")
-            return payload.vote
-
-        return Counter(parse_payload(payload) for payload in self.collection.values())
+        """Get agent payload vote count. The returned counter is maintained incrementally and should not be modified."""
+        return self._collection.tally("vote").count
 
     @property
     def positive_vote_threshold_reached(self) -> bool:
@@ -3133,9 +3867,15 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
         WAITING_FOR_DELIVER_TX = "waiting_for_deliver_tx"
         WAITING_FOR_COMMIT = "waiting_for_commit"
 
-    def __init__(self, context: SkillContext, abci_app_cls: Type[AbciApp]):
+    def __init__(
+        self,
+        context: SkillContext,
+        abci_app_cls: Type[AbciApp],
+        blockchain_retention: Optional[int] = None,
+    ):
         """Initialize the round."""
-        self._blockchain = Blockchain()
+        self._blockchain_retention = blockchain_retention
+        self._blockchain = Blockchain(retention=blockchain_retention)
         self._syncing_up = True
         self._context = context
         self._block_construction_phase = (
@@ -3160,6 +3900,15 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
         self._offence_status: Dict[str, OffenceStatus] = {}
         self._slashing_enabled = False
         self.pending_offences: Set[PendingOffense] = set()
+        self.transaction_cache = VerifiedTransactionCache()
+        # the ids of this agent's payloads which have been delivered, most recent last
+        self._delivered_payload_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._delivered_payloads_count = 0
+        # the callbacks of the suspended behaviours, to be called on the next update of the round sequence
+        self._waiters: List[Callable[[], None]] = []
+        # the callbacks of the suspended behaviours, to be called once their local deadline passes
+        self._deadlines: List[Tuple[datetime.datetime, int, Callable[[], None]]] = []
+        self._deadlines_counter = itertools.count()
 
     def enable_slashing(self) -> None:
         """Enable slashing."""
@@ -3343,7 +4092,7 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
     def last_timestamp(self) -> datetime.datetime:
         """Get the last timestamp."""
         last_timestamp = (
-            self._blockchain.blocks[-1].timestamp
+            self._blockchain.last_block.timestamp
             if self._blockchain.length != 0
             else None
         )
@@ -3433,6 +4182,47 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
             return False
         return datetime.datetime.now() > self._block_stall_deadline
 
+    def add_waiter(self, callback: Callable[[], None]) -> None:
+        """
+        Call the given callback once, on the next update of the round sequence.
+
+        The round sequence is updated when a round transition happens
+        or when one of this agent's payloads is delivered.
+
+        :param callback: the callback to call.
+        """
+        self._waiters.append(callback)
+
+    def notify_at(
+        self, deadline: datetime.datetime, callback: Callable[[], None]
+    ) -> None:
+        """
+        Call the given callback once, after the given local deadline passes.
+
+        The deadlines are checked by calling `notify_due`.
+
+        :param deadline: the local time after which the callback should be called.
+        :param callback: the callback to call.
+        """
+        heapq.heappush(
+            self._deadlines, (deadline, next(self._deadlines_counter), callback)
+        )
+
+    def notify_due(self) -> None:
+        """Call the callbacks of all the deadlines which have passed."""
+        if not self._deadlines:
+            return
+        now = datetime.datetime.now()
+        while self._deadlines and self._deadlines[0][0] < now:
+            _, _, callback = heapq.heappop(self._deadlines)
+            callback()
+
+    def _notify_waiters(self) -> None:
+        """Call the callbacks waiting for an update of the round sequence."""
+        waiters, self._waiters = self._waiters, []
+        for callback in waiters:
+            callback()
+
     def set_block_stall_deadline(self) -> None:
         """Use the local time of the agent and a predefined tolerance, to specify the expiration of the deadline."""
         self._block_stall_deadline = datetime.datetime.now() + datetime.timedelta(
@@ -3442,7 +4232,9 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
     def init_chain(self, initial_height: int) -> None:
         """Init chain."""
         # reduce `initial_height` by 1 to get block count offset as per Tendermint protocol
-        self._blockchain = Blockchain(initial_height - 1)
+        self._blockchain = Blockchain(
+            initial_height - 1, retention=self._blockchain_retention
+        )
 
     def _track_tm_offences(
         self, evidences: Evidences, last_commit_info: LastCommitInfo
@@ -3530,7 +4322,11 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
         )
         self._block_builder.reset()
         self._block_builder.header = header
+        round_height = self.current_round_height
         self.abci_app.update_time(header.timestamp)
+        if self.current_round_height != round_height:
+            # a timeout has caused a round transition
+            self._notify_waiters()
         self.set_block_stall_deadline()
         self.abci_app.logger.debug(
             "Created a new local deadline for the next `begin_block` request from the Tendermint node: "
@@ -3538,12 +4334,15 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
         )
         self._try_track_offences(evidences, last_commit_info)
 
-    def deliver_tx(self, transaction: Transaction) -> None:
+    def deliver_tx(
+        self, transaction: Transaction, transaction_bytes: Optional[bytes] = None
+    ) -> None:
         """
         Deliver a transaction.
 
         Appends the transaction to build the block on 'end_block' later.
         :param transaction: the transaction.
+        :param transaction_bytes: the raw bytes of the transaction, used to compute the same hash as Tendermint.
         :raises:  an Error otherwise.
         """
         if (
@@ -3556,7 +4355,26 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
 
         self.abci_app.check_transaction(transaction)
         self.abci_app.process_transaction(transaction)
-        self._block_builder.add_transaction(transaction)
+        self._block_builder.add_transaction(transaction, transaction_bytes)
+        if transaction.payload.sender == self._context.agent_address:
+            self._track_delivered_payload(transaction.payload.id_)
+
+    def _track_delivered_payload(self, payload_id: str) -> None:
+        """Track the delivery of one of this agent's payloads."""
+        self._delivered_payload_ids[payload_id] = None
+        if len(self._delivered_payload_ids) > MAX_DELIVERED_PAYLOAD_IDS:
+            self._delivered_payload_ids.popitem(last=False)
+        self._delivered_payloads_count += 1
+        self._notify_waiters()
+
+    def is_payload_delivered(self, payload_id: str) -> bool:
+        """Check whether one of this agent's latest payloads has been delivered to the ABCI app."""
+        return payload_id in self._delivered_payload_ids
+
+    @property
+    def delivered_payloads_count(self) -> int:
+        """Get the number of this agent's payloads which have been delivered to the ABCI app."""
+        return self._delivered_payloads_count
 
     def end_block(self) -> None:
         """Process the 'end_block' request."""
@@ -3582,6 +4400,7 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
                 f"cannot accept a 'commit' request. Current phase={self._block_construction_phase}"
             )
         block = self._block_builder.get_block()
+        self.transaction_cache.evict_delivered()
         try:
             if self._blockchain.is_init:
                 # There are occasions where we wait for an init_chain() before accepting blocks.
@@ -3615,7 +4434,9 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
             self._block_construction_phase = (
                 RoundSequence._BlockConstructionState.WAITING_FOR_BEGIN_BLOCK
             )
-        self._blockchain = Blockchain(is_init=is_init)
+        self._blockchain = Blockchain(
+            is_init=is_init, retention=self._blockchain_retention
+        )
 
     def _get_round_result(
         self,
@@ -3676,6 +4497,7 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
             f"updating round, current_round {self.current_round.round_id}, event: {event}, round result {round_result}"
         )
         self.abci_app.process_event(event, result=round_result)
+        self._notify_waiters()
 
     def _reset_to_default_params(self) -> None:
         """Resets the instance params to their default value."""
@@ -3686,6 +4508,7 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
         self._tm_height = None
         self._slashing_enabled = False
         self.pending_offences = set()
+        self.transaction_cache.clear()
 
     def reset_state(
         self,
@@ -3724,6 +4547,7 @@ class RoundSequence:  # pylint: disable=too-many-instance-attributes
                 f"{set(round_id_to_cls.keys())}."
             )
         self.abci_app.schedule_round(restart_from_round_cls)
+        self._notify_waiters()
 
 
 @dataclass(frozen=True)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2024 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -26,16 +26,20 @@ import json
 import pprint
 import re
 import sys
+import time
 from abc import ABC, ABCMeta, abstractmethod
+from collections import deque
 from enum import Enum
 from functools import partial
 from typing import (
     Any,
     Callable,
+    Deque,
     Dict,
     Generator,
     List,
     Optional,
+    Set,
     Tuple,
     Type,
     Union,
@@ -59,6 +63,7 @@ from packages.open_aea.protocols.signing.custom_types import (
 from packages.valory.connections.http_client.connection import (
     PUBLIC_ID as HTTP_CLIENT_PUBLIC_ID,
 )
+from packages.valory.connections.ipfs.connection import OVERLOADED_REASON
 from packages.valory.connections.ipfs.connection import PUBLIC_ID as IPFS_CONNECTION_ID
 from packages.valory.connections.p2p_libp2p_client.connection import (
     PUBLIC_ID as P2P_LIBP2P_CLIENT_PUBLIC_ID,
@@ -78,6 +83,7 @@ from packages.valory.skills.abstract_round_abci.base import (
     BaseTxPayload,
     LEDGER_API_ADDRESS,
     OK_CODE,
+    PayloadEncoding,
     RoundSequence,
     Transaction,
 )
@@ -94,6 +100,7 @@ from packages.valory.skills.abstract_round_abci.dialogues import (
 from packages.valory.skills.abstract_round_abci.io_.ipfs import (
     IPFSInteract,
     IPFSInteractionError,
+    IPFSLocalHash,
 )
 from packages.valory.skills.abstract_round_abci.io_.load import CustomLoaderType, Loader
 from packages.valory.skills.abstract_round_abci.io_.store import (
@@ -120,6 +127,9 @@ INITIAL_HEIGHT = "0"
 TM_REQ_TIMEOUT = 5  # 5 seconds
 FLASHBOTS_LEDGER_ID = "ethereum_flashbots"
 SOLANA_LEDGER_ID = "solana"
+MAX_STORED_IPFS_HASHES = 1000
+MAX_CACHED_CONTRACT_STATES = 1000
+MULTICALL2_CONTRACT_ID = "valory/multicall2:0.1.0"
 
 
 class SendException(Exception):
@@ -138,6 +148,58 @@ class BaseBehaviourInternalError(Exception):
         super().__init__("internal error: " + message, *args)
 
 
+class WakeUp:
+    """
+    The conditions on which a suspended AsyncBehaviour should be resumed.
+
+    It can be yielded by an 'async_act' to let the ticks of the behaviour be skipped,
+    without resuming its generator, until the deadline passes or the behaviour gets notified.
+    Once scheduled, the behaviour is only resumed when it is woken up by its notifier,
+    otherwise the conditions are checked on every tick.
+    """
+
+    __slots__ = ("deadline", "on_notify", "scheduled", "_woken")
+
+    def __init__(
+        self,
+        deadline: Optional[datetime.datetime] = None,
+        on_notify: bool = False,
+    ) -> None:
+        """
+        Initialize the wake-up conditions.
+
+        :param deadline: the local time after which the behaviour should be resumed.
+        :param on_notify: whether the behaviour should be resumed as soon as it gets notified.
+        """
+        self.deadline = deadline
+        self.on_notify = on_notify
+        self.scheduled = False
+        self._woken = False
+
+    def wake(self) -> None:
+        """Wake up the behaviour."""
+        self._woken = True
+
+    def is_due(self) -> bool:
+        """Check whether the behaviour should be resumed."""
+        if self.scheduled:
+            return self._woken
+        if self.on_notify or self.deadline is None:
+            # there is no notifier to wake up the behaviour
+            return True
+        return datetime.datetime.now() > self.deadline
+
+
+class ContractCallBatch:  # pylint: disable=too-few-public-methods
+    """Read-only contract calls which are sent together."""
+
+    def __init__(self) -> None:
+        """Initialize the batch."""
+        self.calls: List[Dict[str, Any]] = []
+        self.sent: bool = False
+        self.results: Optional[List[Optional[Any]]] = None
+
+
 class AsyncBehaviour(ABC):
     """
     MixIn behaviour class that support limited asynchronous programming.
@@ -165,6 +227,16 @@ class AsyncBehaviour(ABC):
         self.__notified: bool = False
         self.__message: Any = None
         self.__setup_called: bool = False
+        # the conditions on which the suspended 'async_act' should be resumed, if any
+        self.__wake_up: Optional[WakeUp] = None
+
+        # temporary variables for gathering concurrent generators
+        # the index of the generator which is being stepped, if any
+        self.__gathering: Optional[int] = None
+        # a counter of the gathers, so that the messages of a finished gather are ignored
+        self.__gather_id: int = 0
+        # the messages received for the gathered generators, along with their index
+        self.__gathered_messages: Deque[Tuple[int, Any]] = deque()
 
     @abstractmethod
     def async_act(self) -> Generator:
@@ -228,8 +300,11 @@ class AsyncBehaviour(ABC):
 
     @classmethod
     def wait_for_condition(
-        cls, condition: Callable[[], bool], timeout: Optional[float] = None
-    ) -> Generator[None, None, None]:
+        cls,
+        condition: Callable[[], bool],
+        timeout: Optional[float] = None,
+        wake_on_notify: bool = False,
+    ) -> Generator[Optional[WakeUp], None, None]:
         """Wait for a condition to happen.
 
         This is a local method that does not depend on the global clock,
@@ -237,7 +312,10 @@ class AsyncBehaviour(ABC):
 
         :param condition: the condition to wait for
         :param timeout: the maximum amount of time to wait
-        :yield: None
+        :param wake_on_notify: whether the condition only changes when the behaviour gets notified.
+            If set, the condition is only re-checked on a notification or when the timeout expires,
+            otherwise it is re-checked on every tick.
+        :yield: the conditions on which the behaviour should be resumed, if known.
         """
         if timeout is not None:
             deadline = datetime.datetime.now() + datetime.timedelta(0, timeout)
@@ -247,7 +325,10 @@ class AsyncBehaviour(ABC):
         while not condition():
             if timeout is not None and datetime.datetime.now() > deadline:
                 raise TimeoutException()
-            yield
+            if not wake_on_notify:
+                yield None
+            else:
+                yield WakeUp(deadline if timeout is not None else None, on_notify=True)
 
     def sleep(self, seconds: float) -> Any:
         """
@@ -258,14 +339,27 @@ class AsyncBehaviour(ABC):
         usage of datetime.now() is acceptable here.
 
         :param seconds: the seconds
-        :yield: None
+        :yield: the deadline after which the behaviour should be resumed.
         """
         deadline = datetime.datetime.now() + datetime.timedelta(0, seconds)
+        yield from self.wait_until(deadline)
+
+    @staticmethod
+    def wait_until(
+        deadline: datetime.datetime,
+    ) -> Generator[WakeUp, None, None]:
+        """
+        Delay execution until the given deadline.
 
-        def _wait_until() -> bool:
-            return datetime.datetime.now() > deadline
+        The ticks of the behaviour are skipped until the deadline passes.
+        This is a local method that does not depend on the global clock,
+        so the usage of datetime.now() is acceptable here.
 
-        yield from self.wait_for_condition(_wait_until)
+        :param deadline: the deadline
+        :yield: the deadline after which the behaviour should be resumed.
+        """
+        while not datetime.datetime.now() > deadline:
+            yield WakeUp(deadline)
 
     def wait_for_message(
         self,
@@ -276,7 +370,8 @@ class AsyncBehaviour(ABC):
         Wait for message.
 
         Care must be taken. This method does not handle concurrent requests.
-        Use directly after a request is being sent.
+        Use directly after a request is being sent, or use `gather`
+        to wait for several requests concurrently.
         This is a local method that does not depend on the global clock,
         so the usage of datetime.now() is acceptable here.
 
@@ -302,6 +397,164 @@ class AsyncBehaviour(ABC):
         finally:
             self.__state = self.AsyncState.RUNNING
 
+    def _get_gathered_message_callback(self) -> Optional[Callable[[Any], bool]]:
+        """
+        Get a callback which delivers a message to the gathered generator which is currently being stepped.
+
+        It should be called when registering the callback for a request's response,
+        so that the response can be routed to the generator which sent the request.
+        The callback returns whether the message was delivered, i.e., whether the gather had not finished yet.
+
+        :return: the callback, or None if no gathered generator is being stepped.
+        """
+        if self.__gathering is None:
+            return None
+        gather_id, index = self.__gather_id, self.__gathering
+
+        def deliver(message: Any) -> bool:
+            """Deliver the message, unless the gather has already finished."""
+            if gather_id != self.__gather_id:
+                return False
+            self.__gathered_messages.append((index, message))
+            return True
+
+        return deliver
+
+    def gather(
+        self,
+        *generators: Generator,
+        timeout: Optional[float] = None,
+        until: Optional[Callable[[Dict[int, Any]], bool]] = None,
+    ) -> Generator[None, None, List[Any]]:
+        """
+        Run the generators concurrently and wait for all of them to finish.
+
+        The generators may send requests and wait for their responses, e.g., `get_http_response`,
+        `get_contract_api_response`, `get_ledger_api_response` or `get_from_ipfs`,
+        so that the requests are in flight at the same time instead of one after the other.
+        If one of the generators raises, the others are closed and the exception is propagated.
+
+        If an `until` condition is given, it is checked against the return values gathered so far,
+        by the index of their generator, every time a generator finishes. Once it holds,
+        the rest of the generators are closed, and their late responses are handled as late messages.
+
+        This is a local method that does not depend on the global clock,
+        so the usage of datetime.now() is acceptable here.
+
+        :param generators: the generators to run.
+        :param timeout: the maximum amount of time to wait.
+        :param until: the condition on the gathered return values to stop waiting for the rest.
+        :return: the return values of the generators, in the same order, None for the closed ones.
+        :yield: None
+        """
+        results = yield from self.__gather(
+            generators, timeout, until or (lambda _: False)
+        )
+        return [results.get(index) for index in range(len(generators))]
+
+    def wait_for_any(
+        self, *generators: Generator, timeout: Optional[float] = None
+    ) -> Generator[None, None, Tuple[int, Any]]:
+        """
+        Run the generators concurrently and wait for the first one to finish.
+
+        The rest of the generators are closed, and their late responses are handled as late messages.
+        This is a local method that does not depend on the global clock,
+        so the usage of datetime.now() is acceptable here.
+
+        :param generators: the generators to run.
+        :param timeout: the maximum amount of time to wait.
+        :return: the index of the first generator to finish, and its return value.
+        :yield: None
+        """
+        enforce(
+            len(generators) > 0,
+            "at least one generator is required to wait for any of them",
+            exception_class=ValueError,
+        )
+        results = yield from self.__gather(
+            generators, timeout, lambda results: len(results) > 0
+        )
+        index = min(results)
+        return index, results[index]
+
+    def __gather(
+        self,
+        generators: Tuple[Generator, ...],
+        timeout: Optional[float],
+        until: Callable[[Dict[int, Any]], bool],
+    ) -> Generator[None, None, Dict[int, Any]]:
+        """Run the generators concurrently, until all of them have finished or the results satisfy the condition."""
+        enforce(self.__gathering is None, "gathers cannot be nested")
+        if timeout is not None:
+            deadline = datetime.datetime.now() + datetime.timedelta(0, timeout)
+        else:
+            deadline = datetime.datetime.max
+
+        self.__gather_id += 1
+        self.__gathered_messages.clear()
+        pending: Dict[int, Generator] = dict(enumerate(generators))
+        # the generators which are waiting for a message, instead of the next tick
+        waiting: Set[int] = set()
+        results: Dict[int, Any] = {}
+
+        def is_gathering() -> bool:
+            """Check whether the generators should keep running."""
+            return bool(pending) and not until(results)
+
+        def step(index: int, value: Any) -> None:
+            """Resume a generator, and track what it is waiting for."""
+            self.__gathering = index
+            # `wait_for_message` sets the state only when it starts waiting, so restore it for the generator
+            self.__state = (
+                self.AsyncState.WAITING_MESSAGE
+                if index in waiting
+                else self.AsyncState.RUNNING
+            )
+            try:
+                pending[index].send(value)
+            except StopIteration as e:
+                results[index] = e.value
+                del pending[index]
+            finally:
+                self.__gathering = None
+            if index in pending and self.__state == self.AsyncState.WAITING_MESSAGE:
+                waiting.add(index)
+            else:
+                waiting.discard(index)
+            # the gather itself waits for ticks, to poll the messages of all the generators
+            self.__state = self.AsyncState.RUNNING
+
+        try:
+            for index in list(pending):
+                step(index, None)
+            while is_gathering():
+                if datetime.datetime.now() > deadline:
+                    raise TimeoutException()
+                yield
+                stepped = set()
+                deferred = []
+                while self.__gathered_messages and is_gathering():
+                    index, message = self.__gathered_messages.popleft()
+                    if index in waiting:
+                        step(index, message)
+                        stepped.add(index)
+                    elif index in pending:
+                        deferred.append((index, message))
+                self.__gathered_messages.extendleft(reversed(deferred))
+                # the rest of the generators are resumed on every tick, even if they are waiting for a message,
+                # so that they can check their own deadlines, e.g., the timeout of `wait_for_message`
+                for index in sorted(pending.keys() - stepped):
+                    if is_gathering():
+                        step(index, None)
+            return results
+        finally:
+            for generator in pending.values():
+                generator.close()
+            self.__gather_id += 1
+            self.__gathered_messages.clear()
+            self.__state = self.AsyncState.RUNNING
+
     def setup(self) -> None:  # noqa: B027  # flake8 suggest make it abstract
         """Setup behaviour."""
 
@@ -319,6 +572,9 @@ class AsyncBehaviour(ABC):
             self.__handle_waiting_for_message()
             return
         enforce(self.__state == self.AsyncState.RUNNING, "not in 'RUNNING' state")
+        if self.__wake_up is not None and not self.__wake_up.is_due():
+            # the behaviour is suspended, skip the tick without resuming it
+            return
         self.__handle_tick()
 
     def stop(self) -> None:
@@ -328,6 +584,7 @@ class AsyncBehaviour(ABC):
         self.__get_generator_act().close()
         self.__state = self.AsyncState.READY
         self.__stopped = True
+        self.__wake_up = None
 
     def __call_act_first_time(self) -> None:
         """Call the 'async_act' method for the first time."""
@@ -342,7 +599,7 @@ class AsyncBehaviour(ABC):
                 self.__state = self.AsyncState.READY
                 return
             # trigger first execution, up to next 'yield' statement
-            self.__get_generator_act().send(None)
+            self.__resume(None)
         except StopIteration:
             # this may happen if the generator is empty
             self.__state = self.AsyncState.READY
@@ -352,7 +609,7 @@ class AsyncBehaviour(ABC):
         # if there is no message coming, skip.
         if self.__notified:
             try:
-                self.__get_generator_act().send(self.__message)
+                self.__resume(self.__message)
             except StopIteration:
                 self.__handle_stop_iteration()
             finally:
@@ -363,10 +620,27 @@ class AsyncBehaviour(ABC):
     def __handle_tick(self) -> None:
         """Handle an 'act' tick."""
         try:
-            self.__get_generator_act().send(None)
+            self.__resume(None)
         except StopIteration:
             self.__handle_stop_iteration()
 
+    def __resume(self, value: Any) -> None:
+        """Resume the 'async_act' generator, and keep the conditions on which it should be resumed next."""
+        self.__wake_up = None
+        yielded = self.__get_generator_act().send(value)
+        if isinstance(yielded, WakeUp):
+            self.__wake_up = yielded
+            self._schedule_wake_up(yielded)
+
+    def _schedule_wake_up(self, wake_up: WakeUp) -> None:  # noqa: B027
+        """
+        Register the wake-up conditions of the suspended behaviour with a notifier.
+
+        By default, there is no notifier, and the conditions are checked on every tick.
+
+        :param wake_up: the conditions on which the behaviour should be resumed.
+        """
+
     def __handle_stop_iteration(self) -> None:
         """
         Handle 'StopIteration' exception.
@@ -424,7 +698,7 @@ class IPFSBehaviour(SimpleBehaviour, ABC):
         :param timeout: timeout for the request.
         :returns: the ipfs message, and its corresponding dialogue.
         """
-        serialized_objects = self._ipfs_interact.store(
+        serialized_objects = self._serialize_ipfs_objects(
             filename, obj, multiple, filetype, custom_storer, **kwargs
         )
         message, dialogue = self._build_ipfs_message(
@@ -453,6 +727,21 @@ class IPFSBehaviour(SimpleBehaviour, ABC):
         )
         return message, dialogue
 
+    def _serialize_ipfs_objects(  # pylint: disable=too-many-arguments
+        self,
+        filename: str,
+        obj: SupportedObjectType,
+        multiple: bool = False,
+        filetype: Optional[SupportedFiletype] = None,
+        custom_storer: Optional[CustomStorerType] = None,
+        **kwargs: Any,
+    ) -> Dict[str, str]:
+        """Serialize objects to be sent to IPFS."""
+        serialized_objects = self._ipfs_interact.store(
+            filename, obj, multiple, filetype, custom_storer, **kwargs
+        )
+        return serialized_objects
+
     def _deserialize_ipfs_objects(  # pylint: disable=too-many-arguments
         self,
         serialized_objects: Dict[str, str],
@@ -577,6 +866,8 @@ class BaseBehaviour(
         self._is_healthy: bool = False
         self._non_200_return_code_count: int = 0
         self.gentle_reset_attempted: bool = False
+        # the batches of contract calls which have not been sent yet, by chain id
+        self._contract_call_batches: Dict[str, ContractCallBatch] = {}
 
     @classmethod
     def auto_behaviour_id(cls) -> str:
@@ -623,6 +914,22 @@ class BaseBehaviour(
         """Return if the Tendermint communication is not healthy anymore."""
         return self.round_sequence.block_stall_deadline_expired
 
+    def _schedule_wake_up(self, wake_up: WakeUp) -> None:
+        """
+        Let the round sequence wake up the suspended behaviour.
+
+        The behaviour is woken up on the next update of the round sequence, if it waits for a notification,
+        and once its deadline passes, so that its ticks are skipped without checking the conditions.
+
+        :param wake_up: the conditions on which the behaviour should be resumed.
+        """
+        round_sequence = self.round_sequence
+        if wake_up.on_notify:
+            round_sequence.add_waiter(wake_up.wake)
+        if wake_up.deadline is not None:
+            round_sequence.notify_at(wake_up.deadline, wake_up.wake)
+        wake_up.scheduled = wake_up.on_notify or wake_up.deadline is not None
+
     def check_in_round(self, round_id: str) -> bool:
         """Check that we entered a specific round."""
         return self.round_sequence.current_round_id == round_id
@@ -653,12 +960,12 @@ class BaseBehaviour(
 
     def wait_until_round_end(
         self, timeout: Optional[float] = None
-    ) -> Generator[None, None, None]:
+    ) -> Generator[Optional[WakeUp], None, None]:
         """
         Wait until the ABCI application exits from a round.
 
         :param timeout: the timeout for the wait
-        :yield: None
+        :yield: the conditions on which the behaviour should be resumed.
         """
         round_id = self.matching_round.auto_round_id()
         round_height = self.round_sequence.current_round_height
@@ -667,8 +974,11 @@ class BaseBehaviour(
                 f"Should be in matching round ({round_id}) or last round ({self.round_sequence.last_round_id}), "
                 f"actual round {self.round_sequence.current_round_id}!"
             )
+        # the round height changes on every round transition of the round sequence
         yield from self.wait_for_condition(
-            partial(self.check_round_height_has_changed, round_height), timeout=timeout
+            partial(self.check_round_height_has_changed, round_height),
+            timeout=timeout,
+            wake_on_notify=True,
         )
 
     def wait_from_last_timestamp(self, seconds: float) -> Any:
@@ -687,11 +997,7 @@ class BaseBehaviour(
         deadline = self.round_sequence.abci_app.last_timestamp + datetime.timedelta(
             seconds=seconds
         )
-
-        def _wait_until() -> bool:
-            return datetime.datetime.now() > deadline
-
-        yield from self.wait_for_condition(_wait_until)
+        yield from self.wait_until(deadline)
 
     def is_done(self) -> bool:
         """Check whether the behaviour is done."""
@@ -819,6 +1125,9 @@ class BaseBehaviour(
             AbstractRoundAbci skill -> (HttpMessage | REQUEST) -> Http client connection
             Http client connection -> (HttpMessage | RESPONSE) -> AbstractRoundAbci skill
 
+        If the `pipelined_a2a_transactions` param is set, the delivery is instead confirmed
+        from the transactions delivered to the local ABCI app, without polling the Tendermint node.
+
         :param: payload: the payload to send
         :param: resetting: flag indicating if we are resetting Tendermint nodes in this round.
         :param: stop_condition: the condition to be checked to interrupt the
@@ -841,12 +1150,17 @@ class BaseBehaviour(
         max_attempts = (
             self.params.max_attempts if max_attempts is None else max_attempts
         )
+        encoding = (
+            PayloadEncoding.BINARY
+            if self.params.binary_payload_encoding
+            else PayloadEncoding.JSON
+        )
         while not stop_condition():
             self.context.logger.debug(
                 f"Trying to send payload: {pprint.pformat(payload.json)}"
             )
-            signature_bytes = yield from self.get_signature(payload.encode())
-            transaction = Transaction(payload, signature_bytes)
+            signature_bytes = yield from self.get_signature(payload.encode(encoding))
+            transaction = Transaction(payload, signature_bytes, encoding)
             try:
                 response = yield from self._submit_tx(
                     transaction.encode(), timeout=request_timeout
@@ -895,6 +1209,20 @@ class BaseBehaviour(
                 yield from self.sleep(request_retry_delay)
                 continue  # pragma: nocover
 
+            if self.params.pipelined_a2a_transactions:
+                is_delivered = yield from self._wait_until_payload_delivered(
+                    payload, stop_condition, timeout=tx_timeout
+                )
+                if is_delivered:
+                    self.context.logger.debug("A2A transaction delivered!")
+                    break
+                if not stop_condition():
+                    self.context.logger.warning(
+                        f"Tx {tx_hash} was not delivered in {tx_timeout} seconds. Retrying..."
+                    )
+                payload = payload.with_new_id()
+                continue
+
             try:
                 is_delivered, res = yield from self._wait_until_transaction_delivered(
                     tx_hash,
@@ -931,6 +1259,40 @@ class BaseBehaviour(
             "Stop condition is true, no more attempts to send the transaction."
         )
 
+    def _wait_until_payload_delivered(
+        self,
+        payload: BaseTxPayload,
+        stop_condition: Callable[[], bool],
+        timeout: Optional[float] = None,
+    ) -> Generator[Optional[WakeUp], None, bool]:
+        """
+        Wait until a payload is delivered to the local ABCI app, or until the stop condition is true.
+
+        The behaviour is only resumed when one of the agent's payloads is delivered,
+        when the round changes or when the timeout expires.
+
+        :param payload: the payload to wait for.
+        :param stop_condition: the condition to be checked to interrupt the waiting.
+        :param timeout: the timeout to wait for the delivery.
+        :return: whether the payload has been delivered.
+        :yield: the conditions on which the behaviour should be resumed.
+        """
+        round_sequence = self.round_sequence
+
+        def is_delivered_or_stopped() -> bool:
+            """Check whether the payload is delivered or the waiting should stop."""
+            return round_sequence.is_payload_delivered(payload.id_) or stop_condition()
+
+        try:
+            yield from self.wait_for_condition(
+                is_delivered_or_stopped,
+                timeout=timeout,
+                wake_on_notify=True,
+            )
+        except TimeoutException:
+            return False
+        return round_sequence.is_payload_delivered(payload.id_)
+
     @staticmethod
     def _is_invalid_transaction(res: HttpMessage) -> bool:
         """Check if the transaction is invalid."""
@@ -1264,6 +1626,9 @@ class BaseBehaviour(
         :return: the request callback.
         """
 
+        # if the request is sent by a gathered generator, route the response to it
+        deliver_gathered_message = self._get_gathered_message_callback()
+
         def callback_request(
             message: Message, current_behaviour: BaseBehaviour
         ) -> None:
@@ -1274,6 +1639,10 @@ class BaseBehaviour(
                 )
             elif self != current_behaviour:
                 self.handle_late_messages(self.behaviour_id, message)
+            elif deliver_gathered_message is not None:
+                if not deliver_gathered_message(message):
+                    # the gather has finished, e.g., it has timed out or another generator has finished first
+                    self.handle_late_messages(self.behaviour_id, message)
             elif self.state == AsyncBehaviour.AsyncState.WAITING_MESSAGE:
                 self.try_send(message)
             else:
@@ -1750,6 +2119,199 @@ class BaseBehaviour(
         response = yield from self.wait_for_message()
         return response
 
+    def get_cached_contract_api_response(  # pylint: disable=too-many-arguments
+        self,
+        performative: ContractApiMessage.Performative,
+        contract_address: Optional[str],
+        contract_id: str,
+        contract_callable: str,
+        ledger_id: Optional[str] = None,
+        is_final: Optional[Callable[[ContractApiMessage], bool]] = None,
+        **kwargs: Any,
+    ) -> Generator[None, None, ContractApiMessage]:
+        """
+        Get a contract api response, reusing the response of an identical previous request if it is still valid.
+
+        The `STATE` responses reflect the latest block, so they are only reused until the next block is committed,
+        and for at most `contract_state_cache_ttl` seconds. The responses which are final, e.g.,
+        the status of a mined transaction, are cached indefinitely.
+        If `contract_state_cache_ttl` is `None`, the cache is disabled and the request is always sent.
+
+        :param performative: the message performative
+        :param contract_address: the contract address
+        :param contract_id: the contract id
+        :param contract_callable: the callable to call on the contract
+        :param ledger_id: the ledger id, if not specified, the default ledger id is used
+        :param is_final: a predicate deciding whether a response will never change, `None` if no response is final.
+        :param kwargs: keyword argument for the contract api request
+        :return: the contract api response
+        :yields: the contract api response
+        """
+        ttl = self.params.contract_state_cache_ttl
+        if ttl is None:
+            response = yield from self.get_contract_api_response(
+                performative,
+                contract_address,
+                contract_id,
+                contract_callable,
+                ledger_id,
+                **kwargs,
+            )
+            return response
+
+        key = json.dumps(
+            [
+                ledger_id or self.context.default_ledger_id,
+                performative.value,
+                contract_address,
+                contract_id,
+                contract_callable,
+                kwargs,
+            ],
+            sort_keys=True,
+            default=repr,
+        )
+        cached = self._get_cached_contract_state(key)
+        if cached is not None:
+            return cached
+
+        response = yield from self.get_contract_api_response(
+            performative,
+            contract_address,
+            contract_id,
+            contract_callable,
+            ledger_id,
+            **kwargs,
+        )
+        if response.performative == ContractApiMessage.Performative.STATE:
+            final = is_final is not None and is_final(response)
+            expiry = None if final else time.monotonic() + ttl
+            if final or ttl > 0:
+                self._cache_contract_state(key, expiry, response)
+        return response
+
+    def _get_cached_contract_state(self, key: str) -> Optional[ContractApiMessage]:
+        """Get a cached contract api response, if it has not expired."""
+        self._evict_stale_contract_states()
+        contract_state_cache = self.shared_state.contract_state_cache
+        expiry, response = contract_state_cache.get(key, (None, None))
+        if response is None:
+            return None
+        if expiry is not None and expiry <= time.monotonic():
+            del contract_state_cache[key]
+            return None
+        contract_state_cache.move_to_end(key)
+        return response
+
+    def _evict_stale_contract_states(self) -> None:
+        """Evict the cached contract api responses which are not final, if a block has been committed since they were cached."""
+        shared_state = self.shared_state
+        height = self.round_sequence.height
+        if shared_state.contract_state_cache_height == height:
+            return
+        shared_state.contract_state_cache_height = height
+        contract_state_cache = shared_state.contract_state_cache
+        stale_keys = [
+            key
+            for key, (expiry, _) in contract_state_cache.items()
+            if expiry is not None
+        ]
+        for key in stale_keys:
+            del contract_state_cache[key]
+
+    def _cache_contract_state(
+        self, key: str, expiry: Optional[float], response: ContractApiMessage
+    ) -> None:
+        """Cache a contract api response, evicting the least recently used responses if needed."""
+        contract_state_cache = self.shared_state.contract_state_cache
+        contract_state_cache[key] = (expiry, response)
+        contract_state_cache.move_to_end(key)
+        if len(contract_state_cache) > MAX_CACHED_CONTRACT_STATES:
+            contract_state_cache.popitem(last=False)
+
+    def batch_contract_call(  # pylint: disable=too-many-arguments
+        self,
+        contract_id: str,
+        contract_address: str,
+        fn_name: str,
+        args: Optional[List[Any]] = None,
+        chain_id: Optional[str] = None,
+    ) -> Generator[None, None, Optional[Any]]:
+        """
+        Call a read-only function of a contract, batched with the other calls issued in the same tick.
+
+        The calls which are issued concurrently, e.g., by the generators of a `gather`, are sent
+        to the ledger connection in a single request to the `valory/multicall2` contract,
+        which must be part of the agent. If a `Multicall2` address is configured for the chain
+        in the `multicall2_addresses` parameter, the calls are also made in a single RPC request.
+
+        :param contract_id: the id of the called contract.
+        :param contract_address: the address of the called contract.
+        :param fn_name: the name of the function in the contract's ABI.
+        :param args: the positional arguments of the function.
+        :param chain_id: the chain id, if not specified, the default one is used.
+        :return: the decoded output of the function, or None if the call failed.
+        :yield: None
+        """
+        chain_id = chain_id or self.params.default_chain_id
+        batch = self._contract_call_batches.get(chain_id)
+        if batch is None:
+            batch = self._contract_call_batches[chain_id] = ContractCallBatch()
+        index = len(batch.calls)
+        batch.calls.append(
+            dict(
+                contract_id=contract_id,
+                contract_address=contract_address,
+                fn_name=fn_name,
+                args=list(args or ()),
+            )
+        )
+        # give the rest of the calls issued in this tick the chance to join the batch
+        yield
+
+        if not batch.sent:
+            # the first call to be resumed sends the batch on behalf of all of them
+            batch.sent = True
+            if self._contract_call_batches.get(chain_id) is batch:
+                del self._contract_call_batches[chain_id]
+            try:
+                batch.results = yield from self._send_contract_call_batch(
+                    batch, chain_id
+                )
+            finally:
+                if batch.results is None:
+                    # the sending was interrupted, fail the calls instead of leaving the rest of them waiting
+                    batch.results = [None] * len(batch.calls)
+
+        while batch.results is None:
+            yield
+        return batch.results[index]
+
+    def _send_contract_call_batch(
+        self, batch: ContractCallBatch, chain_id: str
+    ) -> Generator[None, None, List[Optional[Any]]]:
+        """Send a batch of contract calls and get the output of each one, or None if it failed."""
+        response = yield from self.get_contract_api_response(
+            performative=ContractApiMessage.Performative.GET_STATE,  # type: ignore
+            contract_address=self.params.multicall2_addresses.get(chain_id),
+            contract_id=MULTICALL2_CONTRACT_ID,
+            contract_callable="aggregate_calls",
+            calls=batch.calls,
+            chain_id=chain_id,
+        )
+        if response.performative != ContractApiMessage.Performative.STATE:
+            self.context.logger.error(
+                f"Could not make a batch of {len(batch.calls)} contract calls. "
+                f"Received: {response}"
+            )
+            return [None] * len(batch.calls)
+
+        results = cast(List[Dict[str, Any]], response.state.body["results"])
+        for call, result in zip(batch.calls, results):
+            if not result["success"]:
+                self.context.logger.warning(f"Contract call {call} failed.")
+        return [result["data"] if result["success"] else None for result in results]
+
     @staticmethod
     def __parse_rpc_error(error: str) -> RPCResponseStatus:
         """Parse an RPC error and return an `RPCResponseStatus`"""
@@ -2049,16 +2611,36 @@ class BaseBehaviour(
         :returns: the downloaded object, corresponding to ipfs_hash.
         """
         try:
-            message, dialogue = self._build_ipfs_store_file_req(
-                filename,
-                obj,
-                multiple,
-                filetype,
-                custom_storer,
-                timeout,
-                **kwargs,
+            local_hash: Optional[str] = None
+            if self.params.deduplicate_ipfs_uploads:
+                files = self._serialize_ipfs_objects(
+                    filename, obj, multiple, filetype, custom_storer, **kwargs
+                )
+                local_hash = IPFSLocalHash.hash_files(files)
+                ipfs_hash = self._get_stored_ipfs_hash(local_hash)
+                if ipfs_hash is not None:
+                    self.context.logger.info(
+                        f"{filename} is already stored to IPFS with hash: {ipfs_hash}. Skipping the upload."
+                    )
+                    return ipfs_hash
+                message, dialogue = self._build_ipfs_message(
+                    performative=IpfsMessage.Performative.STORE_FILES,  # type: ignore
+                    files=files,
+                    timeout=timeout,
+                )
+            else:
+                message, dialogue = self._build_ipfs_store_file_req(
+                    filename,
+                    obj,
+                    multiple,
+                    filetype,
+                    custom_storer,
+                    timeout,
+                    **kwargs,
+                )
+            ipfs_message = yield from self._do_ipfs_request_with_backoff(
+                dialogue, message, timeout
             )
-            ipfs_message = yield from self._do_ipfs_request(dialogue, message, timeout)
             if ipfs_message.performative != IpfsMessage.Performative.IPFS_HASH:
                 self.context.logger.error(
                     f"Expected performative {IpfsMessage.Performative.IPFS_HASH} but got {ipfs_message.performative}."
@@ -2068,6 +2650,8 @@ class BaseBehaviour(
             self.context.logger.info(
                 f"Successfully stored {filename} to IPFS with hash: {ipfs_hash}"
             )
+            if local_hash is not None:
+                self._record_stored_ipfs_hash(local_hash, ipfs_hash)
             return ipfs_hash
         except IPFSInteractionError as e:  # pragma: no cover
             self.context.logger.error(
@@ -2075,6 +2659,21 @@ class BaseBehaviour(
             )
             return None
 
+    def _get_stored_ipfs_hash(self, local_hash: str) -> Optional[str]:
+        """Get the hash returned by IPFS for content that has already been stored, using its locally computed hash."""
+        stored_ipfs_hashes = self.shared_state.stored_ipfs_hashes
+        ipfs_hash = stored_ipfs_hashes.get(local_hash)
+        if ipfs_hash is not None:
+            stored_ipfs_hashes.move_to_end(local_hash)
+        return ipfs_hash
+
+    def _record_stored_ipfs_hash(self, local_hash: str, ipfs_hash: str) -> None:
+        """Record the hash returned by IPFS for stored content, evicting the least recently used records if needed."""
+        stored_ipfs_hashes = self.shared_state.stored_ipfs_hashes
+        stored_ipfs_hashes[local_hash] = ipfs_hash
+        if len(stored_ipfs_hashes) > MAX_STORED_IPFS_HASHES:
+            stored_ipfs_hashes.popitem(last=False)
+
     def get_from_ipfs(  # pylint: disable=too-many-arguments
         self,
         ipfs_hash: str,
@@ -2093,7 +2692,9 @@ class BaseBehaviour(
         """
         try:
             message, dialogue = self._build_ipfs_get_file_req(ipfs_hash, timeout)
-            ipfs_message = yield from self._do_ipfs_request(dialogue, message, timeout)
+            ipfs_message = yield from self._do_ipfs_request_with_backoff(
+                dialogue, message, timeout
+            )
             if ipfs_message.performative != IpfsMessage.Performative.FILES:
                 self.context.logger.error(
                     f"Expected performative {IpfsMessage.Performative.FILES} but got {ipfs_message.performative}."
@@ -2130,6 +2731,56 @@ class BaseBehaviour(
         ipfs_message = cast(IpfsMessage, response)
         return ipfs_message
 
+    def _do_ipfs_request_with_backoff(
+        self,
+        dialogue: IpfsDialogue,
+        message: IpfsMessage,
+        timeout: Optional[float] = None,
+    ) -> Generator[None, None, IpfsMessage]:
+        """
+        Performs an IPFS request, retrying it with an exponential backoff while the IPFS node is overloaded.
+
+        The request is retried at most `max_attempts` times, starting with a delay of `request_retry_delay` seconds,
+        and it is not retried if the delay would exceed the timeout.
+
+        :param dialogue: the dialogue of the request.
+        :param message: the request.
+        :param timeout: the timeout for the request, including the retries.
+        :yield: None
+        :return: the response to the request.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        delay = self.params.request_retry_delay
+        attempt = 1
+        while True:
+            ipfs_message = yield from self._do_ipfs_request(dialogue, message, timeout)
+            overloaded = (
+                ipfs_message.performative == IpfsMessage.Performative.ERROR
+                and OVERLOADED_REASON in ipfs_message.reason
+            )
+            if not overloaded or attempt >= self.params.max_attempts:
+                return ipfs_message
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if delay >= remaining:
+                    return ipfs_message
+                timeout = remaining - delay
+            self.context.logger.warning(
+                f"{ipfs_message.reason} Retrying in {delay} seconds "
+                f"(attempt {attempt}/{self.params.max_attempts})."
+            )
+            yield from self.sleep(delay)
+            delay *= 2
+            attempt += 1
+            retried_content = (
+                dict(files=message.files)
+                if message.performative == IpfsMessage.Performative.STORE_FILES
+                else dict(ipfs_hash=message.ipfs_hash)
+            )
+            message, dialogue = self._build_ipfs_message(
+                message.performative, timeout, **retried_content
+            )
+
 
 class TmManager(BaseBehaviour):
     """Util class to be used for managing the tendermint node."""
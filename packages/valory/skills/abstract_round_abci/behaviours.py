@@ -358,6 +358,8 @@ class AbstractRoundBehaviour(  # pylint: disable=too-many-instance-attributes
 
     def act(self) -> None:
         """Implement the behaviour."""
+        # wake up the suspended behaviours whose deadline has passed
+        self.context.state.round_sequence.notify_due()
         tm_manager = cast(TmManager, self.tm_manager)
         if tm_manager.tm_communication_unhealthy or tm_manager.is_acting:
             # tendermint is not healthy, or we are already applying a fix.
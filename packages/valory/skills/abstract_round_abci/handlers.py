@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -23,6 +23,7 @@ import ipaddress
 import json
 from abc import ABC
 from calendar import timegm
+from concurrent.futures import Executor, ProcessPoolExecutor
 from dataclasses import asdict
 from enum import Enum
 from typing import Any, Callable, Dict, FrozenSet, List, Optional, cast
@@ -55,13 +56,13 @@ from packages.valory.skills.abstract_round_abci.base import (
     OffenseType,
     PendingOffense,
     SignatureNotValidError,
-    Transaction,
     TransactionNotValidError,
     TransactionTypeNotRecognizedError,
 )
 from packages.valory.skills.abstract_round_abci.behaviours import AbstractRoundBehaviour
 from packages.valory.skills.abstract_round_abci.dialogues import AbciDialogue
 from packages.valory.skills.abstract_round_abci.models import (
+    BaseParams,
     Requests,
     SharedState,
     TendermintRecoveryParams,
@@ -74,10 +75,76 @@ def exception_to_info_msg(exception: Exception) -> str:
 
 
 class ABCIRoundHandler(ABCIHandler):
-    """ABCI handler."""
+    """
+    ABCI handler.
+
+    The requests are handled in the order that they are received, and the connection
+    keeps the responses on each of Tendermint's sockets in the requests' order.
+    The mempool requests are answered as soon as they are handled, even while a block is being executed,
+    because Tendermint flushes the mempool connection before it sends the `commit` request.
+
+    If the `tx_verification_workers` parameter is set, the signatures of a block's transactions are verified in parallel.
+    To do so, the `deliver_tx` requests received after a `begin_block` request are buffered until the `end_block` request.
+    Then, the signers of all the buffered transactions are recovered in a process pool,
+    and the buffered requests are handled in the order that they were received, followed by the `end_block` request.
+    Therefore, the state transitions remain deterministic and in-order.
+    The responses to the `deliver_tx` requests are sent when the `end_block` request is received,
+    which is only supported by Tendermint's socket client, i.e., the ABCI connection should not be configured to use gRPC.
+    """
 
     SUPPORTED_PROTOCOL = AbciMessage.protocol_id
 
+    def __init__(self, **kwargs: Any) -> None:
+        """Initialize the handler."""
+        super().__init__(**kwargs)
+        self._verification_executor: Optional[Executor] = None
+        self._buffered_messages: List[AbciMessage] = []
+
+    def setup(self) -> None:
+        """Set up the handler."""
+        super().setup()
+        workers = cast(BaseParams, self.context.params).tx_verification_workers
+        if workers > 0:
+            self._verification_executor = ProcessPoolExecutor(max_workers=workers)
+
+    def teardown(self) -> None:
+        """Tear down the handler."""
+        if self._verification_executor is not None:
+            self._verification_executor.shutdown()
+            self._verification_executor = None
+        super().teardown()
+
+    def handle(self, message: Message) -> None:
+        """Handle the message, buffering the `deliver_tx` requests of a block if they are verified in parallel."""
+        message = cast(AbciMessage, message)
+        performative = message.performative
+        if (
+            performative == AbciMessage.Performative.REQUEST_DELIVER_TX
+            and self._verification_executor is not None
+        ):
+            self._buffered_messages.append(message)
+            return
+
+        if performative == AbciMessage.Performative.REQUEST_END_BLOCK:
+            messages, self._buffered_messages = self._buffered_messages, []
+            self._handle_batch(messages)
+        super().handle(message)
+
+    def _handle_batch(self, messages: List[AbciMessage]) -> None:
+        """Verify the transactions of the given requests in parallel if configured, and then handle them in order."""
+        if not messages:
+            return
+
+        if self._verification_executor is not None:
+            round_sequence = cast(SharedState, self.context.state).round_sequence
+            round_sequence.transaction_cache.verify_batch(
+                (message.tx for message in messages),
+                self.context.default_ledger_id,
+                self._verification_executor,
+            )
+        for message in messages:
+            super().handle(message)
+
     def info(self, message: AbciMessage, dialogue: AbciDialogue) -> AbciMessage:
         """
         Handle the 'info' request.
@@ -156,11 +223,13 @@ class ABCIRoundHandler(ABCIHandler):
     def check_tx(self, message: AbciMessage, dialogue: AbciDialogue) -> AbciMessage:
         """Handle the 'check_tx' request."""
         transaction_bytes = message.tx
+        round_sequence = cast(SharedState, self.context.state).round_sequence
         # check we can decode the transaction
         try:
-            transaction = Transaction.decode(transaction_bytes)
-            transaction.verify(self.context.default_ledger_id)
-            cast(SharedState, self.context.state).round_sequence.check_is_finished()
+            round_sequence.transaction_cache.decode_and_verify(
+                transaction_bytes, self.context.default_ledger_id
+            )
+            round_sequence.check_is_finished()
         except (
             SignatureNotValidError,
             TransactionNotValidError,
@@ -228,11 +297,12 @@ class ABCIRoundHandler(ABCIHandler):
         round_sequence = cast(SharedState, self.context.state).round_sequence
         payload_sender: Optional[str] = None
         try:
-            transaction = Transaction.decode(transaction_bytes)
-            transaction.verify(self.context.default_ledger_id)
+            transaction = round_sequence.transaction_cache.decode_and_verify(
+                transaction_bytes, self.context.default_ledger_id, delivered=True
+            )
             payload_sender = transaction.payload.sender
             round_sequence.check_is_finished()
-            round_sequence.deliver_tx(transaction)
+            round_sequence.deliver_tx(transaction, transaction_bytes)
         except (
             SignatureNotValidError,
             TransactionNotValidError,
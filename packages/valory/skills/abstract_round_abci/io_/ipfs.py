@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -23,6 +23,9 @@
 import os
 from typing import Any, Dict, Optional, Type
 
+from aea.helpers.cid import to_v1
+from aea.helpers.ipfs.base import IPFSHashOnly, PBNode, unixfs_pb2
+
 from packages.valory.skills.abstract_round_abci.io_.load import (
     CustomLoaderType,
     Loader,
@@ -39,6 +42,47 @@ class IPFSInteractionError(Exception):
     """A custom exception for IPFS interaction errors."""
 
 
+class IPFSLocalHash(IPFSHashOnly):
+    """Computes the IPFS hash of the files to be stored, the same way the IPFS connection stores them."""
+
+    @classmethod
+    def hash_files(cls, files: Dict[str, str]) -> str:
+        """
+        Get the CIDv1 of the given serialized files, wrapped with a directory.
+
+        :param files: the serialized files, as they are sent to the IPFS connection.
+        :return: the CIDv1 of the files.
+        """
+        contents = {
+            os.path.basename(path): data.encode("utf-8") for path, data in files.items()
+        }
+        if len(contents) == 1:
+            ((name, data),) = contents.items()
+            return cls.hash_bytes(data, wrap=True, cid_v1=True, file_name_if_wrap=name)
+
+        dir_node = PBNode()
+        content_size = 0
+        for name, data in sorted(contents.items()):
+            file_pb, file_length = cls._pb_serialize_bytes(data)
+            link = cls.create_link(
+                cls._generate_multihash_bytes(file_pb), file_length, name
+            )
+            dir_node.Links.append(link)  # type: ignore # pylint: disable=no-member
+            content_size += file_length
+
+        dir_node_data = unixfs_pb2.Data()  # type: ignore # pylint: disable=no-member
+        dir_node_data.Type = unixfs_pb2.Data.Directory  # type: ignore # pylint: disable=no-member
+        dir_node.Data = dir_node_data.SerializeToString(deterministic=True)
+        dir_node_serialization = cls._serialize(dir_node)
+        dirname = os.path.basename(os.path.dirname(next(iter(files))))
+        link = cls.create_link(
+            cls._generate_multihash_bytes(dir_node_serialization),
+            len(dir_node_serialization) + content_size,
+            dirname,
+        )
+        return to_v1(cls.wrap_in_a_node(link))
+
+
 class IPFSInteract:
     """Class for interacting with IPFS."""
 
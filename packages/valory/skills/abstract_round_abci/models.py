@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2024 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -25,8 +25,9 @@ from abc import ABC, ABCMeta
 from collections import Counter
 from dataclasses import dataclass
 from enum import Enum
+from math import ceil
 from pathlib import Path
-from time import time
+from time import perf_counter_ns
 from typing import (
     Any,
     Callable,
@@ -321,6 +322,43 @@ class BaseParams(
         self.setup_params: Dict[str, Any] = self._ensure("setup", kwargs, dict)
         # TODO add to all configs
         self.default_chain_id: str = kwargs.get("default_chain_id", DEFAULT_CHAIN)
+        # the Merkle app hash is a different commitment than the legacy one, all the agents need to agree on it
+        self.use_merkle_app_hash: bool = self._ensure(
+            "use_merkle_app_hash", kwargs, bool
+        )
+        # the number of processes to use for verifying the transactions of a block in parallel, 0 to disable
+        self.tx_verification_workers: int = self._ensure_gte(
+            "tx_verification_workers", kwargs, int, min_value=0
+        )
+        # only enable the binary payload encoding once all the agents of the service are able to decode it
+        self.binary_payload_encoding: bool = self._ensure(
+            "binary_payload_encoding", kwargs, bool
+        )
+        # confirm the delivery of the agent's own transactions from the local ABCI app, instead of polling Tendermint
+        self.pipelined_a2a_transactions: bool = self._ensure(
+            "pipelined_a2a_transactions", kwargs, bool
+        )
+        # the addresses of the Multicall2 contract by chain id, used to batch the read-only contract calls
+        self.multicall2_addresses: Dict[str, str] = self._ensure(
+            "multicall2_addresses", kwargs, Dict[str, str]
+        )
+        # skip uploading content to IPFS if the agent has already stored it, by computing its hash locally
+        self.deduplicate_ipfs_uploads: bool = self._ensure(
+            "deduplicate_ipfs_uploads", kwargs, bool
+        )
+        # the seconds for which the contract state read at the latest block is cached, `None` to disable the cache
+        # the final state, e.g., the status of a mined transaction, is cached indefinitely if the cache is enabled
+        self.contract_state_cache_ttl: Optional[float] = self._ensure(
+            "contract_state_cache_ttl", kwargs, Optional[float]
+        )
+        # the number of the latest blocks to keep in full, older blocks keep only their headers and tx hashes
+        self.blockchain_retention: Optional[int] = self._ensure(
+            "blockchain_retention", kwargs, Optional[int]
+        )
+        enforce(
+            self.blockchain_retention is None or self.blockchain_retention >= 1,
+            "`blockchain_retention` must be greater than or equal to 1.",
+        )
 
         # we sanitize for null values as these are just kept for schema definitions
         skill_id = kwargs["skill_context"].skill_id
@@ -438,6 +476,14 @@ class SharedState(Model, ABC, metaclass=_MetaSharedState):  # type: ignore
         self.initial_tm_configs: Dict[str, Optional[Dict[str, Any]]] = {}
         # a mapping of the other agents' addresses to ACN deliverables
         self.address_to_acn_deliverable: Dict[str, Any] = {}
+        # the hashes returned by IPFS for the content stored by the agent, keyed by their locally computed CIDv1
+        self.stored_ipfs_hashes: "OrderedDict[str, str]" = OrderedDict()
+        # the cached contract api responses, keyed by their request, along with their expiry, `None` if they never expire
+        self.contract_state_cache: "OrderedDict[str, Tuple[Optional[float], Any]]" = (
+            OrderedDict()
+        )
+        # the height of the last committed block when the cached contract api responses were last read
+        self.contract_state_cache_height: Optional[int] = None
         self.tm_recovery_params: TendermintRecoveryParams = TendermintRecoveryParams(
             self.abci_app_cls.initial_round_cls.auto_round_id()
         )
@@ -497,14 +543,17 @@ class SharedState(Model, ABC, metaclass=_MetaSharedState):  # type: ignore
 
     def setup(self) -> None:
         """Set up the model."""
-        self._round_sequence = RoundSequence(self.context, self.abci_app_cls)
-        setup_params = cast(BaseParams, self.context.params).setup_params
+        params = cast(BaseParams, self.context.params)
+        self._round_sequence = RoundSequence(
+            self.context, self.abci_app_cls, params.blockchain_retention
+        )
         self.round_sequence.setup(
             BaseSynchronizedData(
                 AbciAppDB(
-                    setup_data=AbciAppDB.data_to_lists(setup_params),
+                    setup_data=AbciAppDB.data_to_lists(params.setup_params),
                     cross_period_persisted_keys=self.abci_app_cls.cross_period_persisted_keys,
                     logger=self.context.logger,
+                    use_merkle_hash=params.use_merkle_app_hash,
                 )
             ),
             self.context.logger,
@@ -751,6 +800,12 @@ class ApiSpecs(Model, FrozenMixin, TypeCheckMixin):
         return self.retries_info.retries_attempted > self.retries_info.retries
 
 
+NANOSECONDS_PER_SECOND = 10**9
+HISTOGRAM_SUB_BUCKET_BITS = 5
+HISTOGRAM_PERCENTILES = (50, 95, 99)
+SPAN_SEPARATOR = "/"
+
+
 class BenchmarkBlockTypes(Enum):
     """Benchmark block types."""
 
@@ -759,33 +814,115 @@ class BenchmarkBlockTypes(Enum):
     TOTAL = "total"
 
 
+class LatencyHistogram:
+    """
+    A compact, HDR-style histogram of latencies, in nanoseconds.
+
+    The samples are counted in log-linear buckets, so that a histogram only takes a few hundred integers,
+    while the percentiles are reported with a relative error of at most `1 / 2 ** HISTOGRAM_SUB_BUCKET_BITS`.
+    """
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    @staticmethod
+    def _bucket_index(value: int) -> int:
+        """Get the index of the bucket that a value falls in."""
+        shift = max(0, value.bit_length() - HISTOGRAM_SUB_BUCKET_BITS - 1)
+        return (shift << HISTOGRAM_SUB_BUCKET_BITS) + (value >> shift)
+
+    @staticmethod
+    def _bucket_value(index: int) -> int:
+        """Get the lowest value of a bucket."""
+        shift = max(0, (index >> HISTOGRAM_SUB_BUCKET_BITS) - 1)
+        return (index - (shift << HISTOGRAM_SUB_BUCKET_BITS)) << shift
+
+    def record(self, value: int) -> None:
+        """Record a sample."""
+        index = self._bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        if self.count == 0 or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def percentile(self, percentile: float) -> int:
+        """Get the value below which the given percentage of the samples fall."""
+        rank = max(1, ceil(percentile / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                highest = self._bucket_value(index + 1) - 1
+                return max(self.min, min(highest, self.max))
+        return self.max
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Get the histogram's summary and its non-empty buckets, as `[lowest value, count]` pairs."""
+        data: Dict[str, Any] = {
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+        for percentile in HISTOGRAM_PERCENTILES:
+            data[f"p{percentile}"] = self.percentile(percentile)
+        data["buckets"] = [
+            [self._bucket_value(index), self.counts[index]]
+            for index in sorted(self.counts)
+        ]
+        return data
+
+
 class BenchmarkBlock:
     """
     Benchmark
 
     This class represents logic to measure the code block using a
-    context manager.
+    context manager. The total time is the duration of the last execution
+    of the block, while every execution is added to its accumulated time
+    and recorded to its histogram.
     """
 
-    start: float
+    start: int
     total_time: float
+    accumulated_time: float
     block_type: str
+    histogram: LatencyHistogram
 
-    def __init__(self, block_type: str) -> None:
+    def __init__(self, block_type: str, spans: Optional[List[str]] = None) -> None:
         """Benchmark for single round."""
         self.block_type = block_type
         self.start = 0
         self.total_time = 0
+        self.accumulated_time = 0
+        self.histogram = LatencyHistogram()
+        self._spans = [] if spans is None else spans
 
     def __enter__(
         self,
     ) -> None:
         """Enter context."""
-        self.start = time()
+        self._spans.append(self.block_type)
+        self.start = perf_counter_ns()
 
     def __exit__(self, *args: List, **kwargs: Dict) -> None:
         """Exit context"""
-        self.total_time = time() - self.start
+        elapsed = perf_counter_ns() - self.start
+        self._spans.pop()
+        self.total_time = elapsed / NANOSECONDS_PER_SECOND
+        self.accumulated_time += self.total_time
+        self.histogram.record(elapsed)
 
 
 class BenchmarkBehaviour:
@@ -802,6 +939,7 @@ class BenchmarkBehaviour:
     ) -> None:
         """Initialize Benchmark behaviour object."""
         self.local_data = {}
+        self._spans: List[str] = []
 
     def _measure(self, block_type: str) -> BenchmarkBlock:
         """
@@ -812,7 +950,7 @@ class BenchmarkBehaviour:
         """
 
         if block_type not in self.local_data:
-            self.local_data[block_type] = BenchmarkBlock(block_type)
+            self.local_data[block_type] = BenchmarkBlock(block_type, self._spans)
 
         return self.local_data[block_type]
 
@@ -828,6 +966,44 @@ class BenchmarkBehaviour:
         """Measure consensus block."""
         return self._measure(BenchmarkBlockTypes.CONSENSUS.value)
 
+    def span(self, name: str) -> BenchmarkBlock:
+        """
+        Measure a custom block, nested in the blocks which are currently being measured.
+
+        :param name: the name of the span.
+        :return: a BenchmarkBlock, named after the path of the span, e.g., `local/request`.
+        """
+        if self._spans:
+            name = SPAN_SEPARATOR.join((self._spans[-1], name))
+        return self._measure(name)
+
+
+class _DisabledBenchmarkBlock(BenchmarkBlock):
+    """A benchmark block which does not measure anything."""
+
+    def __enter__(self) -> None:
+        """Enter context."""
+
+    def __exit__(self, *args: List, **kwargs: Dict) -> None:
+        """Exit context"""
+
+
+class _DisabledBenchmarkBehaviour(BenchmarkBehaviour):
+    """A benchmark behaviour which does not measure anything."""
+
+    _block = _DisabledBenchmarkBlock("disabled")
+
+    def _measure(self, block_type: str) -> BenchmarkBlock:
+        """Returns the disabled BenchmarkBlock."""
+        return self._block
+
+
+@dataclass
+class _BenchmarkSwitch:
+    """A mutable on/off switch, so that the frozen benchmark tool can be toggled."""
+
+    on: bool = True
+
 
 class BenchmarkTool(Model, TypeCheckMixin, FrozenMixin):
     """
@@ -839,20 +1015,49 @@ class BenchmarkTool(Model, TypeCheckMixin, FrozenMixin):
     benchmark_data: Dict[str, BenchmarkBehaviour]
     log_dir: Path
 
+    _disabled_behaviour = _DisabledBenchmarkBehaviour()
+
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         """Benchmark tool for rounds behaviours."""
         self.benchmark_data = {}
         log_dir_ = self._ensure("log_dir", kwargs, str)
         self.log_dir = Path(log_dir_)
+        self._switch = _BenchmarkSwitch(kwargs.pop("enabled", True))
         super().__init__(*args, **kwargs)
         self._frozen = True
 
+    @property
+    def enabled(self) -> bool:
+        """Whether the tool is measuring the behaviours."""
+        return self._switch.on
+
+    def enable(self) -> None:
+        """Start measuring the behaviours."""
+        self._switch.on = True
+
+    def disable(self) -> None:
+        """Stop measuring the behaviours. The blocks measured while disabled are not recorded."""
+        self._switch.on = False
+
     def measure(self, behaviour: str) -> BenchmarkBehaviour:
         """Measure time to complete round."""
+        if not self._switch.on:
+            return self._disabled_behaviour
         if behaviour not in self.benchmark_data:
             self.benchmark_data[behaviour] = BenchmarkBehaviour()
         return self.benchmark_data[behaviour]
 
+    @staticmethod
+    def _with_total(times: Dict[str, float]) -> Dict[str, float]:
+        """Add the total of the blocks to their times."""
+        # the nested spans are already included in the time of their parents
+        times[BenchmarkBlockTypes.TOTAL.value] = sum(
+            block_time
+            for block_type, block_time in times.items()
+            if SPAN_SEPARATOR not in block_type
+        )
+        return times
+
     @property
     def data(
         self,
@@ -861,14 +1066,28 @@ class BenchmarkTool(Model, TypeCheckMixin, FrozenMixin):
 
         behavioural_data = []
         for behaviour, tool in self.benchmark_data.items():
-            data = {k: v.total_time for k, v in tool.local_data.items()}
-            data[BenchmarkBlockTypes.TOTAL.value] = sum(data.values())
-            behavioural_data.append({"behaviour": behaviour, "data": data})
+            data = self._with_total(
+                {k: v.total_time for k, v in tool.local_data.items()}
+            )
+            accumulated = self._with_total(
+                {k: v.accumulated_time for k, v in tool.local_data.items()}
+            )
+            histograms = {k: v.histogram.data for k, v in tool.local_data.items()}
+            behavioural_data.append(
+                {
+                    "behaviour": behaviour,
+                    "data": data,
+                    "accumulated": accumulated,
+                    "histograms": histograms,
+                }
+            )
 
         return behavioural_data
 
     def save(self, period: int = 0, reset: bool = True) -> None:
         """Save logs to a file."""
+        if not self._switch.on and not self.benchmark_data:
+            return
 
         try:
             self.log_dir.mkdir(exist_ok=True)
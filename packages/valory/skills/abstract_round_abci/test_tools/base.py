@@ -399,12 +399,15 @@ class FSMBehaviourBaseCase(BaseSkillTestCase, ABC):
         ][done_event](abci_app.synchronized_data, context=MagicMock())
         abci_app._previous_rounds.append(old_round)
         abci_app._current_round_height += 1
+        current_behaviour.context.state.round_sequence._notify_waiters()
         self.behaviour._process_current_round()
 
     def _test_done_flag_set(self) -> None:
         """Test that, when round ends, the 'done' flag is set."""
         current_behaviour = cast(BaseBehaviour, self.behaviour.current_behaviour)
         assert not current_behaviour.is_done()  # nosec
+        # the round sequence notifies the waiting behaviour when the round ends
+        self.behaviour.context.state.round_sequence._notify_waiters()
         with mock.patch.object(
             self.behaviour.context.state, "_round_sequence"
         ) as mock_round_sequence:
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2024 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -21,16 +21,20 @@
 
 import dataclasses
 import datetime
+import hashlib
 import json
 import logging
+import pickle  # nosec
 import re
 import shutil
 from abc import ABC
 from calendar import timegm
-from collections import deque
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from contextlib import suppress
 from copy import copy, deepcopy
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 from time import sleep
 from typing import (
@@ -104,19 +108,25 @@ from packages.valory.skills.abstract_round_abci.base import (
     CollectionRound,
     EventType,
     LateArrivingTransaction,
+    MAX_DELIVERED_PAYLOAD_IDS,
+    MerkleTree,
     OffenceStatus,
     OffenseStatusDecoder,
     OffenseStatusEncoder,
     OffenseType,
+    PayloadEncoding,
     RoundSequence,
     SignatureNotValidError,
     SlashingNotConfiguredError,
     Timeouts,
     Transaction,
+    TransactionNotValidError,
     TransactionTypeNotRecognizedError,
+    VerifiedTransactionCache,
     _MetaAbciApp,
     _MetaAbstractRound,
     _MetaPayload,
+    _Tally,
     get_name,
     light_offences,
     serious_offences,
@@ -236,6 +246,27 @@ def test_base_tx_payload() -> None:
     assert type(hash(payload)) == int
 
 
+def test_base_tx_payload_projections() -> None:
+    """Test that the projections of a payload do not alter its equality, its hash, or its serialization."""
+
+    payload = DummyPayload(sender="sender", dummy_attribute=1)
+    same_payload = copy(payload)
+
+    assert payload.data == {"dummy_attribute": 1}
+    assert payload.values == (1,)
+    assert payload == same_payload
+    assert hash(payload) == hash(same_payload)
+    assert vars(payload) == vars(same_payload)
+
+    assert pickle.loads(pickle.dumps(payload)) == payload  # nosec
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        round_tripped = executor.submit(copy, payload).result()
+    assert round_tripped == payload
+    assert hash(round_tripped) == hash(payload)
+    assert round_tripped.data == payload.data
+    assert round_tripped.values == payload.values
+
+
 def test_meta_round_abstract_round_when_instance_not_subclass_of_abstract_round() -> (
     None
 ):
@@ -326,6 +357,117 @@ class TestTransactions:
         transaction = Transaction(payload, signature)
         transaction.verify(crypto.identifier)
 
+    @pytest.mark.parametrize("payload_cls", (PayloadA, PayloadB, PayloadC, PayloadD))
+    def test_encode_decode_binary(self, payload_cls: Type[BaseTxPayload]) -> None:
+        """Test binary encoding and decoding of payloads."""
+        expected_payload = payload_cls(sender="sender")
+        encoded = expected_payload.encode(PayloadEncoding.BINARY)
+        assert len(encoded) < len(expected_payload.encode())
+        actual_payload = BaseTxPayload.decode(encoded)
+        assert expected_payload == actual_payload
+        assert actual_payload.id_ == expected_payload.id_
+        assert actual_payload.round_count == expected_payload.round_count
+
+    def test_encode_decode_binary_with_values(self) -> None:
+        """Test binary encoding and decoding of a payload with values."""
+        expected_payload = SomeClass(sender="sender", content={"b": [1, 2], "a": None})
+        actual_payload = BaseTxPayload.decode(
+            expected_payload.encode(PayloadEncoding.BINARY)
+        )
+        assert expected_payload == actual_payload
+
+    @pytest.mark.parametrize(
+        "encoded, error, match",
+        (
+            (
+                b"\xff\x02\x07\x00",
+                TransactionNotValidError,
+                "Unsupported binary encoding version",
+            ),
+            (b"\xff\x01\x09", TransactionNotValidError, "Invalid binary encoded data"),
+            (
+                b"\xff\x01\x07\x00",
+                TransactionNotValidError,
+                "Invalid binary encoded payload",
+            ),
+            (
+                b"\xff\x01\x07\x04\x03\x00\x05\x00\x03\x00\x05\x00",
+                TransactionTypeNotRecognizedError,
+                "Unknown payload type id 0",
+            ),
+        ),
+    )
+    def test_decode_binary_invalid(
+        self, encoded: bytes, error: Type[Exception], match: str
+    ) -> None:
+        """Test decoding invalid binary encoded payloads."""
+        with pytest.raises(error, match=match):
+            BaseTxPayload.decode(encoded)
+
+    def test_decode_binary_wrong_number_of_values(self) -> None:
+        """Test decoding a binary encoded payload with a wrong number of values."""
+        encoded = PayloadA("sender").encode(PayloadEncoding.BINARY)
+        extra_value = bytes([encoded[3] + 1])
+        with pytest.raises(
+            TransactionNotValidError, match="Expected 0 values for PayloadA, got 1"
+        ):
+            BaseTxPayload.decode(encoded[:3] + extra_value + encoded[4:] + b"\x00")
+
+    def test_sign_verify_binary_transaction(self) -> None:
+        """Test sign/verify of a binary encoded transaction."""
+        crypto = EthereumCrypto()
+        payload = PayloadA(crypto.address)
+        signature = crypto.sign_message(payload.encode(PayloadEncoding.BINARY))
+        transaction = Transaction(payload, signature, PayloadEncoding.BINARY)
+        encoded = transaction.encode()
+        assert len(encoded) < len(Transaction(payload, signature).encode())
+
+        decoded = Transaction.decode(encoded)
+        assert decoded == transaction
+        assert decoded.encoding == PayloadEncoding.BINARY
+        decoded.verify(crypto.identifier)
+        with pytest.raises(SignatureNotValidError):
+            Transaction(payload, signature).verify(crypto.identifier)
+
+    def test_decode_binary_transaction_invalid(self) -> None:
+        """Test decoding an invalid binary encoded transaction."""
+        with pytest.raises(
+            TransactionNotValidError, match="Invalid binary encoded transaction"
+        ):
+            Transaction.decode(b"\xff\x01\x07\x00")
+
+    def test_type_id_collision(self) -> None:
+        """Test that a payload class cannot take the type id of another payload class."""
+        with mock.patch.object(
+            _MetaPayload, "type_id", return_value=0
+        ), mock.patch.dict(_MetaPayload.type_ids, {0: PayloadA}), pytest.raises(
+            ValueError,
+            match=f"is already registered to {PayloadA.__module__}.PayloadA",
+        ):
+
+            class CollidingPayload(BaseTxPayload):  # pylint: disable=unused-variable
+                """A payload class whose type id collides with `PayloadA`'s."""
+
+    def test_projections(self) -> None:
+        """Test that the payload's data and values are not deep-copied, nor stored on the payload."""
+        payload = SomeClass(sender="sender", content={"a": 1})
+        with mock.patch.object(abci_base, "asdict") as asdict_mock:
+            assert payload.data == {"content": {"a": 1}}
+            assert payload.values == ({"a": 1},)
+            assert payload.data["content"] is payload.content
+            assert payload.values[0] is payload.content
+        asdict_mock.assert_not_called()
+        assert "data" not in vars(payload)
+        assert "values" not in vars(payload)
+        assert payload.with_new_id().data == payload.data
+        assert payload.json == {
+            "_metaclass_registry_key": f"{__name__}.SomeClass",
+            "content": {"a": 1},
+            "id_": payload.id_,
+            "round_count": payload.round_count,
+            "sender": "sender",
+        }
+
     def test_payload_not_equal_lookalike(self) -> None:
         """Test payload __eq__ reflection via NotImplemented"""
         payload = PayloadA(sender="sender")
@@ -356,6 +498,107 @@ def test_verify_transaction_negative_case(*_mocks: Any) -> None:
         transaction.verify("")
 
 
+class TestVerifiedTransactionCache:
+    """Test `VerifiedTransactionCache`."""
+
+    def setup(self) -> None:
+        """Set up the test."""
+        self.crypto = EthereumCrypto()
+        self.cache = VerifiedTransactionCache(maxsize=2)
+
+    def _transaction_bytes(self, payload: BaseTxPayload) -> bytes:
+        """Get the bytes of a transaction with the given payload, signed by the test's crypto."""
+        signature = self.crypto.sign_message(payload.encode())
+        return Transaction(payload, signature).encode()
+
+    def test_invalid_size(self) -> None:
+        """Test that a non-positive size is not accepted."""
+        with pytest.raises(ValueError, match="The cache's size must be positive"):
+            VerifiedTransactionCache(maxsize=0)
+
+    def test_hit_and_miss(self) -> None:
+        """Test that a transaction is verified only once."""
+        payload = PayloadA(self.crypto.address)
+        tx_bytes = self._transaction_bytes(payload)
+        with mock.patch.object(Transaction, "verify", autospec=True) as verify_mock:
+            first = self.cache.decode_and_verify(tx_bytes, self.crypto.identifier)
+            second = self.cache.decode_and_verify(tx_bytes, self.crypto.identifier)
+        verify_mock.assert_called_once()
+        assert first is second
+        assert first.payload == payload
+        assert (self.cache.hits, self.cache.misses) == (1, 1)
+
+    def test_invalid_not_cached(self) -> None:
+        """Test that invalid transactions are not cached."""
+        payload = PayloadA(self.crypto.address)
+        signature = EthereumCrypto().sign_message(payload.encode())
+        tx_bytes = Transaction(payload, signature).encode()
+        for _ in range(2):
+            with pytest.raises(SignatureNotValidError):
+                self.cache.decode_and_verify(tx_bytes, self.crypto.identifier)
+        assert len(self.cache) == 0
+        assert self.cache.misses == 2
+
+    def test_lru_eviction(self) -> None:
+        """Test that the least recently used transaction is evicted when the cache is full."""
+        tx_a, tx_b, tx_c = (
+            self._transaction_bytes(payload_cls(self.crypto.address))
+            for payload_cls in (PayloadA, PayloadB, PayloadC)
+        )
+        for tx_bytes in (tx_a, tx_b, tx_a, tx_c):
+            self.cache.decode_and_verify(tx_bytes, self.crypto.identifier)
+        assert len(self.cache) == 2
+        self.cache.decode_and_verify(tx_a, self.crypto.identifier)
+        assert (self.cache.hits, self.cache.misses) == (2, 3)
+        self.cache.decode_and_verify(tx_b, self.crypto.identifier)
+        assert self.cache.misses == 4
+
+    def test_verify_batch(self) -> None:
+        """Test verifying a batch of transactions concurrently."""
+        self.cache = VerifiedTransactionCache()
+        valid = [
+            self._transaction_bytes(payload_cls(self.crypto.address))
+            for payload_cls in (PayloadA, PayloadB)
+        ]
+        payload = PayloadC(self.crypto.address)
+        wrong_signer = Transaction(
+            payload, EthereumCrypto().sign_message(payload.encode())
+        ).encode()
+        malformed_signature = Transaction(
+            PayloadD(self.crypto.address), "0x00"
+        ).encode()
+        with ThreadPoolExecutor() as executor:
+            self.cache.verify_batch(
+                [*valid, valid[0], wrong_signer, malformed_signature, b"not a tx"],
+                self.crypto.identifier,
+                executor,
+            )
+        assert len(self.cache) == 2
+        assert self.cache.misses == 4
+
+        for tx_bytes in valid:
+            self.cache.decode_and_verify(tx_bytes, self.crypto.identifier)
+        assert self.cache.hits == 2
+        with pytest.raises(SignatureNotValidError):
+            self.cache.decode_and_verify(wrong_signer, self.crypto.identifier)
+
+    def test_eviction(self) -> None:
+        """Test evicting the delivered transactions and clearing the cache."""
+        checked, delivered = (
+            self._transaction_bytes(payload_cls(self.crypto.address))
+            for payload_cls in (PayloadA, PayloadB)
+        )
+        self.cache.decode_and_verify(checked, self.crypto.identifier)
+        self.cache.decode_and_verify(delivered, self.crypto.identifier)
+        self.cache.decode_and_verify(delivered, self.crypto.identifier, delivered=True)
+        self.cache.evict_delivered()
+        assert len(self.cache) == 1
+        self.cache.decode_and_verify(checked, self.crypto.identifier)
+        assert self.cache.hits == 2
+        self.cache.clear()
+        assert len(self.cache) == 0
+
+
 @dataclass(frozen=True)
 class SomeClass(BaseTxPayload):
     """Test class."""
@@ -425,6 +668,90 @@ class TestBlockchain:
         """Test 'blocks' property getter."""
         assert self.blockchain.blocks == tuple()
 
+    def test_retention(self) -> None:
+        """Test that only the latest blocks are kept in full when a retention is given."""
+        blockchain = Blockchain(retention=2)
+        assert blockchain.retention == 2
+        transaction = Transaction(BaseTxPayload("sender"), "signature")
+        blocks = [
+            Block(MagicMock(height=height), [transaction] * height)
+            for height in range(1, 5)
+        ]
+        for block in blocks:
+            blockchain.add_block(block)
+
+        assert blockchain.length == blockchain.height == 4
+        assert blockchain.blocks == tuple(blocks[2:])
+        assert blockchain.last_block is blocks[-1]
+        pruned_blocks = blockchain.pruned_blocks
+        assert [block.header for block in pruned_blocks] == [
+            block.header for block in blocks[:2]
+        ]
+        assert pruned_blocks[0].timestamp == blocks[0].timestamp
+        tx_hash = hashlib.sha256(transaction.encode()).digest()
+        assert pruned_blocks[1].transaction_hashes == (tx_hash, tx_hash)
+        assert blockchain.memory_stats == {
+            "blocks": 2,
+            "pruned_blocks": 2,
+            "dropped_blocks": 0,
+            "transactions": 7,
+            "transaction_hashes": 3,
+        }
+
+        with pytest.raises(AddBlockError, match="expected height 5, got 4"):
+            blockchain.add_block(blocks[-1])
+
+    def test_pruned_retention(self) -> None:
+        """Test that only the latest pruned blocks are kept."""
+        blockchain = Blockchain(retention=1, pruned_retention=2)
+        transaction = Transaction(BaseTxPayload("sender"), "signature")
+        blocks = [
+            Block(MagicMock(height=height), [transaction] * height)
+            for height in range(1, 6)
+        ]
+        for block in blocks:
+            blockchain.add_block(block)
+
+        assert blockchain.length == blockchain.height == 5
+        assert blockchain.blocks == (blocks[-1],)
+        assert [block.header for block in blockchain.pruned_blocks] == [
+            block.header for block in blocks[2:4]
+        ]
+        assert blockchain.memory_stats == {
+            "blocks": 1,
+            "pruned_blocks": 2,
+            "dropped_blocks": 2,
+            "transactions": 5,
+            "transaction_hashes": 7,
+        }
+
+    def test_pruned_retention_invalid(self) -> None:
+        """Test that the pruned blocks' retention must be positive."""
+        with pytest.raises(
+            ValueError, match="The pruned blocks' retention must be positive, got 0."
+        ):
+            Blockchain(pruned_retention=0)
+
+    def test_raw_transaction_hashes(self) -> None:
+        """Test that the pruned blocks keep the hashes of the raw transactions, as computed by Tendermint."""
+        blockchain = Blockchain(retention=1)
+        transaction = Transaction(BaseTxPayload("sender"), "signature")
+        raw_transaction = b"raw transaction"
+        block_builder = BlockBuilder()
+        for height in (1, 2):
+            block_builder.reset()
+            block_builder.header = MagicMock(height=height)
+            block_builder.add_transaction(transaction, raw_transaction)
+            blockchain.add_block(block_builder.get_block())
+
+        (pruned_block,) = blockchain.pruned_blocks
+        assert pruned_block.transaction_hashes == (
+            hashlib.sha256(raw_transaction).digest(),
+        )
+
+        with pytest.raises(ValueError, match="expected 1 transaction hashes, got 0"):
+            Block(MagicMock(), [transaction], [])
+
 
 class TestBlockBuilder:
     """Test block builder."""
@@ -603,7 +930,8 @@ class TestAbciAppDB:
         db.setup_data.update({data_key: ["altered"]})
         assert db.setup_data == expected_data, mutability_error_message
 
-        db.setup_data[data_key].append("altered")
+        with pytest.raises(TypeError, match="'FrozenList' object is read-only"):
+            db.setup_data[data_key].append("altered")
         assert db.setup_data == expected_data, mutability_error_message
 
     def test_cross_period_persisted_keys(self) -> None:
@@ -639,7 +967,8 @@ class TestAbciAppDB:
             retrieved = getattr(self.db, getter)(**kwargs)
             if getter.startswith("get_latest"):
                 retrieved = retrieved[mutable_key]
-            retrieved.append("new_value_attempt")
+            with pytest.raises(TypeError, match="'FrozenList' object is read-only"):
+                retrieved.append("new_value_attempt")
 
             if self.db.get(mutable_key) != mutable_value:
                 mutable_getters.add(getter)
@@ -991,6 +1320,108 @@ class TestAbciAppDB:
         )
         assert self.db.hash() == expected_hash
 
+    @staticmethod
+    def _populate(db: AbciAppDB) -> None:
+        """Perform some updates, period creations and cleanups on the given db."""
+        db.update(participants=("a", "b", "c"), most_voted={"x": [1, 2]})
+        db.update(participants=("a", "c"), new_key=1)
+        db.create(
+            all_participants=("a", "b", "c"),
+            consensus_threshold=2,
+            safe_contract_address="0x",
+        )
+        db.update(most_voted=None, another_key="value")
+        db.update(another_key="other value")
+        db.cleanup(1, 1)
+        db.slashing_config = "serialized_config"
+
+    def test_merkle_hash(self) -> None:
+        """Test `hash` method when the Merkle commitment is used."""
+        db = AbciAppDB(
+            setup_data=dict(participants=[self.participants]),
+            use_merkle_hash=True,
+        )
+        assert db.use_merkle_hash and not self.db.use_merkle_hash
+        assert db.hash() != self.db.hash()
+
+        hashes = set()
+        for _ in range(3):
+            db.update(counter=len(hashes))
+            hashes.add(db.hash())
+        assert len(hashes) == 3
+
+        db_copy = AbciAppDB(setup_data={}, use_merkle_hash=True)
+        db_copy.sync(db.serialize())
+        assert db_copy.hash() == db.hash()
+
+    def test_merkle_hash_incremental(self) -> None:
+        """Test that the incrementally updated Merkle root equals the one of a db built from scratch."""
+        db = AbciAppDB(
+            setup_data=dict(participants=[self.participants]),
+            use_merkle_hash=True,
+        )
+        db.hash()
+        self._populate(db)
+        other_db = AbciAppDB(
+            setup_data=dict(participants=[self.participants]),
+            use_merkle_hash=True,
+        )
+        self._populate(other_db)
+        synced_db = AbciAppDB(setup_data={}, use_merkle_hash=True)
+        synced_db.sync(db.serialize())
+        assert db.hash() == other_db.hash() == synced_db.hash()
+
+        synced_db.update(another_key="value")
+        assert synced_db.hash() != db.hash()
+
+
+@given(lists(integers(min_value=0, max_value=5)))
+def test_tally(items: List[int]) -> None:
+    """Test that `_Tally` agrees with `Counter.most_common`, including the way that ties are broken."""
+    tally = _Tally(items)
+    counter = Counter(items)
+    assert tally.count == counter
+    if items:
+        assert (tally.most_common, tally.max_count) == counter.most_common(1)[0]
+    else:
+        assert (tally.most_common, tally.max_count) == (None, 0)
+
+
+class TestMerkleTree:
+    """Test `MerkleTree`."""
+
+    def test_empty(self) -> None:
+        """Test the root of an empty tree."""
+        tree = MerkleTree()
+        assert len(tree) == 0
+        assert tree.root == MerkleTree.EMPTY_ROOT
+
+    def test_single_leaf(self) -> None:
+        """Test that the root of a tree with a single leaf is the leaf itself."""
+        leaf = MerkleTree.hash_leaf(b"data")
+        assert MerkleTree([leaf]).root == leaf
+
+    def test_domain_separation(self) -> None:
+        """Test that leaves and nodes are hashed differently."""
+        left, right = MerkleTree.hash_leaf(b"a"), MerkleTree.hash_leaf(b"b")
+        assert MerkleTree.hash_node(left, right) != MerkleTree.hash_leaf(left + right)
+
+    @given(lists(binary(min_size=1, max_size=8), max_size=40), data())
+    def test_incremental(self, items: List[bytes], data_: Any) -> None:
+        """Test that appending and updating leaves results in the same root as rebuilding the tree."""
+        leaves = [MerkleTree.hash_leaf(item) for item in items]
+        tree = MerkleTree()
+        for leaf in leaves:
+            tree.append(leaf)
+        assert tree.leaves == tuple(leaves)
+        assert tree.root == MerkleTree(leaves).root
+
+        if leaves:
+            index = data_.draw(integers(min_value=0, max_value=len(leaves) - 1))
+            leaves[index] = MerkleTree.hash_leaf(b"updated")
+            tree.update(index, leaves[index])
+            assert tree.root == MerkleTree(leaves).root
+
 
 class TestBaseSynchronizedData:
     """Test 'BaseSynchronizedData' class."""
@@ -2835,6 +3266,88 @@ class TestRoundSequence:
             ):
                 self.round_sequence.deliver_tx(MagicMock())
 
+    def test_deliver_tx_tracks_own_payloads(self) -> None:
+        """Test that 'deliver_tx' tracks the delivery of the agent's own payloads."""
+        self.round_sequence.begin_block(MagicMock(), MagicMock(), MagicMock())
+        own_payloads = [
+            BaseTxPayload(self.round_sequence._context.agent_address)
+            for _ in range(MAX_DELIVERED_PAYLOAD_IDS + 1)
+        ]
+        other_payload = BaseTxPayload("other")
+        with mock.patch.object(
+            self.round_sequence.current_round, "check_transaction", return_value=True
+        ), mock.patch.object(self.round_sequence.current_round, "process_transaction"):
+            for payload in [other_payload, *own_payloads]:
+                self.round_sequence.deliver_tx(MagicMock(payload=payload))
+
+        assert self.round_sequence.delivered_payloads_count == len(own_payloads)
+        assert not self.round_sequence.is_payload_delivered(other_payload.id_)
+        # only the latest payloads are tracked
+        assert not self.round_sequence.is_payload_delivered(own_payloads[0].id_)
+        assert all(
+            self.round_sequence.is_payload_delivered(payload.id_)
+            for payload in own_payloads[1:]
+        )
+
+    def test_deliver_tx_notifies_waiters(self) -> None:
+        """Test that the waiters are notified once, when one of the agent's payloads is delivered."""
+        waiter = MagicMock()
+        self.round_sequence.add_waiter(waiter)
+        self.round_sequence.begin_block(MagicMock(), MagicMock(), MagicMock())
+        with mock.patch.object(
+            self.round_sequence.current_round, "check_transaction", return_value=True
+        ), mock.patch.object(self.round_sequence.current_round, "process_transaction"):
+            self.round_sequence.deliver_tx(MagicMock(payload=BaseTxPayload("other")))
+            waiter.assert_not_called()
+            for _ in range(2):
+                self.round_sequence.deliver_tx(
+                    MagicMock(
+                        payload=BaseTxPayload(
+                            self.round_sequence._context.agent_address
+                        )
+                    )
+                )
+        waiter.assert_called_once_with()
+
+    def test_update_round_notifies_waiters(self) -> None:
+        """Test that the waiters are notified only on a round transition."""
+        waiter = MagicMock()
+        self.round_sequence.add_waiter(waiter)
+        self.round_sequence.begin_block(MagicMock(height=1), MagicMock(), MagicMock())
+        self.round_sequence._blockchain.add_block(
+            self.round_sequence._block_builder.get_block()
+        )
+
+        with mock.patch.object(
+            self.round_sequence.current_round, "end_block", return_value=None
+        ):
+            self.round_sequence._update_round()
+        waiter.assert_not_called()
+
+        with mock.patch.object(
+            self.round_sequence.current_round,
+            "end_block",
+            return_value=(MagicMock(), MagicMock()),
+        ), mock.patch.object(AbciApp, "process_event"):
+            self.round_sequence._update_round()
+        waiter.assert_called_once_with()
+
+    def test_notify_due(self) -> None:
+        """Test that only the callbacks of the passed deadlines are called, in order."""
+        now = datetime.datetime.now()
+        called = []
+        for seconds in (5, -1, 10, -2):
+            self.round_sequence.notify_at(
+                now + datetime.timedelta(seconds=seconds),
+                partial(called.append, seconds),
+            )
+
+        self.round_sequence.notify_due()
+        assert called == [-2, -1]
+        self.round_sequence.notify_due()
+        assert called == [-2, -1]
+        assert len(self.round_sequence._deadlines) == 2
+
     def test_end_block_negative_wrong_phase(self) -> None:
         """Test 'end_block' method, negative case (wrong phase)."""
         with pytest.raises(
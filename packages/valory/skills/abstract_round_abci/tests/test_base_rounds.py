@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -21,7 +21,10 @@
 
 # pylint: skip-file
 
+import pickle  # nosec
 import re
+from collections import Counter
+from dataclasses import dataclass
 from enum import Enum
 from typing import FrozenSet, List, Optional, Tuple, Union, cast
 from unittest.mock import MagicMock
@@ -52,6 +55,13 @@ from packages.valory.skills.abstract_round_abci.test_tools.rounds import (
 )
 
 
+@dataclass(frozen=True)
+class UnhashablePayload(BaseTxPayload):
+    """A payload with unhashable values."""
+
+    value: List[str]
+
+
 class TestCollectionRound(_BaseRoundTestClass):
     """Test class for CollectionRound."""
 
@@ -140,6 +150,66 @@ class TestCollectionRound(_BaseRoundTestClass):
 
         self._test_payload_with_wrong_round_count(self.test_round)
 
+    def test_payload_values_count(self) -> None:
+        """Test that `payload_values_count` is kept up to date, in the same order as a recount."""
+        payloads = [
+            DummyTxPayload(f"agent_{i}", value)
+            for i, value in enumerate(("a", "b", "a", "c"))
+        ]
+        for payload in payloads:
+            self.test_round.process_payload(payload)
+        count = self.test_round.payload_values_count
+        assert count == Counter({("a", None): 2, ("b", None): 1, ("c", None): 1})
+        assert self.test_round.payload_values_count is count
+
+        # replacing a payload keeps the position of its sender, and therefore of its value
+        self.test_round.collection["agent_1"] = DummyTxPayload("agent_1", "d")
+        del self.test_round.collection["agent_2"]
+        expected = Counter(p.values for p in self.test_round.collection.values())
+        assert list(self.test_round.payload_values_count.items()) == list(
+            expected.items()
+        )
+
+        self.test_round.collection = {}
+        assert self.test_round.payload_values_count == Counter()
+        self.test_round.collection.setdefault("agent_0", payloads[0])
+        self.test_round.collection.update({"agent_1": payloads[1]})
+        assert self.test_round.payload_values_count == Counter(
+            {("a", None): 1, ("b", None): 1}
+        )
+        self.test_round.collection.pop("agent_0")
+        self.test_round.collection.popitem()
+        assert self.test_round.payload_values_count == Counter()
+
+    def test_majority_possible(self) -> None:
+        """Test that the incremental majority check agrees with the check on a plain mapping."""
+        nb_participants = self.synchronized_data.nb_participants
+        for i, value in enumerate(("a", "b", "a")):
+            self.test_round.process_payload(DummyTxPayload(f"agent_{i}", value))
+            plain = dict(self.test_round.collection)
+            assert self.test_round.is_majority_possible(
+                self.test_round.collection, nb_participants
+            ) == self.test_round.is_majority_possible(plain, nb_participants)
+        assert self.test_round.collection_tally.max_count == 2
+        assert self.test_round.collection_tally.most_common == ("a", None)
+
+    def test_payload_values_count_unhashable(self) -> None:
+        """Test that payloads with unhashable values can be collected, but not counted."""
+        self.test_round.collection["agent_0"] = UnhashablePayload("agent_0", ["a"])
+        with pytest.raises(TypeError, match="unhashable type"):
+            self.test_round.payload_values_count
+        self.test_round.collection.clear()
+        self.test_round.collection["agent_0"] = DummyTxPayload("agent_0", "a")
+        assert self.test_round.payload_values_count == Counter({("a", None): 1})
+
+    def test_collection_pickle(self) -> None:
+        """Test that the collection can be pickled along with its count."""
+        for payload in self.tx_payloads:
+            self.test_round.process_payload(payload)
+        collection = pickle.loads(pickle.dumps(self.test_round.collection))  # nosec
+        assert collection == self.test_round.collection
+        assert collection.values_count == self.test_round.payload_values_count
+
 
 class TestCollectDifferentUntilAllRound(_BaseRoundTestClass):
     """Test class for CollectDifferentUntilAllRound."""
@@ -457,9 +527,17 @@ class TestVotingRound(_BaseRoundTestClass):
             for payload in get_dummy_tx_payloads(frozenset(agents), vote=vote):
                 test_round.process_payload(payload)
         assert dict(test_round.vote_count) == {True: 2, False: 1, None: 1}
+        assert test_round.vote_count is test_round.vote_count
 
         self._test_payload_with_wrong_round_count(test_round)
 
+    def test_vote_count_without_votes(self) -> None:
+        """Test that payloads without votes can be collected, but not counted."""
+        test_round = self.setup_test_voting_round()
+        test_round.collection = {"agent_0": UnhashablePayload("agent_0", ["a"])}
+        with pytest.raises(ValueError, match="has no attribute `vote`"):
+            test_round.vote_count
+
     @pytest.mark.parametrize("vote", [True, False, None])
     def test_threshold(self, vote: Optional[bool]) -> None:
         """Runs threshold test."""
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2024 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -24,7 +24,8 @@ import logging
 import platform
 import time
 from abc import ABC
-from datetime import datetime
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
 from typing import (
@@ -48,6 +49,8 @@ from _pytest.logging import LogCaptureFixture
 
 # pylint: skip-file
 from aea.common import JSONLike
+from aea.configurations.base import ConnectionConfig
+from aea.exceptions import AEAEnforceError
 from aea.protocols.base import Message
 from aea.test_tools.utils import as_context
 from aea_test_autonomy.helpers.base import try_send
@@ -56,11 +59,18 @@ from hypothesis import strategies as st
 
 from packages.open_aea.protocols.signing import SigningMessage
 from packages.valory.connections.http_client.connection import HttpDialogues
-from packages.valory.connections.ipfs.connection import IpfsDialogues
+from packages.valory.connections.ipfs import connection as ipfs_connection
+from packages.valory.connections.ipfs.connection import (
+    IpfsConnection,
+    IpfsDialogues,
+    OVERLOADED_REASON,
+)
 from packages.valory.connections.ipfs.connection import PUBLIC_ID as IPFS_CONNECTION_ID
+from packages.valory.protocols.contract_api import ContractApiMessage
 from packages.valory.protocols.http import HttpMessage
 from packages.valory.protocols.ipfs import IpfsMessage
 from packages.valory.protocols.ipfs.dialogues import IpfsDialogue
+from packages.valory.protocols.ipfs.serialization import IpfsSerializer
 from packages.valory.protocols.ledger_api.custom_types import (
     SignedTransaction,
     SignedTransactions,
@@ -92,6 +102,7 @@ from packages.valory.skills.abstract_round_abci.behaviour_utils import (
     SendException,
     TimeoutException,
     TmManager,
+    WakeUp,
     _MetaBaseBehaviour,
     make_degenerate_behaviour,
 )
@@ -99,6 +110,7 @@ from packages.valory.skills.abstract_round_abci.io_.ipfs import (
     IPFSInteract,
     IPFSInteractionError,
 )
+from packages.valory.skills.abstract_round_abci.io_.store import SupportedFiletype
 from packages.valory.skills.abstract_round_abci.models import (
     SharedState,
     TendermintRecoveryParams,
@@ -371,6 +383,249 @@ def test_async_behaviour_sleep() -> None:
     ).total_seconds() > timedelta
 
 
+def test_async_behaviour_skips_ticks_while_suspended() -> None:
+    """Test that a suspended behaviour is only resumed when it is woken up."""
+
+    inputs = {"value": 0}
+    condition_checks = []
+    wake_ups: List[WakeUp] = []
+
+    def condition() -> bool:
+        condition_checks.append(inputs["value"])
+        return inputs["value"] == 2
+
+    class MyAsyncBehaviour(AsyncBehaviourTest):
+        counter = 0
+
+        def async_act(self) -> Generator:
+            self.counter += 1
+            yield from self.wait_for_condition(condition, wake_on_notify=True)
+            self.counter += 1
+
+        def _schedule_wake_up(self, wake_up: WakeUp) -> None:
+            wake_up.scheduled = True
+            wake_ups.append(wake_up)
+
+    behaviour = MyAsyncBehaviour()
+    behaviour.act()
+    assert condition_checks == [0]
+
+    # the condition is not re-checked until the behaviour is woken up, even if its inputs change
+    inputs["value"] = 1
+    for _ in range(3):
+        behaviour.act()
+    assert condition_checks == [0]
+
+    wake_ups[-1].wake()
+    behaviour.act()
+    behaviour.act()
+    assert condition_checks == [0, 1]
+    assert behaviour.counter == 1
+
+    inputs["value"] = 2
+    wake_ups[-1].wake()
+    behaviour.act()
+    assert condition_checks == [0, 1, 2]
+    assert behaviour.counter == 2
+    assert behaviour.state == AsyncBehaviour.AsyncState.READY
+    assert len(wake_ups) == 2
+
+
+def test_wake_up() -> None:
+    """Test the wake-up conditions."""
+    # without a notifier, the conditions are checked on every tick
+    assert WakeUp().is_due()
+    assert WakeUp(on_notify=True).is_due()
+    assert WakeUp(deadline=datetime.now() - timedelta(seconds=1)).is_due()
+    assert not WakeUp(deadline=datetime.now() + timedelta(seconds=10)).is_due()
+
+    # once scheduled, the behaviour is only resumed when it is woken up
+    wake_up = WakeUp(deadline=datetime.now() - timedelta(seconds=1), on_notify=True)
+    wake_up.scheduled = True
+    assert not wake_up.is_due()
+    wake_up.wake()
+    assert wake_up.is_due()
+
+
+def test_async_behaviour_wait_for_condition_wake_up_timeout() -> None:
+    """Test that a suspended behaviour is resumed to time out."""
+
+    class MyAsyncBehaviour(AsyncBehaviourTest):
+        def async_act(self) -> Generator:
+            yield from self.wait_for_condition(
+                lambda: False, timeout=0.05, wake_on_notify=True
+            )
+
+    behaviour = MyAsyncBehaviour()
+    behaviour.act()
+    behaviour.act()
+    time.sleep(0.1)
+    with pytest.raises(TimeoutException):
+        behaviour.act()
+
+
+class GatheringAsyncBehaviour(AsyncBehaviourTest):
+    """An AsyncBehaviour which gathers concurrent requests."""
+
+    def __init__(self) -> None:
+        """Initialize the behaviour."""
+        super().__init__()
+        self.callbacks: Dict[str, Callable] = {}
+        self.result: Any = None
+
+    def request(self, name: str, ticks: int = 0) -> Generator[None, None, str]:
+        """Wait for some ticks, then send a request and wait for its response."""
+        for _ in range(ticks):
+            yield
+        callback = self._get_gathered_message_callback()
+        assert callback is not None
+        self.callbacks[name] = callback
+        response = yield from self.wait_for_message()
+        return f"{name}: {response}"
+
+
+def test_async_behaviour_gather() -> None:
+    """Test that 'gather' waits for concurrent requests, routing each response to its request."""
+
+    class MyAsyncBehaviour(GatheringAsyncBehaviour):
+        def async_act(self) -> Generator:
+            self.result = yield from self.gather(
+                self.request("a"), self.request("b"), self.request("c", ticks=1)
+            )
+
+    behaviour = MyAsyncBehaviour()
+    assert behaviour._get_gathered_message_callback() is None
+    behaviour.act()
+    # all the requests without ticks are in flight at the same time
+    assert set(behaviour.callbacks) == {"a", "b"}
+    assert behaviour.state == AsyncBehaviour.AsyncState.RUNNING
+
+    behaviour.callbacks["b"]("response_b")
+    behaviour.act()
+    assert set(behaviour.callbacks) == {"a", "b", "c"}
+    assert behaviour.result is None
+
+    behaviour.callbacks["c"]("response_c")
+    behaviour.callbacks["a"]("response_a")
+    behaviour.act()
+    assert behaviour.result == ["a: response_a", "b: response_b", "c: response_c"]
+    assert behaviour.state == AsyncBehaviour.AsyncState.READY
+
+    # late responses of a finished gather are not delivered
+    assert not behaviour.callbacks["a"]("late")
+
+
+def test_async_behaviour_wait_for_any() -> None:
+    """Test that 'wait_for_any' returns the first request to finish, and closes the rest."""
+
+    class MyAsyncBehaviour(GatheringAsyncBehaviour):
+        def async_act(self) -> Generator:
+            self.result = yield from self.wait_for_any(
+                self.request("a"), self.request("b")
+            )
+            yield from self.wait_for_message()
+
+    behaviour = MyAsyncBehaviour()
+    behaviour.act()
+    behaviour.callbacks["b"]("response_b")
+    behaviour.callbacks["a"]("response_a")
+    behaviour.act()
+    assert behaviour.result == (1, "b: response_b")
+    assert behaviour.state == AsyncBehaviour.AsyncState.WAITING_MESSAGE
+
+
+def test_async_behaviour_gather_until() -> None:
+    """Test that 'gather' stops waiting for the rest of the requests once its condition holds."""
+
+    class MyAsyncBehaviour(GatheringAsyncBehaviour):
+        def async_act(self) -> Generator:
+            self.result = yield from self.gather(
+                self.request("a"),
+                self.request("b"),
+                self.request("c"),
+                until=lambda results: {0, 1}.issubset(results),
+            )
+
+    behaviour = MyAsyncBehaviour()
+    behaviour.act()
+    behaviour.callbacks["a"]("response_a")
+    behaviour.act()
+    assert behaviour.result is None
+
+    behaviour.callbacks["b"]("response_b")
+    behaviour.act()
+    # the closed generators are given None
+    assert behaviour.result == ["a: response_a", "b: response_b", None]
+    assert behaviour.state == AsyncBehaviour.AsyncState.READY
+    assert not behaviour.callbacks["c"]("late")
+
+
+def test_async_behaviour_gather_raises() -> None:
+    """Test 'gather' when it times out, when a generator raises and when it is nested."""
+
+    def failing() -> Generator:
+        yield
+        raise ValueError("failed")
+
+    class MyAsyncBehaviour(GatheringAsyncBehaviour):
+        def async_act(self) -> Generator:
+            yield from self.gather(self.request("a"), failing())
+
+    behaviour = MyAsyncBehaviour()
+    behaviour.act()
+    with pytest.raises(ValueError, match="failed"):
+        behaviour.act()
+
+    class TimingOutBehaviour(GatheringAsyncBehaviour):
+        def async_act(self) -> Generator:
+            yield from self.gather(self.request("a"), timeout=0.01)
+
+    behaviour = TimingOutBehaviour()
+    behaviour.act()
+    time.sleep(0.02)
+    with pytest.raises(TimeoutException):
+        behaviour.act()
+
+    class NestedBehaviour(GatheringAsyncBehaviour):
+        def async_act(self) -> Generator:
+            yield from self.gather(self.gather(self.request("a")))
+
+    behaviour = NestedBehaviour()
+    with pytest.raises(AEAEnforceError, match="gathers cannot be nested"):
+        behaviour.act()
+
+    class WaitingForNoneBehaviour(GatheringAsyncBehaviour):
+        def async_act(self) -> Generator:
+            yield from self.wait_for_any()
+
+    behaviour = WaitingForNoneBehaviour()
+    with pytest.raises(ValueError, match="at least one generator is required"):
+        behaviour.act()
+
+
+def test_async_behaviour_gather_message_timeout() -> None:
+    """Test that the gathered generators which wait for a message time out, even if no message arrives."""
+
+    class MyAsyncBehaviour(GatheringAsyncBehaviour):
+        def timing_out_request(self) -> Generator:
+            """Send a request and wait for its response, with a timeout."""
+            self.callbacks["timing_out"] = self._get_gathered_message_callback()
+            yield from self.wait_for_message(timeout=0.01)
+
+        def async_act(self) -> Generator:
+            yield from self.gather(self.request("a"), self.timing_out_request())
+
+    behaviour = MyAsyncBehaviour()
+    behaviour.act()
+    behaviour.act()
+    assert behaviour.state == AsyncBehaviour.AsyncState.RUNNING
+    time.sleep(0.02)
+    with pytest.raises(TimeoutException):
+        behaviour.act()
+    # the response of the other request arrives late
+    assert not behaviour.callbacks["a"]("late")
+
+
 def test_async_behaviour_without_yield() -> None:
     """Test AsyncBehaviour, async_act without yield/yield from."""
 
@@ -510,6 +765,9 @@ class TestBaseBehaviour:
             request_retry_delay=_DEFAULT_REQUEST_RETRY_DELAY,
             tx_timeout=_DEFAULT_TX_TIMEOUT,
             max_attempts=_DEFAULT_TX_MAX_ATTEMPTS,
+            pipelined_a2a_transactions=False,
+            deduplicate_ipfs_uploads=False,
+            contract_state_cache_ttl=None,
         )
         self.context_mock.shared_state = {}
         self.context_state_synchronized_data_mock = MagicMock()
@@ -601,6 +859,37 @@ class TestBaseBehaviour:
             try_send(generator)
             assert expected_logs in caplog.text
 
+    def test_send_to_ipfs_deduplicated(self, caplog: LogCaptureFixture) -> None:
+        """Test that send_to_ipfs does not upload content which has already been stored."""
+        self.context_params_mock.deduplicate_ipfs_uploads = True
+        self.context_mock.state.stored_ipfs_hashes = OrderedDict()
+        ipfs_response = MagicMock(
+            ipfs_hash="test", performative=IpfsMessage.Performative.IPFS_HASH
+        )
+
+        def dummy_do_ipfs_req(
+            *args: Any, **kwargs: Any
+        ) -> Generator[None, None, Optional[IpfsMessage]]:
+            """A dummy method to be used in mocks."""
+            return ipfs_response
+            yield
+
+        with mock.patch.object(
+            BaseBehaviour, "_do_ipfs_request", side_effect=dummy_do_ipfs_req
+        ) as do_req, caplog.at_level(logging.INFO):
+            for obj in ({"a": 1}, {"a": 1}, {"a": 2}):
+                generator = self.behaviour.send_to_ipfs(
+                    "dummy_filename", obj, filetype=SupportedFiletype.JSON
+                )
+                try_send(generator)
+
+        assert do_req.call_count == 2
+        assert (
+            "dummy_filename is already stored to IPFS with hash: test. Skipping the upload."
+            in caplog.text
+        )
+        assert len(self.context_mock.state.stored_ipfs_hashes) == 2
+
     def test_do_ipfs_request(self) -> None:
         """Test _do_ipfs_request"""
         message, dialogue = cast(
@@ -625,6 +914,79 @@ class TestBaseBehaviour:
             )
             try_send(gen)
 
+    @pytest.mark.parametrize(
+        "performative, content",
+        [
+            (IpfsMessage.Performative.STORE_FILES, dict(files={"a": "b"})),
+            (IpfsMessage.Performative.GET_FILES, dict(ipfs_hash="test")),
+        ],
+    )
+    @pytest.mark.parametrize(
+        "n_overloaded, max_attempts, timeout, expected_n_requests",
+        [
+            (0, 3, None, 1),
+            (2, 3, None, 3),
+            (5, 3, None, 3),
+            (5, 3, 1.5, 2),
+        ],
+    )
+    def test_do_ipfs_request_with_backoff(  # pylint: disable=too-many-arguments
+        self,
+        performative: IpfsMessage.Performative,
+        content: Dict[str, Any],
+        n_overloaded: int,
+        max_attempts: int,
+        timeout: Optional[float],
+        expected_n_requests: int,
+    ) -> None:
+        """Test that `_do_ipfs_request_with_backoff` backs off while the IPFS node is overloaded."""
+        self.behaviour.params.max_attempts = max_attempts  # type: ignore
+        message, dialogue = self.behaviour._build_ipfs_message(
+            performative, timeout, **content
+        )
+        overloaded_response = MagicMock(
+            performative=IpfsMessage.Performative.ERROR,
+            reason=f"Too many pending requests. {OVERLOADED_REASON}",
+        )
+        responses = [overloaded_response] * n_overloaded + [MagicMock()]
+        requests: List[IpfsMessage] = []
+
+        def dummy_do_ipfs_req(
+            _dialogue: IpfsDialogue, request: IpfsMessage, *_: Any
+        ) -> Generator[None, None, IpfsMessage]:
+            """A dummy method to be used in mocks."""
+            requests.append(request)
+            return responses[len(requests) - 1]
+            yield
+
+        with mock.patch.object(
+            BaseBehaviour, "_do_ipfs_request", side_effect=dummy_do_ipfs_req
+        ), mock.patch.object(
+            BaseBehaviour, "sleep", side_effect=dummy_generator_wrapper()
+        ) as sleep:
+            gen = self.behaviour._do_ipfs_request_with_backoff(
+                dialogue, message, timeout
+            )
+            with pytest.raises(StopIteration) as stop:
+                while True:
+                    next(gen)
+
+        assert len(requests) == expected_n_requests
+        assert stop.value.value is responses[expected_n_requests - 1]
+        delays = [call.args[0] for call in sleep.call_args_list]
+        assert delays == [
+            _DEFAULT_REQUEST_RETRY_DELAY * 2**i
+            for i in range(expected_n_requests - 1)
+        ]
+        for request in requests:
+            assert request.performative == performative
+            for name, value in content.items():
+                assert getattr(request, name) == value
+        # every retry is a new request, in its own dialogue
+        assert len({request.dialogue_reference for request in requests}) == len(
+            requests
+        )
+
     @pytest.mark.parametrize(
         "ipfs_response, expected_log",
         [
@@ -685,6 +1047,78 @@ class TestBaseBehaviour:
             try_send(generator)
             assert expected_logs in caplog.text
 
+    @pytest.mark.parametrize(
+        ("stored_content", "expected_object"),
+        [
+            (None, {"text": "ünïcødé ✓"}),
+            (b"\xff\xfe not utf-8", None),
+        ],
+    )
+    def test_ipfs_round_trip(
+        self,
+        caplog: LogCaptureFixture,
+        stored_content: Optional[bytes],
+        expected_object: Optional[Dict[str, str]],
+    ) -> None:
+        """Test that the files stored and got via the IPFS connection reach the skill intact, or as an error."""
+        with mock.patch.object(ipfs_connection, "IPFSTool"):
+            connection = IpfsConnection(
+                configuration=ConnectionConfig(
+                    connection_id=IpfsConnection.connection_id
+                ),
+                data_dir=MagicMock(),
+            )
+        stored_files: Dict[str, Dict[str, bytes]] = {}
+
+        def add_files(files: Dict[str, bytes], _dirname: Optional[str]) -> str:
+            """Store the files in memory instead of IPFS."""
+            stored_files["dummy_ipfs_hash"] = files
+            return "dummy_ipfs_hash"
+
+        def reply(**kwargs: Any) -> IpfsMessage:
+            """Reply with a message which has been through the protocol's serialization."""
+            kwargs.pop("target_message", None)
+            return IpfsSerializer.decode(IpfsSerializer.encode(IpfsMessage(**kwargs)))  # type: ignore
+
+        def dummy_do_ipfs_req(
+            _dialogue: IpfsDialogue, message: IpfsMessage, *_args: Any
+        ) -> Generator[None, None, IpfsMessage]:
+            """Handle the request with the IPFS connection."""
+            message = IpfsSerializer.decode(IpfsSerializer.encode(message))  # type: ignore
+            handler = getattr(connection, f"_handle_{message.performative.value}")
+            return handler(message, MagicMock(reply=reply))
+            yield
+
+        with mock.patch.object(
+            IpfsConnection, "_add_files", side_effect=add_files
+        ), mock.patch.object(
+            IpfsConnection, "_get_files", side_effect=lambda hash_: stored_files[hash_]
+        ), mock.patch.object(
+            BaseBehaviour, "_do_ipfs_request", side_effect=dummy_do_ipfs_req
+        ):
+            generator = self.behaviour.send_to_ipfs(
+                "dummy_dir/dummy_file.json",
+                {"text": "ünïcødé ✓"},
+                filetype=SupportedFiletype.JSON,
+            )
+            with pytest.raises(StopIteration) as stop:
+                next(generator)
+            assert stop.value.value == "dummy_ipfs_hash"
+
+            if stored_content is not None:
+                stored_files["dummy_ipfs_hash"] = {"dummy_file.json": stored_content}
+            # the files should not be served from the connection's cache
+            connection.cache = MagicMock(get=MagicMock(return_value=None))
+            generator = self.behaviour.get_from_ipfs(
+                "dummy_ipfs_hash", filetype=SupportedFiletype.JSON
+            )
+            with pytest.raises(StopIteration) as stop:
+                next(generator)
+
+        assert stop.value.value == expected_object
+        if expected_object is None:
+            assert "is not a valid utf-8 text file" in caplog.text
+
     def test_params_property(self) -> None:
         """Test the 'params' property."""
         assert self.behaviour.params == self.context_params_mock
@@ -953,6 +1387,67 @@ class TestBaseBehaviour:
         )
         try_send(gen, obj=success_response)
 
+    @pytest.mark.parametrize("delivered", (True, False))
+    def test_send_transaction_pipelined(self, delivered: bool) -> None:
+        """Test '_send_transaction' confirming the delivery from the local ABCI app."""
+        with mock.patch.object(
+            BaseBehaviour, "_send_signing_request"
+        ), mock.patch.object(
+            Transaction, "encode", return_value=MagicMock()
+        ), mock.patch.object(
+            BaseBehaviour,
+            "_build_http_request_message",
+            return_value=(MagicMock(), MagicMock()),
+        ), mock.patch.object(
+            BaseBehaviour, "_check_http_return_code_200", return_value=True
+        ):
+            self._send_pipelined_transaction(delivered)
+
+    def _send_pipelined_transaction(self, delivered: bool) -> None:
+        """Send a transaction confirming the delivery from the local ABCI app."""
+        self.context_params_mock.pipelined_a2a_transactions = True
+        round_sequence = self.context_mock.state.round_sequence
+        round_sequence.delivered_payloads_count = 0
+        round_sequence.current_round_height = 0
+        round_sequence.is_payload_delivered.return_value = False
+        payload = MagicMock()
+        gen = self.behaviour._send_transaction(payload, tx_timeout=0.01)
+        try_send(gen, obj=None)
+        try_send(gen, obj=MagicMock(status_code=200))
+        with mock.patch.object(
+            BaseBehaviour, "_wait_until_transaction_delivered"
+        ) as wait_mock, mock.patch.object(
+            self.behaviour.context.logger, "debug"
+        ) as mock_debug, mock.patch.object(
+            self.behaviour.context.logger, "warning"
+        ) as mock_warning:
+            wake_up = gen.send(MagicMock(body='{"result": {"hash": "h", "code": 0}}'))
+            # the behaviour is suspended until one of its payloads is delivered
+            assert isinstance(wake_up, WakeUp)
+            assert wake_up.on_notify
+            self.behaviour._schedule_wake_up(wake_up)
+            round_sequence.add_waiter.assert_called_once_with(wake_up.wake)
+            round_sequence.notify_at.assert_called_once_with(
+                wake_up.deadline, wake_up.wake
+            )
+            assert not wake_up.is_due()
+            round_sequence.delivered_payloads_count = 1
+            wake_up.wake()
+            assert wake_up.is_due()
+
+            if delivered:
+                round_sequence.is_payload_delivered.return_value = True
+                try_send(gen)
+                mock_debug.assert_any_call("A2A transaction delivered!")
+            else:
+                time.sleep(0.02)
+                try_send(gen)
+                mock_warning.assert_called_with(
+                    "Tx h was not delivered in 0.01 seconds. Retrying..."
+                )
+            wait_mock.assert_not_called()
+        round_sequence.is_payload_delivered.assert_called_with(payload.id_)
+
     @mock.patch.object(BaseBehaviour, "_send_signing_request")
     @mock.patch.object(Transaction, "encode", return_value=MagicMock())
     @mock.patch.object(
@@ -1702,6 +2197,161 @@ class TestBaseBehaviour:
             # wait for message
             try_send(gen, obj=MagicMock())
 
+    @pytest.mark.parametrize(
+        "ttl, performative, final, elapsed, new_block, expected_requests",
+        (
+            (None, ContractApiMessage.Performative.STATE, True, 0, False, 2),
+            (0, ContractApiMessage.Performative.STATE, False, 0, False, 2),
+            (0, ContractApiMessage.Performative.STATE, True, 100, False, 1),
+            (10, ContractApiMessage.Performative.STATE, False, 5, False, 1),
+            (10, ContractApiMessage.Performative.STATE, False, 5, True, 2),
+            (10, ContractApiMessage.Performative.STATE, True, 5, True, 1),
+            (10, ContractApiMessage.Performative.STATE, False, 10, False, 2),
+            (10, ContractApiMessage.Performative.ERROR, True, 0, False, 2),
+        ),
+    )
+    def test_get_cached_contract_api_response(  # pylint: disable=too-many-arguments
+        self,
+        ttl: Optional[float],
+        performative: ContractApiMessage.Performative,
+        final: bool,
+        elapsed: float,
+        new_block: bool,
+        expected_requests: int,
+    ) -> None:
+        """Test that the contract api responses are reused while they are valid."""
+        self.context_params_mock.contract_state_cache_ttl = ttl
+        self.context_mock.state.contract_state_cache = OrderedDict()
+        self.context_mock.state.contract_state_cache_height = None
+        round_sequence = self.context_mock.state.round_sequence
+        round_sequence.height = 1
+        response = MagicMock(performative=performative)
+        requests = []
+
+        def dummy_get_contract_api_response(
+            *args: Any, **kwargs: Any
+        ) -> Generator[None, None, MagicMock]:
+            """A dummy `get_contract_api_response`."""
+            requests.append((args, kwargs))
+            yield
+            return response
+
+        with mock.patch.object(
+            self.behaviour,
+            "get_contract_api_response",
+            side_effect=dummy_get_contract_api_response,
+        ), mock.patch.object(behaviour_utils.time, "monotonic", return_value=0):
+            for _ in range(2):
+                gen = self.behaviour.get_cached_contract_api_response(
+                    ContractApiMessage.Performative.GET_STATE,
+                    "contract_address",
+                    "contract_id",
+                    "contract_callable",
+                    is_final=lambda _: final,
+                    arg=1,
+                )
+                with pytest.raises(StopIteration) as stop:
+                    while True:
+                        next(gen)
+                assert stop.value.value is response
+                behaviour_utils.time.monotonic.return_value = elapsed  # type: ignore
+                # the responses which are not final are only reused in the same block
+                round_sequence.height += int(new_block)
+
+        assert len(requests) == expected_requests
+
+    @pytest.mark.parametrize(
+        "performative, expected",
+        (
+            (ContractApiMessage.Performative.STATE, [1, None, "0xab"]),
+            (ContractApiMessage.Performative.ERROR, [None, None, None]),
+        ),
+    )
+    def test_batch_contract_call(
+        self, performative: ContractApiMessage.Performative, expected: List[Any]
+    ) -> None:
+        """Test that the contract calls issued in the same tick are sent in a single batch."""
+        self.behaviour.params.default_chain_id = "ethereum"
+        self.behaviour.params.multicall2_addresses = {"ethereum": "multicall"}
+        requests = []
+
+        def dummy_get_contract_api_response(
+            **kwargs: Any,
+        ) -> Generator[None, None, MagicMock]:
+            """Dummy `get_contract_api_response` method."""
+            requests.append(kwargs)
+            yield
+            results = [
+                dict(success=True, data=1),
+                dict(success=False, data=None),
+                dict(success=True, data="0xab"),
+            ]
+            return MagicMock(
+                performative=performative, state=MagicMock(body=dict(results=results))
+            )
+
+        with mock.patch.object(
+            self.behaviour,
+            "get_contract_api_response",
+            side_effect=dummy_get_contract_api_response,
+        ):
+            gen = self.behaviour.gather(
+                *(
+                    self.behaviour.batch_contract_call(
+                        "contract_id", "contract_address", fn_name, [i]
+                    )
+                    for i, fn_name in enumerate(("a", "b", "c"))
+                )
+            )
+            with pytest.raises(StopIteration) as e:
+                while True:
+                    next(gen)
+
+        assert e.value.value == expected
+        assert len(requests) == 1
+        assert requests[0]["contract_address"] == "multicall"
+        assert requests[0]["contract_callable"] == "aggregate_calls"
+        assert requests[0]["chain_id"] == "ethereum"
+        assert [call["fn_name"] for call in requests[0]["calls"]] == ["a", "b", "c"]
+        assert [call["args"] for call in requests[0]["calls"]] == [[0], [1], [2]]
+        assert self.behaviour._contract_call_batches == {}
+
+    @pytest.mark.parametrize("close", (True, False))
+    def test_batch_contract_call_interrupted(self, close: bool) -> None:
+        """Test that the rest of a batch fails if the call which sends it is interrupted."""
+        self.behaviour.params.default_chain_id = "ethereum"
+        self.behaviour.params.multicall2_addresses = {}
+
+        def dummy_get_contract_api_response(
+            **_: Any,
+        ) -> Generator[None, None, MagicMock]:
+            """Dummy `get_contract_api_response` method."""
+            yield
+            raise ValueError("interrupted")
+
+        with mock.patch.object(
+            self.behaviour,
+            "get_contract_api_response",
+            side_effect=dummy_get_contract_api_response,
+        ):
+            sender = self.behaviour.batch_contract_call("contract_id", "a", "a")
+            waiter = self.behaviour.batch_contract_call("contract_id", "b", "b")
+            next(sender)
+            next(waiter)
+            # the sender sends the batch, the waiter waits for the results
+            next(sender)
+            next(waiter)
+            if close:
+                sender.close()
+            else:
+                with pytest.raises(ValueError, match="interrupted"):
+                    next(sender)
+
+            with pytest.raises(StopIteration) as e:
+                next(waiter)
+
+        assert e.value.value is None
+
     @mock.patch.object(
         BaseBehaviour, "_build_http_request_message", return_value=(None, None)
     )
@@ -1829,6 +2479,34 @@ class TestBaseBehaviour:
         current_behaviour = self.behaviour
         self.behaviour.get_callback_request()(message, current_behaviour)
 
+    def test_default_callback_request_gathered(self) -> None:
+        """Test 'default_callback_request' routing the response to a gathered request."""
+        self.behaviour._AsyncBehaviour__stopped = False  # type: ignore
+        deliver = MagicMock()
+        message = MagicMock()
+        with mock.patch.object(
+            self.behaviour, "_get_gathered_message_callback", return_value=deliver
+        ), mock.patch.object(self.behaviour, "try_send") as try_send_mock:
+            self.behaviour.get_callback_request()(message, self.behaviour)
+        deliver.assert_called_once_with(message)
+        try_send_mock.assert_not_called()
+
+    def test_default_callback_request_gathered_late(self) -> None:
+        """Test 'default_callback_request' handling the response of a finished gather as a late message."""
+        self.behaviour._AsyncBehaviour__stopped = False  # type: ignore
+        deliver = MagicMock(return_value=False)
+        message = MagicMock()
+        with mock.patch.object(
+            self.behaviour, "_get_gathered_message_callback", return_value=deliver
+        ), mock.patch.object(
+            self.behaviour, "handle_late_messages"
+        ) as handle_late_messages_mock:
+            self.behaviour.get_callback_request()(message, self.behaviour)
+        deliver.assert_called_once_with(message)
+        handle_late_messages_mock.assert_called_once_with(
+            self.behaviour.behaviour_id, message
+        )
+
     def test_default_callback_request_else(self, *_: Any) -> None:
         """Test 'default_callback_request' else branch."""
         self.behaviour._AsyncBehaviour__stopped = False  # type: ignore
@@ -2300,6 +2978,9 @@ def test_degenerate_behaviour_async_act() -> None:
     ):
         behaviour.act()
         time.sleep(0.02)
+        # the round sequence wakes up the behaviour once the sleep's deadline passes
+        _, wake = context.state.round_sequence.notify_at.call_args[0]
+        wake()
         behaviour.act()
 
 
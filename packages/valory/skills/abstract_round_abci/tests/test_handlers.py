@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -21,19 +21,35 @@
 
 # pylint: skip-file
 
+import asyncio
 import json
 import logging
 from dataclasses import asdict
 from datetime import datetime
-from typing import Any, Dict, cast
+from typing import Any, Dict, List, Tuple, cast
 from unittest import mock
 from unittest.mock import MagicMock
 
 import pytest
 from _pytest.logging import LogCaptureFixture
 from aea.configurations.data_types import PublicId
+from aea.mail.base import Envelope
 from aea.protocols.base import Message
 
+from packages.valory.connections.abci.connection import (
+    TcpServerChannel,
+    _TendermintABCISerializer,
+)
+from packages.valory.connections.abci.tendermint.abci.types_pb2 import (  # type: ignore
+    Request,
+    RequestBeginBlock,
+    RequestCheckTx,
+    RequestCommit,
+    RequestDeliverTx,
+    RequestEndBlock,
+    RequestFlush,
+    Response,
+)
 from packages.valory.protocols.abci import AbciMessage
 from packages.valory.protocols.abci.custom_types import (
     CheckTxType,
@@ -47,14 +63,16 @@ from packages.valory.protocols.abci.custom_types import (
 )
 from packages.valory.protocols.http import HttpMessage
 from packages.valory.protocols.tendermint import TendermintMessage
-from packages.valory.skills.abstract_round_abci import handlers
+from packages.valory.skills.abstract_abci.handlers import ABCIHandler
 from packages.valory.skills.abstract_round_abci.base import (
     ABCIAppInternalError,
     AddBlockError,
     ERROR_CODE,
     OK_CODE,
     SignatureNotValidError,
+    Transaction,
     TransactionNotValidError,
+    VerifiedTransactionCache,
 )
 from packages.valory.skills.abstract_round_abci.dialogues import (
     AbciDialogue,
@@ -66,7 +84,6 @@ from packages.valory.skills.abstract_round_abci.handlers import (
     ABCIRoundHandler,
     AbstractResponseHandler,
     TendermintHandler,
-    Transaction,
     exception_to_info_msg,
 )
 from packages.valory.skills.abstract_round_abci.models import TendermintRecoveryParams
@@ -151,7 +168,6 @@ class TestABCIRoundHandler:
         )
         assert response.performative == AbciMessage.Performative.RESPONSE_BEGIN_BLOCK
 
-    @mock.patch.object(handlers, "Transaction")
     def test_check_tx(self, *_: Any) -> None:
         """Test the 'check_tx' handler method."""
         message, dialogue = self.dialogues.create(
@@ -173,6 +189,7 @@ class TestABCIRoundHandler:
     )
     def test_check_tx_negative(self, *_: Any) -> None:
         """Test the 'check_tx' handler method, negative case."""
+        self.context.state.round_sequence.transaction_cache = VerifiedTransactionCache()
         message, dialogue = self.dialogues.create(
             counterparty="",
             performative=AbciMessage.Performative.REQUEST_CHECK_TX,
@@ -185,7 +202,6 @@ class TestABCIRoundHandler:
         assert response.performative == AbciMessage.Performative.RESPONSE_CHECK_TX
         assert response.code == ERROR_CODE
 
-    @mock.patch.object(handlers, "Transaction")
     def test_deliver_tx(self, *_: Any) -> None:
         """Test the 'deliver_tx' handler method."""
         message, dialogue = self.dialogues.create(
@@ -211,6 +227,7 @@ class TestABCIRoundHandler:
     )
     def test_deliver_tx_negative(self, *_: Any) -> None:
         """Test the 'deliver_tx' handler method, negative case."""
+        self.context.state.round_sequence.transaction_cache = VerifiedTransactionCache()
         message, dialogue = self.dialogues.create(
             counterparty="",
             performative=AbciMessage.Performative.REQUEST_DELIVER_TX,
@@ -227,7 +244,6 @@ class TestABCIRoundHandler:
         assert response.performative == AbciMessage.Performative.RESPONSE_DELIVER_TX
         assert response.code == ERROR_CODE
 
-    @mock.patch.object(handlers, "Transaction")
     def test_deliver_bad_tx(self, *_: Any) -> None:
         """Test the 'deliver_tx' handler method, when the transaction is not ok."""
         message, dialogue = self.dialogues.create(
@@ -250,6 +266,66 @@ class TestABCIRoundHandler:
         assert response.performative == AbciMessage.Performative.RESPONSE_DELIVER_TX
         assert response.code == ERROR_CODE
 
+    @pytest.mark.parametrize("workers", (0, 2))
+    def test_setup_teardown(self, workers: int) -> None:
+        """Test that the verification executor is set up only if workers are configured."""
+        self.context.params.tx_verification_workers = workers
+        self.handler.setup()
+        assert (self.handler._verification_executor is not None) == bool(workers)
+        self.handler.teardown()
+        assert self.handler._verification_executor is None
+
+    @staticmethod
+    def _block_requests() -> List[MagicMock]:
+        """Get the requests of a block, interleaved with mempool requests."""
+        performatives = (
+            AbciMessage.Performative.REQUEST_BEGIN_BLOCK,
+            AbciMessage.Performative.REQUEST_DELIVER_TX,
+            AbciMessage.Performative.REQUEST_FLUSH,
+            AbciMessage.Performative.REQUEST_CHECK_TX,
+            AbciMessage.Performative.REQUEST_DELIVER_TX,
+            AbciMessage.Performative.REQUEST_END_BLOCK,
+            AbciMessage.Performative.REQUEST_COMMIT,
+        )
+        return [
+            MagicMock(performative=performative, tx=i.to_bytes(1, "big"))
+            for i, performative in enumerate(performatives)
+        ]
+
+    def test_handle_in_order(self) -> None:
+        """Test that the requests of a block and the mempool requests are handled in the order that they are received."""
+        messages = self._block_requests()
+        with mock.patch.object(ABCIHandler, "handle") as handle_mock:
+            for message in messages:
+                self.handler.handle(message)
+
+        assert [call.args[0] for call in handle_mock.call_args_list] == messages
+
+    def test_handle_parallel_verification(self) -> None:
+        """Test that the deliver tx requests of a block are buffered until the end block, and then handled in order."""
+        self.handler._verification_executor = MagicMock()
+        messages = self._block_requests()
+        verify_batch = self.context.state.round_sequence.transaction_cache.verify_batch
+        with mock.patch.object(ABCIHandler, "handle") as handle_mock:
+            for message in messages[:5]:
+                self.handler.handle(message)
+            # the mempool requests are not buffered
+            assert [call.args[0] for call in handle_mock.call_args_list] == [
+                messages[0],
+                messages[2],
+                messages[3],
+            ]
+            verify_batch.assert_not_called()
+
+            for message in messages[5:]:
+                self.handler.handle(message)
+
+        handled = [call.args[0] for call in handle_mock.call_args_list]
+        assert handled == [messages[i] for i in (0, 2, 3, 1, 4, 5, 6)]
+        assert [list(call.args[0]) for call in verify_batch.call_args_list] == [
+            [b"\x01", b"\x04"],
+        ]
+
     @pytest.mark.parametrize("request_height", tuple(range(3)))
     def test_end_block(self, request_height: int) -> None:
         """Test the 'end_block' handler method."""
@@ -594,3 +670,93 @@ class TestTendermintHandler:
         self.handler.handle(message)
         log_message = self.handler.LogMessages.not_in_registered_addresses.value
         assert log_message in caplog.text
+
+
+def _response_types(data: bytes) -> List[str]:
+    """Get the types of the varint framed ABCI responses in the given data."""
+    types = []
+    buffer = memoryview(data)
+    offset = 0
+    while offset < len(buffer):
+        length, offset = cast(
+            Tuple[int, int],
+            _TendermintABCISerializer.decode_varint_from_buffer(buffer, offset),
+        )
+        response = Response.FromString(buffer[offset : offset + length].tobytes())
+        types.append(response.WhichOneof("value"))
+        offset += length
+    return types
+
+
+@pytest.mark.asyncio
+async def test_mempool_flush_answered_during_block() -> None:
+    """Test end to end that the mempool connection is flushed while a block is executed, before the commit is sent."""
+    skill_id = PublicId.from_str("dummy/skill:0.1.0")
+    context = MagicMock(skill_id=skill_id)
+    context.abci_dialogues = AbciDialogues(name="", skill_context=context)
+    responses: List[AbciMessage] = []
+    context.outbox.put_message.side_effect = lambda message: responses.append(message)
+    handler = ABCIRoundHandler(name="", skill_context=context)
+
+    channel = TcpServerChannel(skill_id, "", 0)
+    channel.queue = asyncio.Queue()
+    writers = {}
+    for peer_name in ("mempool", "consensus"):
+        writers[peer_name] = MagicMock(drain=mock.AsyncMock())
+        channel._streams_by_socket[peer_name] = (MagicMock(), writers[peer_name])
+
+    def written(peer_name: str) -> List[str]:
+        """Get the types of the responses written to a socket."""
+        return _response_types(
+            b"".join(call.args[0] for call in writers[peer_name].write.call_args_list)
+        )
+
+    async def serve(*requests: Tuple[str, Request]) -> None:
+        """Receive the requests, and handle them until all their responses are sent."""
+        for peer_name, request in requests:
+            await channel._handle_message(request, peer_name)
+        while not channel.queue.empty():
+            request_message = (await channel.get_message()).message
+            handler.handle(request_message)
+            while responses:
+                response = responses.pop(0)
+                await channel.send(
+                    Envelope(to=response.to, sender=response.sender, message=response)
+                )
+                await asyncio.sleep(0)
+
+    # the default responses of the abstract handler suffice to test the dispatching
+    with mock.patch.multiple(
+        ABCIRoundHandler,
+        **{
+            name: getattr(ABCIHandler, name)
+            for name in (
+                "begin_block",
+                "check_tx",
+                "deliver_tx",
+                "end_block",
+                "commit",
+            )
+        },
+    ):
+        # a mempool request is received while the block is being executed
+        await serve(
+            ("consensus", Request(begin_block=RequestBeginBlock())),
+            ("mempool", Request(check_tx=RequestCheckTx(tx=b"tx"))),
+            ("consensus", Request(deliver_tx=RequestDeliverTx(tx=b"tx"))),
+            ("consensus", Request(end_block=RequestEndBlock())),
+        )
+        # like Tendermint, flush the mempool connection and wait for its response before sending the commit
+        await serve(("mempool", Request(flush=RequestFlush())))
+        assert written("mempool") == ["check_tx", "flush"]
+        assert written("consensus") == ["begin_block", "deliver_tx", "end_block"]
+
+        await serve(("consensus", Request(commit=RequestCommit())))
+
+    assert written("consensus") == [
+        "begin_block",
+        "deliver_tx",
+        "end_block",
+        "commit",
+    ]
+    assert channel._ready_responses == {}
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -27,10 +27,13 @@ from typing import Any, Dict, cast
 from unittest import mock
 
 import pytest
+from aea.helpers.cid import to_v1
+from aea.helpers.ipfs.base import IPFSHashOnly
 
 from packages.valory.skills.abstract_round_abci.io_.ipfs import (
     IPFSInteract,
     IPFSInteractionError,
+    IPFSLocalHash,
 )
 from packages.valory.skills.abstract_round_abci.io_.load import AbstractLoader
 from packages.valory.skills.abstract_round_abci.io_.store import (
@@ -108,3 +111,39 @@ class TestIPFSInteract:
             side_effect=ValueError,
         ), pytest.raises(IPFSInteractionError):
             self.ipfs_interact.load(dummy_object)
+
+
+@pytest.mark.parametrize(
+    "files, expected_hash",
+    (
+        (
+            {"dummy_filename": "dummy_content"},
+            "QmYn1qHyFMDdVxYcwseLBdooLAyc3orNBH8vvj4iPTXd4R",
+        ),
+        (
+            {
+                "dummy_dir/dummy_filename1": "dummy_content",
+                "dummy_dir/dummy_filename2": "dummy_content",
+            },
+            "QmRP7wK1NZKwno9CFxQUeFaJip5eaaLBo1v8WFtyECgLCz",
+        ),
+    ),
+)
+def test_local_hash(files: Dict[str, str], expected_hash: str) -> None:
+    """Test that `IPFSLocalHash` computes the same hashes as an IPFS node."""
+    assert IPFSLocalHash.hash_files(files) == to_v1(expected_hash)
+
+
+def test_local_hash_large_files(tmp_path: PosixPath) -> None:
+    """Test that `IPFSLocalHash` chunks large files the same way as `IPFSHashOnly`."""
+    files = {"dummy_dir/small.txt": "small", "dummy_dir/large.txt": "large" * 100000}
+    dir_path = tmp_path / "dummy_dir"
+    dir_path.mkdir()
+    for path, data in files.items():
+        (tmp_path / path).write_text(data)
+
+    assert IPFSLocalHash.hash_files(files) == IPFSHashOnly.get(str(dir_path))
+    large_file = {"large.txt": files["dummy_dir/large.txt"]}
+    assert IPFSLocalHash.hash_files(large_file) == IPFSHashOnly.get(
+        str(dir_path / "large.txt")
+    )
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -28,6 +28,8 @@ import re
 from collections import OrderedDict
 from dataclasses import dataclass
 from enum import Enum
+from itertools import chain
+from math import ceil
 from pathlib import Path
 from tempfile import TemporaryDirectory
 from time import sleep
@@ -56,6 +58,8 @@ from packages.valory.skills.abstract_round_abci.models import (
     GenesisConsensusParams,
     GenesisEvidence,
     GenesisValidator,
+    HISTOGRAM_SUB_BUCKET_BITS,
+    LatencyHistogram,
     MIN_RESET_PAUSE_DURATION,
     NUMBER_OF_RETRIES,
     Requests,
@@ -119,6 +123,14 @@ BASE_DUMMY_PARAMS = dict(
     slash_threshold_amount=10_000_000_000_000_000,
     light_slash_unit_amount=5_000_000_000_000_000,
     serious_slash_unit_amount=8_000_000_000_000_000,
+    use_merkle_app_hash=False,
+    tx_verification_workers=0,
+    binary_payload_encoding=False,
+    pipelined_a2a_transactions=False,
+    multicall2_addresses={},
+    deduplicate_ipfs_uploads=False,
+    contract_state_cache_ttl=None,
+    blockchain_retention=None,
 )
 
 
@@ -672,6 +684,113 @@ class TestBenchmarkTool:
             behaviour_data = json.loads(benchmark_file.read_text())
             self._check_behaviour_data(behaviour_data, agent_name)
 
+    def test_repeated_measurements_and_spans(self) -> None:
+        """Test that the repeated measurements are accumulated, and that the spans are nested."""
+        agent_name = "agent"
+        benchmark = BenchmarkTool(
+            name=agent_name, skill_context=MagicMock(), log_dir="dummy"
+        )
+        behaviour = benchmark.measure(agent_name)
+        for _ in range(3):
+            with behaviour.local():
+                with behaviour.span("request"):
+                    with behaviour.span("parse"):
+                        pass
+        with behaviour.consensus():
+            pass
+
+        (behaviour_data,) = benchmark.data
+        data, accumulated, histograms = (
+            behaviour_data["data"],
+            behaviour_data["accumulated"],
+            behaviour_data["histograms"],
+        )
+        blocks = {
+            "local",
+            "local/request",
+            "local/request/parse",
+            "consensus",
+            "total",
+        }
+        assert set(data) == set(accumulated) == blocks
+        for times in (data, accumulated):
+            assert times["total"] == times["local"] + times["consensus"]
+            assert (
+                times["local/request/parse"] <= times["local/request"] <= times["local"]
+            )
+        # the total time is the duration of the last execution, the accumulated time is the sum of all of them
+        local_block = behaviour.local_data["local"]
+        assert data["local"] == local_block.total_time
+        assert accumulated["local"] == local_block.accumulated_time
+        assert data["local"] < accumulated["local"]
+        assert accumulated["consensus"] == data["consensus"]
+        assert histograms["local"]["count"] == 3
+        assert histograms["consensus"]["count"] == 1
+        assert sum(count for _, count in histograms["local"]["buckets"]) == 3
+
+    def test_disable(self) -> None:
+        """Test that the tool does not measure anything while disabled."""
+        benchmark = BenchmarkTool(
+            name="agent", skill_context=MagicMock(), log_dir="dummy", enabled=False
+        )
+        assert not benchmark.enabled
+        with benchmark.measure("agent").local():
+            pass
+        assert benchmark.data == []
+
+        benchmark.enable()
+        with benchmark.measure("agent").local():
+            pass
+        assert len(benchmark.data) == 1
+
+        with pytest.raises(AttributeError, match="This object is frozen!"):
+            benchmark._switch = None  # type: ignore
+
+        benchmark.disable()
+        with benchmark.measure("other_agent").local():
+            pass
+        assert len(benchmark.data) == 1
+
+
+class TestLatencyHistogram:
+    """Test LatencyHistogram"""
+
+    def test_buckets(self) -> None:
+        """Test that every value falls in the right bucket."""
+        for value in chain(range(10**4), range(10**9, 10**9 + 10**4)):
+            index = LatencyHistogram._bucket_index(value)
+            assert (
+                LatencyHistogram._bucket_value(index)
+                <= value
+                < LatencyHistogram._bucket_value(index + 1)
+            )
+
+    def test_percentiles(self) -> None:
+        """Test the percentiles of the histogram."""
+        histogram = LatencyHistogram()
+        values = list(range(1, 10**6, 7))
+        for value in reversed(values):
+            histogram.record(value)
+
+        max_error = 1 / 2**HISTOGRAM_SUB_BUCKET_BITS
+        for percentile in (50, 95, 99):
+            expected = values[ceil(percentile / 100 * len(values)) - 1]
+            actual = histogram.percentile(percentile)
+            assert abs(actual - expected) / expected <= max_error
+        assert histogram.percentile(100) == histogram.max == values[-1]
+        assert histogram.percentile(0) == histogram.min == values[0]
+
+        data = histogram.data
+        assert data["count"] == len(values)
+        assert data["total"] == sum(values)
+        assert data["p99"] == histogram.percentile(99)
+
+    def test_empty(self) -> None:
+        """Test an empty histogram."""
+        histogram = LatencyHistogram()
+        assert histogram.percentile(50) == 0
+        assert histogram.data["buckets"] == []
+
 
 def test_requests_model_initialization() -> None:
     """Test initialization of the 'Requests(Model)' class."""
@@ -733,6 +852,14 @@ def test_incorrect_setup(setup: Dict[str, Any], error_text: str) -> None:
         kwargs["reset_pause_duration"] = MIN_RESET_PAUSE_DURATION - 1
         BaseParams(**kwargs)
 
+    kwargs["reset_pause_duration"] = MIN_RESET_PAUSE_DURATION
+    with pytest.raises(
+        AEAEnforceError,
+        match="`blockchain_retention` must be greater than or equal to 1.",
+    ):
+        kwargs["blockchain_retention"] = 0
+        BaseParams(**kwargs)
+
 
 def test_genesis_block() -> None:
     """Test genesis block methods."""
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -19,7 +19,10 @@
 
 """Test the utils.py module of the skill."""
 
+import json
+import pickle  # nosec
 from collections import defaultdict
+from copy import copy, deepcopy
 from string import printable
 from typing import Any, Dict, List, Tuple, Type
 from unittest import mock
@@ -31,12 +34,17 @@ from hypothesis import strategies as st
 from packages.valory.skills.abstract_round_abci.tests.conftest import profile_name
 from packages.valory.skills.abstract_round_abci.utils import (
     DEFAULT_TENDERMINT_P2P_PORT,
+    FrozenDict,
+    FrozenList,
     KeyType,
     MAX_UINT64,
     ValueType,
     VerifyDrand,
+    canonical_decode,
+    canonical_encode,
     consensus_threshold,
     filter_negative,
+    freeze,
     get_data_from_nested_dict,
     get_value_with_type,
     inverse,
@@ -255,6 +263,153 @@ def test_is_json_serializable(valid_obj: Any, invalid_obj: Any) -> None:
     assert not is_json_serializable(invalid_obj)
 
 
+@given(
+    st.recursive(
+        st.none() | st.booleans() | st.integers() | st.text(printable),
+        lambda children: st.lists(children)
+        | st.tuples(children)
+        | st.dictionaries(st.text(printable), children),
+    ),
+)
+def test_freeze(obj: Any) -> None:
+    """Test `freeze`."""
+    frozen = freeze(obj)
+    assert frozen == obj
+    assert json.dumps(frozen, sort_keys=True) == json.dumps(obj, sort_keys=True)
+    assert freeze(frozen) is frozen or not isinstance(frozen, (list, dict))
+    assert pickle.loads(pickle.dumps(frozen)) == frozen  # nosec
+
+
+class TestFrozenContainers:
+    """Test `FrozenList` and `FrozenDict`."""
+
+    def setup(self) -> None:
+        """Set up the tests."""
+        self.frozen = freeze({"a": [1, {"b": [2]}], "c": ({"d": 3},)})
+
+    def test_types(self) -> None:
+        """Test that the containers are frozen recursively."""
+        assert isinstance(self.frozen, FrozenDict)
+        assert isinstance(self.frozen["a"], FrozenList)
+        assert isinstance(self.frozen["a"][1], FrozenDict)
+        assert isinstance(self.frozen["a"][1]["b"], FrozenList)
+        assert isinstance(self.frozen["c"], tuple)
+        assert isinstance(self.frozen["c"][0], FrozenDict)
+
+    def test_structural_sharing(self) -> None:
+        """Test that already frozen containers are not copied."""
+        nested = self.frozen["a"]
+        assert freeze([nested])[0] is nested
+
+    @pytest.mark.parametrize(
+        "mutation",
+        (
+            lambda frozen: frozen.update({"e": 4}),
+            lambda frozen: frozen.setdefault("e", 4),
+            lambda frozen: frozen.pop("a"),
+            lambda frozen: frozen.popitem(),
+            lambda frozen: frozen.clear(),
+            lambda frozen: frozen.__setitem__("e", 4),
+            lambda frozen: frozen.__delitem__("a"),
+            lambda frozen: frozen.__ior__({"e": 4}),
+            lambda frozen: frozen["a"].append(4),
+            lambda frozen: frozen["a"].extend([4]),
+            lambda frozen: frozen["a"].insert(0, 4),
+            lambda frozen: frozen["a"].remove(1),
+            lambda frozen: frozen["a"].pop(),
+            lambda frozen: frozen["a"].clear(),
+            lambda frozen: frozen["a"].sort(),
+            lambda frozen: frozen["a"].reverse(),
+            lambda frozen: frozen["a"].__setitem__(0, 4),
+            lambda frozen: frozen["a"].__delitem__(0),
+            lambda frozen: frozen["a"].__iadd__([4]),
+            lambda frozen: frozen["a"].__imul__(2),
+            lambda frozen: frozen["a"][1]["b"].append(4),
+            lambda frozen: frozen["c"][0].update({"e": 4}),
+        ),
+    )
+    def test_read_only(self, mutation: Any) -> None:
+        """Test that the containers cannot be altered."""
+        expected = deepcopy(self.frozen)
+        with pytest.raises(TypeError, match="object is read-only"):
+            mutation(self.frozen)
+        assert self.frozen == expected
+
+    def test_copy(self) -> None:
+        """Test that copying gives back mutable containers."""
+        shallow = copy(self.frozen)
+        assert type(shallow) is dict
+        assert type(copy(self.frozen["a"])) is list
+        shallow["e"] = 4
+        assert "e" not in self.frozen
+
+        deep = deepcopy(self.frozen)
+        assert deep == self.frozen
+        assert type(deep["a"]) is list
+        assert type(deep["a"][1]) is dict
+        deep["a"][1]["b"].append(4)
+        assert self.frozen["a"][1]["b"] == [2]
+
+
+@given(
+    st.recursive(
+        st.none()
+        | st.booleans()
+        | st.integers()
+        | st.floats(allow_nan=False)
+        | st.text()
+        | st.binary(),
+        lambda children: st.lists(children)
+        | st.dictionaries(st.text() | st.integers(), children),
+    ),
+)
+def test_canonical_encoding(obj: Any) -> None:
+    """Test that `canonical_decode` inverts `canonical_encode`."""
+    encoded = canonical_encode(obj)
+    assert canonical_decode(encoded) == obj
+    assert canonical_encode(canonical_decode(encoded)) == encoded
+
+
+class TestCanonicalEncoding:
+    """Test the canonical binary encoding."""
+
+    def test_canonical(self) -> None:
+        """Test that equal objects get the same encoding."""
+        assert canonical_encode({"a": 1, "b": (2, 3)}) == canonical_encode(
+            {"b": [2, 3], "a": 1}
+        )
+        assert canonical_encode(True) != canonical_encode(1)
+        assert canonical_encode(1) != canonical_encode(1.0)
+
+    def test_compact(self) -> None:
+        """Test that the encoding is more compact than json."""
+        obj = {"sender": "0x" + "a" * 40, "values": [1, -1, 2**40, None, True]}
+        assert len(canonical_encode(obj)) < len(json.dumps(obj).encode())
+
+    def test_unsupported_type(self) -> None:
+        """Test encoding an unsupported type."""
+        with pytest.raises(TypeError, match="cannot be canonically encoded"):
+            canonical_encode(object())
+
+    @pytest.mark.parametrize(
+        "data, match",
+        (
+            (b"", "Truncated data"),
+            (b"\x03\x80", "Truncated varint"),
+            (b"\x04\x00", "Truncated float"),
+            (b"\x05\x02a", "Truncated string"),
+            (b"\x05\x01\xff", "Invalid canonical encoding"),
+            (b"\x08\x01\x07\x00\x00", "Invalid canonical encoding"),
+            (b"\x09", "Unknown type tag 9"),
+            (b"\x00\x00", "1 trailing bytes found after the data"),
+        ),
+    )
+    def test_invalid(self, data: bytes, match: str) -> None:
+        """Test decoding invalid data."""
+        with pytest.raises(ValueError, match=match):
+            canonical_decode(data)
+
+
 @given(
     positive=st.dictionaries(st.text(), st.integers(min_value=0)),
     negative=st.dictionaries(st.text(), st.integers(max_value=-1)),
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -22,9 +22,11 @@
 import builtins
 import collections
 import dataclasses
+import struct
 import sys
 import types
 import typing
+from copy import deepcopy
 from hashlib import sha256
 from math import ceil
 from typing import (
@@ -477,6 +479,240 @@ def is_json_serializable(obj: Any) -> bool:
     return is_primitive_or_none(obj)
 
 
+def _read_only(self: Any, *_args: Any, **_kwargs: Any) -> None:
+    """Refuse a mutating operation on a frozen container."""
+    raise TypeError(f"'{type(self).__name__}' object is read-only")
+
+
+class FrozenList(list):
+    """
+    A read-only `list`.
+
+    It remains a `list` instance, so that it compares equal to, and is json-serialized as, a regular `list`,
+    but every in-place operation raises a `TypeError`.
+    Copying it, via the `copy` module, gives back a regular, mutable, container.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only  # type: ignore
+    append = extend = insert = remove = pop = clear = sort = reverse = _read_only  # type: ignore
+
+    def __copy__(self) -> List[Any]:
+        """Get a mutable shallow copy."""
+        return list(self)
+
+    def __deepcopy__(self, memo: Dict) -> List[Any]:
+        """Get a mutable deep copy."""
+        return [deepcopy(item, memo) for item in self]
+
+    def __reduce__(self) -> Tuple[Type["FrozenList"], Tuple[List[Any]]]:
+        """Pickle the list without using the (disabled) in-place operations."""
+        return type(self), (list(self),)
+
+
+class FrozenDict(dict):
+    """
+    A read-only `dict`.
+
+    It remains a `dict` instance, so that it compares equal to, and is json-serialized as, a regular `dict`,
+    but every in-place operation raises a `TypeError`.
+    Copying it, via the `copy` module, gives back a regular, mutable, container.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _read_only  # type: ignore
+    clear = pop = popitem = setdefault = update = _read_only  # type: ignore
+
+    def __copy__(self) -> Dict[Any, Any]:
+        """Get a mutable shallow copy."""
+        return dict(self)
+
+    def __deepcopy__(self, memo: Dict) -> Dict[Any, Any]:
+        """Get a mutable deep copy."""
+        return {key: deepcopy(value, memo) for key, value in self.items()}
+
+    def __reduce__(self) -> Tuple[Type["FrozenDict"], Tuple[Dict[Any, Any]]]:
+        """Pickle the dictionary without using the (disabled) in-place operations."""
+        return type(self), (dict(self),)
+
+
+def freeze(obj: Any) -> Any:
+    """
+    Get a deeply immutable version of the given json serializable object.
+
+    Lists and dictionaries are converted to their frozen counterparts, recursively.
+    Already frozen containers are returned as they are, without being traversed,
+    so that they can be structurally shared among different owners.
+
+    :param obj: the object to freeze.
+    :return: the frozen object.
+    """
+    if isinstance(obj, (FrozenList, FrozenDict)):
+        return obj
+    if isinstance(obj, list):
+        return FrozenList(freeze(item) for item in obj)
+    if isinstance(obj, tuple):
+        return tuple(freeze(item) for item in obj)
+    if isinstance(obj, dict):
+        return FrozenDict((key, freeze(value)) for key, value in obj.items())
+    return obj
+
+
+# type tags of the canonical binary encoding
+_TAG_NONE = 0x00
+_TAG_FALSE = 0x01
+_TAG_TRUE = 0x02
+_TAG_INT = 0x03
+_TAG_FLOAT = 0x04
+_TAG_STR = 0x05
+_TAG_BYTES = 0x06
+_TAG_LIST = 0x07
+_TAG_DICT = 0x08
+
+
+def _encode_varint(number: int) -> bytes:
+    """Encode a non-negative integer of arbitrary size as an unsigned LEB128 varint."""
+    encoded = bytearray()
+    while True:
+        byte, number = number & 0x7F, number >> 7
+        if number:
+            encoded.append(byte | 0x80)
+        else:
+            encoded.append(byte)
+            return bytes(encoded)
+
+
+def _decode_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Decode an unsigned LEB128 varint, returning it along with the offset after it."""
+    number = shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Truncated varint.")
+        byte = data[offset]
+        offset += 1
+        number |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return number, offset
+        shift += 7
+
+
+def _encode_canonical(obj: Any, out: bytearray) -> None:
+    """Append the canonical binary encoding of the given object to the given buffer."""
+    if obj is None:
+        out.append(_TAG_NONE)
+    elif obj is True or obj is False:
+        out.append(_TAG_TRUE if obj else _TAG_FALSE)
+    elif isinstance(obj, int):
+        out.append(_TAG_INT)
+        # zigzag encoding, to keep small negative integers short
+        out += _encode_varint(obj << 1 if obj >= 0 else ((-obj) << 1) - 1)
+    elif isinstance(obj, float):
+        out.append(_TAG_FLOAT)
+        out += struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        encoded = obj.encode("utf-8")
+        out.append(_TAG_STR)
+        out += _encode_varint(len(encoded)) + encoded
+    elif isinstance(obj, (bytes, bytearray)):
+        out.append(_TAG_BYTES)
+        out += _encode_varint(len(obj)) + obj
+    elif isinstance(obj, (list, tuple)):
+        out.append(_TAG_LIST)
+        out += _encode_varint(len(obj))
+        for item in obj:
+            _encode_canonical(item, out)
+    elif isinstance(obj, dict):
+        # the entries are sorted by their encoded keys, so that the encoding does not depend on the insertion order
+        entries = sorted((canonical_encode(key), value) for key, value in obj.items())
+        out.append(_TAG_DICT)
+        out += _encode_varint(len(entries))
+        for key, value in entries:
+            out += key
+            _encode_canonical(value, out)
+    else:
+        raise TypeError(
+            f"Object of type {type(obj).__name__} cannot be canonically encoded."
+        )
+
+
+def canonical_encode(obj: Any) -> bytes:
+    """
+    Encode the given object to a compact, canonical, binary representation.
+
+    Supports `None`, booleans, integers, floats, strings, bytes, lists, tuples and dictionaries.
+    Every value is prefixed by a one-byte type tag, and lengths and integers are encoded as varints.
+    Tuples are encoded as lists, and dictionaries' entries are sorted, so that equal objects get the same encoding.
+
+    :param obj: the object to encode.
+    :return: the encoded object.
+    """
+    out = bytearray()
+    _encode_canonical(obj, out)
+    return bytes(out)
+
+
+def _decode_canonical(  # pylint: disable=too-many-return-statements
+    data: bytes, offset: int
+) -> Tuple[Any, int]:
+    """Decode a canonically encoded object, returning it along with the offset after it."""
+    if offset >= len(data):
+        raise ValueError("Truncated data.")
+    tag = data[offset]
+    offset += 1
+    if tag == _TAG_NONE:
+        return None, offset
+    if tag in (_TAG_FALSE, _TAG_TRUE):
+        return tag == _TAG_TRUE, offset
+    if tag == _TAG_INT:
+        zigzag, offset = _decode_varint(data, offset)
+        return (zigzag >> 1) ^ -(zigzag & 1), offset
+    if tag == _TAG_FLOAT:
+        if offset + 8 > len(data):
+            raise ValueError("Truncated float.")
+        return struct.unpack_from(">d", data, offset)[0], offset + 8
+    if tag in (_TAG_STR, _TAG_BYTES):
+        length, offset = _decode_varint(data, offset)
+        end = offset + length
+        if end > len(data):
+            raise ValueError("Truncated string.")
+        raw = data[offset:end]
+        return (raw.decode("utf-8") if tag == _TAG_STR else raw), end
+    if tag == _TAG_LIST:
+        length, offset = _decode_varint(data, offset)
+        items = []
+        for _ in range(length):
+            item, offset = _decode_canonical(data, offset)
+            items.append(item)
+        return items, offset
+    if tag == _TAG_DICT:
+        length, offset = _decode_varint(data, offset)
+        decoded = {}
+        for _ in range(length):
+            key, offset = _decode_canonical(data, offset)
+            decoded[key], offset = _decode_canonical(data, offset)
+        return decoded, offset
+    raise ValueError(f"Unknown type tag {tag}.")
+
+
+def canonical_decode(data: bytes) -> Any:
+    """
+    Decode an object from its canonical binary representation.
+
+    :param data: the data to decode.
+    :return: the decoded object.
+    :raises ValueError: if the data are not a valid canonical encoding.
+    """
+    try:
+        obj, offset = _decode_canonical(data, 0)
+    except (UnicodeDecodeError, TypeError) as exc:
+        raise ValueError(f"Invalid canonical encoding: {exc}") from exc
+    if offset != len(data):
+        raise ValueError(f"{len(data) - offset} trailing bytes found after the data.")
+    return obj
+
+
 def filter_negative(mapping: Dict[str, int]) -> Iterator[str]:
     """Return the keys of a dictionary for which the values are negative integers."""
     return (key for key, number in mapping.items() if number < 0)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2022-2023 Valory AG
+#   Copyright 2022-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -53,8 +53,8 @@ class RoundCountRound(CollectSameUntilThresholdRound):
             # this simulates a state that is built across different rounds
             # we are using `round_count` here simply for convenience reasons,
             # it can be any data.
-            all_round_counts: List[int] = cast(
-                List[int], self.synchronized_data.db.get("round_counts", [])
+            all_round_counts: List[int] = list(
+                cast(List[int], self.synchronized_data.db.get("round_counts", []))
             )
             all_round_counts.append(self.most_voted_payload)
             synchronized_data = self.synchronized_data.update(
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2024 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -176,7 +176,9 @@ class RegistrationStartupBehaviour(RegistrationBaseBehaviour):
             contract_callable="verify_contract",
             chain_id=self.params.default_chain_id,
         )
-        contract_api_response = yield from self.get_contract_api_response(**kwargs)  # type: ignore
+        contract_api_response = yield from self.get_cached_contract_api_response(
+            is_final=lambda msg: bool(msg.state.body["verified"]), **kwargs  # type: ignore
+        )
         if (
             contract_api_response.performative
             is not ContractApiMessage.Performative.STATE
@@ -209,7 +211,7 @@ class RegistrationStartupBehaviour(RegistrationBaseBehaviour):
             service_id=on_chain_service_id,
             chain_id=self.params.default_chain_id,
         )
-        contract_api_response = yield from self.get_contract_api_response(**kwargs)  # type: ignore
+        contract_api_response = yield from self.get_cached_contract_api_response(**kwargs)  # type: ignore
         if contract_api_response.performative != ContractApiMessage.Performative.STATE:
             log_message = self.LogMessages.failed_service_info
             self.context.logger.error(
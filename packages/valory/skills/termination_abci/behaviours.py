@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2022-2024 Valory AG
+#   Copyright 2022-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -28,6 +28,9 @@ from packages.valory.contracts.gnosis_safe.contract import (
     GnosisSafeContract,
     SafeOperation,
 )
+from packages.valory.contracts.multicall2.contract import (  # noqa: F401  # pylint: disable=unused-import
+    Multicall2Contract,
+)
 from packages.valory.contracts.multisend.contract import (
     MultiSendContract,
     MultiSendOperation,
@@ -253,27 +256,17 @@ class BackgroundBehaviour(BaseBehaviour):
 
     def _get_service_owner(self) -> Generator[None, None, Optional[str]]:
         """Method that returns the service owner."""
-        response = yield from self.get_contract_api_response(
-            performative=ContractApiMessage.Performative.GET_STATE,  # type: ignore
+        service_owner = yield from self.batch_contract_call(
             contract_id=str(ServiceRegistryContract.contract_id),
-            contract_callable="get_service_owner",
             contract_address=self.params.service_registry_address,
-            service_id=self.params.on_chain_service_id,
-            chain_id=self.params.default_chain_id,
+            fn_name="ownerOf",
+            args=[self.params.on_chain_service_id],
         )
-
-        if response.performative != ContractApiMessage.Performative.STATE:
+        if service_owner is None:
             self.context.logger.error(
-                f"Couldn't get the service owner for service with id={self.params.on_chain_service_id}. "
-                f"Expected response performative {ContractApiMessage.Performative.STATE.value}, "  # type: ignore
-                f"received {response.performative.value}."
+                f"Couldn't get the service owner for service with id={self.params.on_chain_service_id}."
             )
-            return None
-
-        service_owner = cast(
-            Optional[str], response.state.body.get("service_owner", None)
-        )
-        return service_owner
+        return cast(Optional[str], service_owner)
 
     def get_multisend_payload(self) -> Generator[None, None, Optional[str]]:
         """Prepares and returns the multisend to hand over safe ownership to the service_owner."""
@@ -297,24 +290,16 @@ class BackgroundBehaviour(BaseBehaviour):
 
     def _get_safe_owners(self) -> Generator[None, None, Optional[List[str]]]:
         """Retrieves safe owners."""
-        response = yield from self.get_contract_api_response(
-            performative=ContractApiMessage.Performative.GET_STATE,  # type: ignore
+        owners = yield from self.batch_contract_call(
             contract_id=str(GnosisSafeContract.contract_id),
-            contract_callable="get_owners",
             contract_address=self.synchronized_data.safe_contract_address,
-            chain_id=self.params.default_chain_id,
+            fn_name="getOwners",
         )
-
-        if response.performative != ContractApiMessage.Performative.STATE:
+        if owners is None:
             self.context.logger.error(
-                f"Couldn't get the safe owners for safe deployed at {self.synchronized_data.safe_contract_address}. "
-                f"Expected response performative {ContractApiMessage.Performative.STATE.value}, "  # type: ignore
-                f"received {response.performative.value}."
+                f"Couldn't get the safe owners for safe deployed at {self.synchronized_data.safe_contract_address}."
             )
-            return None
-
-        owners = cast(Optional[List[str]], response.state.body.get("owners", None))
-        return owners
+        return cast(Optional[List[str]], owners)
 
     def _get_remove_owner_tx(
         self, owner: str, threshold: int
@@ -416,9 +401,14 @@ class BackgroundBehaviour(BaseBehaviour):
         """This method compiles a multisend transaction to give ownership of the safe contract to the service owner."""
         transactions: List[Dict] = []
         threshold = 1
-        safe_owners = yield from self._get_safe_owners()
-        if safe_owners is None:
+        # the owners of the safe and of the service are read in a single batch
+        safe_owners, service_owner = yield from self.gather(
+            self._get_safe_owners(), self._get_service_owner()
+        )
+        if safe_owners is None or service_owner is None:
             return None
+        # the safe is handed over to the current owner of the service
+        self._service_owner_address = service_owner
         owner_to_be_swapped = safe_owners[0]
         # we remove all but one safe owner
         # reverse the list to avoid errors when removing owners
@@ -502,6 +492,9 @@ class BackgroundBehaviour(BaseBehaviour):
     def get_callback_request(self) -> Callable[[Message, "BaseBehaviour"], None]:
         """Wrapper for callback_request(), overridden to avoid mix-ups with normal (non-background) behaviours."""
 
+        # if the request is sent by a gathered generator, route the response to it
+        deliver_gathered_message = self._get_gathered_message_callback()
+
         def callback_request(
             message: Message, _current_behaviour: BaseBehaviour
         ) -> None:
@@ -522,6 +515,12 @@ class BackgroundBehaviour(BaseBehaviour):
                 )
                 return
 
+            if deliver_gathered_message is not None:
+                if not deliver_gathered_message(message):
+                    # the gather has finished before the response arrived
+                    self.handle_late_messages(self.behaviour_id, message)
+                return
+
             if self.state != AsyncBehaviour.AsyncState.WAITING_MESSAGE:
                 self.context.logger.warning(
                     f"could not send message {message} to {self.behaviour_id}"
@@ -23,18 +23,20 @@ import logging
 import platform
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Callable, Dict, List, Optional, Type
+from typing import Any, Callable, Dict, Generator, List, Optional, Type, cast
 from unittest import mock
 
 import pytest
 
 from packages.valory.contracts.gnosis_safe.contract import GnosisSafeContract
 from packages.valory.contracts.multisend.contract import MultiSendContract
-from packages.valory.contracts.service_registry.contract import ServiceRegistryContract
 from packages.valory.protocols.contract_api import ContractApiMessage
 from packages.valory.protocols.contract_api.custom_types import RawTransaction, State
 from packages.valory.skills.abstract_round_abci.base import AbciAppDB
-from packages.valory.skills.abstract_round_abci.behaviour_utils import AsyncBehaviour
+from packages.valory.skills.abstract_round_abci.behaviour_utils import (
+    AsyncBehaviour,
+    MULTICALL2_CONTRACT_ID,
+)
 from packages.valory.skills.abstract_round_abci.behaviours import BaseBehaviour
 from packages.valory.skills.abstract_round_abci.test_tools.base import (
     FSMBehaviourBaseCase,
@@ -159,8 +161,7 @@ class TestBackgroundBehaviour(BaseTerminationTest):
         f"received {ContractApiMessage.Performative.ERROR}."
     )
     _SERVICE_OWNER_ERR_LOG = (
-        f"Couldn't get the service owner for service with id={SERVICE_ID}. "
-        f"{_STATE_ERR_LOG}"
+        f"Couldn't get the service owner for service with id={SERVICE_ID}."
     )
     _ZERO_TRANSFER_EVENTS_ERR_LOG = (
         f"Couldn't get the latest Zero Transfer (`SafeReceived`) event. "
@@ -170,8 +171,7 @@ class TestBackgroundBehaviour(BaseTerminationTest):
         f"Couldn't get the latest `RemovedOwner` event. " f"{_STATE_ERR_LOG}"
     )
     _SAFE_OWNERS_ERR_LOG = (
-        f"Couldn't get the safe owners for safe deployed at {SAFE_ADDRESS}. "
-        f"{_STATE_ERR_LOG}"
+        f"Couldn't get the safe owners for safe deployed at {SAFE_ADDRESS}."
     )
     _REMOVE_OWNER_ERR_LOG = f"Couldn't get a remove owner tx. " f"{_STATE_ERR_LOG}"
     _SWAP_OWNER_ERR_LOG = f"Couldn't get a swap owner tx. " f"{_STATE_ERR_LOG}"
@@ -181,23 +181,23 @@ class TestBackgroundBehaviour(BaseTerminationTest):
     _IS_STOPPED_LOG = "dropping message as behaviour has stopped:"
     _IS_NOT_WAITING_MESSAGE = "could not send message"
 
-    def _mock_get_service_owner_request(
-        self,
-        error: bool = False,
+    def _mock_contract_call_batch_request(
+        self, results: List[Any], error: bool = False
     ) -> None:
-        """Mock a ServiceRegistryContract.get_service_owner() request."""
+        """Mock a request for a batch of contract calls."""
         if not error:
             response_performative = ContractApiMessage.Performative.STATE
-            response_body = dict(service_owner=SERVICE_OWNER_ADDRESS)
+            response_body = dict(
+                results=[dict(success=True, data=result) for result in results]
+            )
         else:
             response_body = dict()
             response_performative = ContractApiMessage.Performative.ERROR
 
         self.mock_contract_api_request(
-            contract_id=str(ServiceRegistryContract.contract_id),
+            contract_id=MULTICALL2_CONTRACT_ID,
             request_kwargs=dict(
                 performative=ContractApiMessage.Performative.GET_STATE,
-                contract_address=SERVICE_REGISTRY_ADDRESS,
             ),
             response_kwargs=dict(
                 performative=response_performative,
@@ -208,6 +208,13 @@ class TestBackgroundBehaviour(BaseTerminationTest):
             ),
         )
 
+    def _mock_get_service_owner_request(
+        self,
+        error: bool = False,
+    ) -> None:
+        """Mock a batched request for the owner of the service, sent when checking for the signal."""
+        self._mock_contract_call_batch_request([SERVICE_OWNER_ADDRESS], error)
+
     def _mock_get_zero_transfer_events_request(
         self,
         error: bool = False,
@@ -267,26 +274,11 @@ class TestBackgroundBehaviour(BaseTerminationTest):
         self,
         error: bool = False,
     ) -> None:
-        """Mock a GnosisSafeContract.get_owners() request."""
-        if not error:
-            response_performative = ContractApiMessage.Performative.STATE
-            response_body = dict(owners=self._SAFE_OWNERS)
-        else:
-            response_body = dict()
-            response_performative = ContractApiMessage.Performative.ERROR
-        self.mock_contract_api_request(
-            contract_id=str(GnosisSafeContract.contract_id),
-            request_kwargs=dict(
-                performative=ContractApiMessage.Performative.GET_STATE,
-                contract_address=SAFE_ADDRESS,
-            ),
-            response_kwargs=dict(
-                performative=response_performative,
-                state=State(
-                    ledger_id="ethereum",
-                    body=response_body,
-                ),
-            ),
+        """Mock a batched request for the owners of the safe and of the service."""
+        # the batch is sent on the tick after the calls have joined it
+        self.behaviour.act_wrapper()
+        self._mock_contract_call_batch_request(
+            [self._SAFE_OWNERS, SERVICE_OWNER_ADDRESS], error
         )
 
     def _mock_get_remove_owner_data_request(self, error: bool = False) -> None:
@@ -559,6 +551,8 @@ class TestBackgroundBehaviour(BaseTerminationTest):
         with mock.patch.object(
             self.behaviour.current_behaviour.context.logger, "log"
         ) as mock_logger:
+            # the first tick issues the batched call for the service owner, the second one sends it
+            self.behaviour.act_wrapper()
             self.behaviour.act_wrapper()
 
             # apply the OK mocks first
@@ -615,6 +609,7 @@ class TestBackgroundBehaviour(BaseTerminationTest):
         """Tests the background behaviour when no termination signal is present."""
         self.fast_forward(self._INITIAL_DATA)
         with mock.patch.object(AsyncBehaviour, "sleep") as sleep:
+            self.behaviour.act_wrapper()
             self.behaviour.act_wrapper()
             self._mock_get_service_owner_request()
             self._mock_get_zero_transfer_events_request(num_events=0)
@@ -624,6 +619,7 @@ class TestBackgroundBehaviour(BaseTerminationTest):
         """Tests the background behaviour when the safe owner hasn't been removed."""
         self.fast_forward(self._INITIAL_DATA)
         self.behaviour.act_wrapper()
+        self.behaviour.act_wrapper()
         self._mock_get_service_owner_request()
         self._mock_get_zero_transfer_events_request()
         self._mock_get_removed_owner_events_request(num_events=0)
@@ -635,6 +631,51 @@ class TestBackgroundBehaviour(BaseTerminationTest):
         self._mock_get_raw_safe_transaction_hash_request()
         self.complete()
 
+    def test_owners_are_read_in_a_single_batch(self) -> None:
+        """Tests that the owners of the safe and of the service are read in a single batch."""
+        self.fast_forward(self._INITIAL_DATA)
+        behaviour = cast(BackgroundBehaviour, self.behaviour.current_behaviour)
+        requests: List[Dict[str, Any]] = []
+
+        def dummy_get_contract_api_response(
+            **kwargs: Any,
+        ) -> Generator[None, None, mock.MagicMock]:
+            """Dummy `get_contract_api_response` method."""
+            requests.append(kwargs)
+            yield
+            if kwargs["contract_callable"] != "aggregate_calls":
+                return mock.MagicMock(
+                    performative=ContractApiMessage.Performative.ERROR
+                )
+            results = [
+                dict(success=True, data=self._SAFE_OWNERS),
+                dict(success=True, data="new_service_owner"),
+            ]
+            return mock.MagicMock(
+                performative=ContractApiMessage.Performative.STATE,
+                state=mock.MagicMock(body=dict(results=results)),
+            )
+
+        with mock.patch.object(
+            behaviour,
+            "get_contract_api_response",
+            side_effect=dummy_get_contract_api_response,
+        ):
+            multisend_tx = behaviour._get_multisend_tx()
+            with pytest.raises(StopIteration) as result:
+                while True:
+                    next(multisend_tx)
+
+        # the multisend is not prepared, as the remove owner tx fails
+        assert result.value.value is None
+        assert [call["fn_name"] for call in requests[0]["calls"]] == [
+            "getOwners",
+            "ownerOf",
+        ]
+        assert requests[1]["contract_callable"] == "get_remove_owner_data"
+        # the safe is handed over to the current service owner
+        assert behaviour._service_owner_address == "new_service_owner"
+
 
 class TestTerminationBehaviour(BaseTerminationTest):
     """Test termination behaviour."""
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2024 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -43,6 +43,9 @@ from aea.protocols.base import Message
 from web3.types import Nonce, TxData, Wei
 
 from packages.valory.contracts.gnosis_safe.contract import GnosisSafeContract
+from packages.valory.contracts.multicall2.contract import (  # noqa: F401  # pylint: disable=unused-import
+    Multicall2Contract,
+)
 from packages.valory.protocols.contract_api.message import ContractApiMessage
 from packages.valory.skills.abstract_round_abci.behaviour_utils import RPCResponseStatus
 from packages.valory.skills.abstract_round_abci.behaviours import (
@@ -285,11 +288,13 @@ class TransactionSettlementBaseBehaviour(BaseBehaviour, ABC):
             self.synchronized_data.most_voted_tx_hash
         )
         chain_id = self.synchronized_data.get_chain_id(self.params.default_chain_id)
-        contract_api_msg = yield from self.get_contract_api_response(
+        contract_api_msg = yield from self.get_cached_contract_api_response(
             performative=ContractApiMessage.Performative.GET_STATE,  # type: ignore
             contract_address=self.synchronized_data.safe_contract_address,
             contract_id=str(GnosisSafeContract.contract_id),
             contract_callable="verify_tx",
+            # the verification of a mined transaction does not change
+            is_final=lambda msg: msg.state.body["status"] != -1,
             tx_hash=tx_hash,
             owners=tuple(self.synchronized_data.participants),
             to_address=tx_params["to_address"],
@@ -330,17 +335,16 @@ class TransactionSettlementBaseBehaviour(BaseBehaviour, ABC):
 
         return f"Received a {revert_code} revert error: {revert_explanation}."
 
-    def _get_safe_nonce(self) -> Generator[None, None, ContractApiMessage]:
+    def _get_safe_nonce(self) -> Generator[None, None, Optional[int]]:
         """Get the safe nonce."""
         chain_id = self.synchronized_data.get_chain_id(self.params.default_chain_id)
-        contract_api_msg = yield from self.get_contract_api_response(
-            performative=ContractApiMessage.Performative.GET_STATE,  # type: ignore
-            contract_address=self.synchronized_data.safe_contract_address,
+        safe_nonce = yield from self.batch_contract_call(
             contract_id=str(GnosisSafeContract.contract_id),
-            contract_callable="get_safe_nonce",
+            contract_address=self.synchronized_data.safe_contract_address,
+            fn_name="nonce",
             chain_id=chain_id,
         )
-        return contract_api_msg
+        return cast(Optional[int], safe_nonce)
 
 
 class RandomnessTransactionSubmissionBehaviour(RandomnessBehaviour):
@@ -548,7 +552,7 @@ class CheckTransactionHistoryBehaviour(TransactionSettlementBaseBehaviour):
 
         self.set_done()
 
-    def _check_tx_history(  # pylint: disable=too-many-return-statements
+    def _check_tx_history(
         self,
     ) -> Generator[None, None, Tuple[VerificationStatus, Optional[str]]]:
         """Check the transaction history."""
@@ -559,16 +563,11 @@ class CheckTransactionHistoryBehaviour(TransactionSettlementBaseBehaviour):
             )
             return VerificationStatus.ERROR, None
 
-        contract_api_msg = yield from self._get_safe_nonce()
-        if (
-            contract_api_msg.performative != ContractApiMessage.Performative.STATE
-        ):  # pragma: nocover
-            self.context.logger.error(
-                f"get_safe_nonce unsuccessful! Received: {contract_api_msg}"
-            )
+        safe_nonce = yield from self._get_safe_nonce()
+        if safe_nonce is None:
+            self.context.logger.error("Could not get the safe nonce!")
             return VerificationStatus.ERROR, None
 
-        safe_nonce = cast(int, contract_api_msg.state.body["safe_nonce"])
         if safe_nonce == self.params.mutable_params.nonce:
             # if we have reached this state it means that the transaction didn't go through in the expected time
             # as such we assume it is not verified
@@ -584,80 +583,114 @@ class CheckTransactionHistoryBehaviour(TransactionSettlementBaseBehaviour):
         self.context.logger.info(
             f"Starting check for the transaction history: {self.history}. "
         )
+        # the hashes are checked concurrently, and the first decisive result, starting from the most recent hash,
+        # takes precedence as if they were checked one by one; the check stops as soon as the result is decided
+        history = self.history[::-1]
+        statuses = yield from self.gather(
+            *(self._check_tx(tx_hash) for tx_hash in history),
+            until=lambda statuses: self._decide_tx_history(len(history), statuses)
+            is not None,
+        )
+        status, index = cast(
+            Tuple[VerificationStatus, Optional[int]],
+            self._decide_tx_history(len(history), dict(enumerate(statuses))),
+        )
+        tx_hash = None if index is None else history[index]
+
+        if status == VerificationStatus.BAD_SAFE_NONCE:
+            self.context.logger.info(
+                f"Safe nonce {safe_nonce} was used, but no valid transaction was found. "
+                f"We cannot resend the transaction with the same nonce."
+            )
+
+        return status, tx_hash
+
+    @staticmethod
+    def _decide_tx_history(
+        n_hashes: int, statuses: Dict[int, VerificationStatus]
+    ) -> Optional[Tuple[VerificationStatus, Optional[int]]]:
+        """
+        Decide the result of the history check from the statuses of the hashes checked so far.
+
+        The result is decided by the first decisive status, once the statuses of all the more recent hashes are known.
+
+        :param n_hashes: the number of the checked hashes.
+        :param statuses: the statuses of the hashes checked so far, by their index, starting from the most recent one.
+        :return: the decided status and the index of the hash which decided it, or None if it is not decided yet.
+        """
         was_nonce_reused = False
-        for tx_hash in self.history[::-1]:
-            self.context.logger.info(f"Checking hash {tx_hash}...")
-            contract_api_msg = yield from self._verify_tx(tx_hash)
+        for index in range(n_hashes):
+            status = statuses.get(index)
+            if status is None:
+                return None
+            if status == VerificationStatus.BAD_SAFE_NONCE:
+                was_nonce_reused = True
+            elif status != VerificationStatus.PENDING:
+                return status, index
 
-            if (
-                contract_api_msg.performative != ContractApiMessage.Performative.STATE
-            ):  # pragma: nocover
-                self.context.logger.error(
-                    f"verify_tx unsuccessful for {tx_hash}! Received: {contract_api_msg}"
-                )
-                return VerificationStatus.ERROR, tx_hash
+        if was_nonce_reused:
+            return VerificationStatus.BAD_SAFE_NONCE, None
+        return VerificationStatus.NOT_VERIFIED, None
 
-            verified = cast(bool, contract_api_msg.state.body["verified"])
-            verified_log = f"Verified result for {tx_hash}: {verified}"
+    def _check_tx(self, tx_hash: str) -> Generator[None, None, VerificationStatus]:
+        """
+        Check a transaction of the history.
 
-            if verified:
-                self.context.logger.info(verified_log)
-                return VerificationStatus.VERIFIED, tx_hash
+        :param tx_hash: the hash of the transaction.
+        :return: `PENDING` if it has no receipt, `BAD_SAFE_NONCE` if it reused the safe's nonce,
+            or the decisive status of the transaction otherwise.
+        :yield: None
+        """
+        self.context.logger.info(f"Checking hash {tx_hash}...")
+        contract_api_msg = yield from self._verify_tx(tx_hash)
 
-            self.context.logger.info(
-                verified_log + f", all: {contract_api_msg.state.body}"
+        if (
+            contract_api_msg.performative != ContractApiMessage.Performative.STATE
+        ):  # pragma: nocover
+            self.context.logger.error(
+                f"verify_tx unsuccessful for {tx_hash}! Received: {contract_api_msg}"
             )
+            return VerificationStatus.ERROR
 
-            status = cast(int, contract_api_msg.state.body["status"])
-            if status == -1:
-                self.context.logger.info(f"Tx hash {tx_hash} has no receipt!")
-                # this loop might take a long time
-                # we do not want to starve the rest of the behaviour
-                # we yield which freezes this loop here until the
-                # AbstractRoundBehaviour it belongs to, sends a tick to it
-                yield
-                continue
-
-            tx_data = cast(TxData, contract_api_msg.state.body["transaction"])
-            revert_reason = yield from self._get_revert_reason(tx_data)
-
-            if revert_reason is not None:
-                if self._safe_nonce_reused(revert_reason):
-                    self.context.logger.info(
-                        f"The safe's nonce has been reused for {tx_hash}. "
-                        f"{self.check_expected_to_be_verified} is expected to be verified!"
-                    )
-                    was_nonce_reused = True
-                    # this loop might take a long time
-                    # we do not want to starve the rest of the behaviour
-                    # we yield which freezes this loop here until the
-                    # AbstractRoundBehaviour it belongs to, sends a tick to it
-                    yield
-                    continue
-
-                self.context.logger.warning(
-                    f"Payload is invalid for {tx_hash}! Cannot continue. Received: {revert_reason}"
-                )
+        verified = cast(bool, contract_api_msg.state.body["verified"])
+        verified_log = f"Verified result for {tx_hash}: {verified}"
 
-            return VerificationStatus.INVALID_PAYLOAD, tx_hash
+        if verified:
+            self.context.logger.info(verified_log)
+            return VerificationStatus.VERIFIED
 
-        if was_nonce_reused:
-            self.context.logger.info(
-                f"Safe nonce {safe_nonce} was used, but no valid transaction was found. "
-                f"We cannot resend the transaction with the same nonce."
+        self.context.logger.info(verified_log + f", all: {contract_api_msg.state.body}")
+
+        status = cast(int, contract_api_msg.state.body["status"])
+        if status == -1:
+            self.context.logger.info(f"Tx hash {tx_hash} has no receipt!")
+            return VerificationStatus.PENDING
+
+        tx_data = cast(TxData, contract_api_msg.state.body["transaction"])
+        revert_reason = yield from self._get_revert_reason(tx_data)
+        if revert_reason is not None:
+            if self._safe_nonce_reused(revert_reason):
+                self.context.logger.info(
+                    f"The safe's nonce has been reused for {tx_hash}. "
+                    f"{self.check_expected_to_be_verified} is expected to be verified!"
+                )
+                return VerificationStatus.BAD_SAFE_NONCE
+
+            self.context.logger.warning(
+                f"Payload is invalid for {tx_hash}! Cannot continue. Received: {revert_reason}"
             )
-            return VerificationStatus.BAD_SAFE_NONCE, None
 
-        return VerificationStatus.NOT_VERIFIED, None
+        return VerificationStatus.INVALID_PAYLOAD
 
     def _get_revert_reason(self, tx: TxData) -> Generator[None, None, Optional[str]]:
         """Get the revert reason of the given transaction."""
         chain_id = self.synchronized_data.get_chain_id(self.params.default_chain_id)
-        contract_api_msg = yield from self.get_contract_api_response(
+        contract_api_msg = yield from self.get_cached_contract_api_response(
             performative=ContractApiMessage.Performative.GET_STATE,  # type: ignore
             contract_address=self.synchronized_data.safe_contract_address,
             contract_id=str(GnosisSafeContract.contract_id),
             contract_callable="revert_reason",
+            is_final=lambda _: True,
             tx=tx,
             chain_id=chain_id,
         )
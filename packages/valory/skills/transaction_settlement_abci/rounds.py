@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -386,7 +386,7 @@ class SelectKeeperTransactionSubmissionBAfterTimeoutRound(
         if self.threshold_reached:
             synchronized_data = cast(SynchronizedData, self.synchronized_data)
             keeper = synchronized_data.most_voted_keeper_address
-            missed_messages = synchronized_data.missed_messages
+            missed_messages = dict(synchronized_data.missed_messages)
             missed_messages[keeper] += 1
 
             synchronized_data = cast(
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2021-2023 Valory AG
+#   Copyright 2021-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -65,6 +65,7 @@ from packages.valory.protocols.ledger_api.message import LedgerApiMessage
 from packages.valory.skills.abstract_round_abci.base import AbciAppDB
 from packages.valory.skills.abstract_round_abci.behaviour_utils import (
     BaseBehaviour,
+    MULTICALL2_CONTRACT_ID,
     RPCResponseStatus,
     make_degenerate_behaviour,
 )
@@ -1119,6 +1120,23 @@ class TestCheckTransactionHistoryBehaviour(TransactionSettlementFSMBehaviourBase
             == CheckTransactionHistoryBehaviour.auto_behaviour_id()
         )
 
+    def _mock_safe_nonce_request(self, safe_nonce: int) -> None:
+        """Mock the batched request for the safe nonce."""
+        # the batch is sent once the calls issued in the same tick have joined it
+        self.behaviour.act_wrapper()
+        self.mock_contract_api_request(
+            request_kwargs=dict(performative=ContractApiMessage.Performative.GET_STATE),
+            contract_id=MULTICALL2_CONTRACT_ID,
+            response_kwargs=dict(
+                performative=ContractApiMessage.Performative.STATE,
+                callable="aggregate_calls",
+                state=TrState(
+                    ledger_id="ethereum",
+                    body={"results": [{"success": True, "data": safe_nonce}]},
+                ),
+            ),
+        )
+
     @pytest.mark.parametrize(
         "verified, status, hashes_history, revert_reason",
         (
@@ -1141,22 +1159,7 @@ class TestCheckTransactionHistoryBehaviour(TransactionSettlementFSMBehaviourBase
         self.behaviour.act_wrapper()
 
         if hashes_history:
-            self.mock_contract_api_request(
-                request_kwargs=dict(
-                    performative=ContractApiMessage.Performative.GET_STATE
-                ),
-                contract_id=str(GNOSIS_SAFE_CONTRACT_ID),
-                response_kwargs=dict(
-                    performative=ContractApiMessage.Performative.STATE,
-                    callable="get_safe_nonce",
-                    state=TrState(
-                        ledger_id="ethereum",
-                        body={
-                            "safe_nonce": 0,
-                        },
-                    ),
-                ),
-            )
+            self._mock_safe_nonce_request(0)
             self.mock_contract_api_request(
                 request_kwargs=dict(
                     performative=ContractApiMessage.Performative.GET_STATE
@@ -1218,22 +1221,7 @@ class TestCheckTransactionHistoryBehaviour(TransactionSettlementFSMBehaviourBase
         self.behaviour.act_wrapper()
         self.behaviour.context.params.mutable_params.nonce = 1
         if hashes_history:
-            self.mock_contract_api_request(
-                request_kwargs=dict(
-                    performative=ContractApiMessage.Performative.GET_STATE
-                ),
-                contract_id=str(GNOSIS_SAFE_CONTRACT_ID),
-                response_kwargs=dict(
-                    performative=ContractApiMessage.Performative.STATE,
-                    callable="get_safe_nonce",
-                    state=TrState(
-                        ledger_id="ethereum",
-                        body={
-                            "safe_nonce": 1,
-                        },
-                    ),
-                ),
-            )
+            self._mock_safe_nonce_request(1)
         self.behaviour.act_wrapper()
         self.mock_a2a_transaction()
         self._test_done_flag_set()
@@ -1246,6 +1234,178 @@ class TestCheckTransactionHistoryBehaviour(TransactionSettlementFSMBehaviourBase
             ).auto_behaviour_id()
         )
 
+    @pytest.mark.parametrize(
+        "verifications, revert_reasons, expected_status, expected_index",
+        (
+            # no receipt for the latest hash, the nonce was reused by the next one, and the oldest one is verified
+            (
+                ((False, -1), (False, 0), (True, 1)),
+                {1: "GS026"},
+                VerificationStatus.VERIFIED,
+                2,
+            ),
+            # an invalid payload takes precedence over a verified older hash
+            (
+                ((False, 0), (True, 1)),
+                {0: "test"},
+                VerificationStatus.INVALID_PAYLOAD,
+                0,
+            ),
+            # the nonce was reused, but no hash is verified
+            (
+                ((False, 0), (False, -1), (False, 0)),
+                {0: "GS026", 2: "GS026"},
+                VerificationStatus.BAD_SAFE_NONCE,
+                None,
+            ),
+        ),
+    )
+    def test_check_tx_history_concurrently(
+        self,
+        verifications: Tuple[Tuple[bool, int], ...],
+        revert_reasons: Dict[int, str],
+        expected_status: VerificationStatus,
+        expected_index: Optional[int],
+    ) -> None:
+        """Test that the history is verified concurrently, preserving the precedence of the hashes."""
+        hashes_history = "".join(
+            "0x" + str(index) * 64 for index in range(len(verifications))
+        )
+        self._fast_forward(hashes_history)
+        behaviour = cast(
+            CheckTransactionHistoryBehaviour, self.behaviour.current_behaviour
+        )
+        # the hashes are checked starting from the most recent one
+        history = behaviour.history[::-1]
+        events: List[Tuple[str, str]] = []
+
+        def _get_safe_nonce() -> Generator[None, None, int]:
+            """Get a safe nonce which is not the one of the transaction."""
+            yield
+            return 0
+
+        def _verify_tx(tx_hash: str) -> Generator[None, None, MagicMock]:
+            """Verify a transaction."""
+            events.append(("request", tx_hash))
+            yield
+            events.append(("response", tx_hash))
+            verified, status = verifications[history.index(tx_hash)]
+            return MagicMock(
+                performative=ContractApiMessage.Performative.STATE,
+                state=MagicMock(
+                    body={
+                        "verified": verified,
+                        "status": status,
+                        "transaction": {"hash": tx_hash},
+                    }
+                ),
+            )
+
+        def _get_revert_reason(tx: Dict) -> Generator[None, None, str]:
+            """Get the revert reason of a transaction."""
+            events.append(("revert_reason", tx["hash"]))
+            yield
+            return revert_reasons[history.index(tx["hash"])]
+
+        with mock.patch.object(
+            behaviour, "_get_safe_nonce", side_effect=_get_safe_nonce
+        ), mock.patch.object(
+            behaviour, "_verify_tx", side_effect=_verify_tx
+        ), mock.patch.object(
+            behaviour, "_get_revert_reason", side_effect=_get_revert_reason
+        ):
+            check = behaviour._check_tx_history()
+            with pytest.raises(StopIteration) as result:
+                while True:
+                    next(check)
+
+        expected_hash = None if expected_index is None else history[expected_index]
+        assert result.value.value == (expected_status, expected_hash)
+        # all the verifications are requested before any response is processed
+        assert events[: len(history)] == [("request", tx_hash) for tx_hash in history]
+        # only the revert reasons which may decide the result are requested
+        assert [tx_hash for event, tx_hash in events if event == "revert_reason"] == [
+            history[index] for index in sorted(revert_reasons)
+        ]
+
+    @pytest.mark.parametrize(
+        "verifications, expected_status, expected_index",
+        (
+            # the most recent hash is verified, the rest of the responses are not awaited
+            (((True, 1), None, None), VerificationStatus.VERIFIED, 0),
+            # the most recent hash has no receipt, and the next one decides the result
+            (((False, -1), (False, 0), None), VerificationStatus.INVALID_PAYLOAD, 1),
+        ),
+    )
+    def test_check_tx_history_exits_early(
+        self,
+        verifications: Tuple[Optional[Tuple[bool, int]], ...],
+        expected_status: VerificationStatus,
+        expected_index: int,
+    ) -> None:
+        """Test that the history check returns once the most recent hashes decide its result."""
+        hashes_history = "".join(
+            "0x" + str(index) * 64 for index in range(len(verifications))
+        )
+        self._fast_forward(hashes_history)
+        behaviour = cast(
+            CheckTransactionHistoryBehaviour, self.behaviour.current_behaviour
+        )
+        history = behaviour.history[::-1]
+        closed: List[str] = []
+
+        def _get_safe_nonce() -> Generator[None, None, int]:
+            """Get a safe nonce which is not the one of the transaction."""
+            yield
+            return 0
+
+        def _verify_tx(tx_hash: str) -> Generator[None, None, MagicMock]:
+            """Verify a transaction, never getting a response for the ones without a verification."""
+            verification = verifications[history.index(tx_hash)]
+            try:
+                while verification is None:
+                    yield
+            except GeneratorExit:
+                closed.append(tx_hash)
+                raise
+            yield
+            verified, status = verification
+            return MagicMock(
+                performative=ContractApiMessage.Performative.STATE,
+                state=MagicMock(
+                    body={
+                        "verified": verified,
+                        "status": status,
+                        "transaction": {"hash": tx_hash},
+                    }
+                ),
+            )
+
+        def _get_revert_reason(_tx: Dict) -> Generator[None, None, str]:
+            """Get the revert reason of a transaction."""
+            yield
+            return "test"
+
+        with mock.patch.object(
+            behaviour, "_get_safe_nonce", side_effect=_get_safe_nonce
+        ), mock.patch.object(
+            behaviour, "_verify_tx", side_effect=_verify_tx
+        ), mock.patch.object(
+            behaviour, "_get_revert_reason", side_effect=_get_revert_reason
+        ):
+            check = behaviour._check_tx_history()
+            with pytest.raises(StopIteration) as result:
+                for _ in range(10):
+                    next(check)
+
+        assert result.value.value == (expected_status, history[expected_index])
+        # the checks of the hashes which do not affect the result are abandoned
+        assert closed == [
+            tx_hash
+            for tx_hash, verification in zip(history, verifications)
+            if verification is None
+        ]
+
 
 class TestCheckLateTxHashesBehaviour(TransactionSettlementFSMBehaviourBaseCase):
     """Test CheckLateTxHashesBehaviour."""
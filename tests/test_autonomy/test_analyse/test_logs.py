@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2023 Valory AG
+#   Copyright 2023-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -22,7 +22,9 @@
 import tempfile
 from pathlib import Path
 
-from autonomy.analyse.logs.collection import LogCollection
+from autonomy.analyse.logs.base import LOGS_DB
+from autonomy.analyse.logs.collection import FromDirectory, LogCollection
+from autonomy.analyse.logs.db import AgentLogsDB, INDEXED_COLUMNS
 
 
 LOGS = """[2023-09-26 06:27:56,015] [INFO] [agent] Entered in the 'check_transaction_history_behaviour' behaviour
@@ -70,3 +72,34 @@ def test_multiline_parse() -> None:
 
         for line in LOGS_CLEAN.split("\n"):
             assert line in parsed
+
+
+def test_create_agent_dbs() -> None:
+    """Test creating the tables of several agents from parallel parsed logs."""
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        agents = ("aea_0", "aea_1")
+        for agent in agents:
+            Path(temp_dir, f"{agent}.txt").write_text(LOGS)
+
+        collection = FromDirectory(directory=Path(temp_dir))
+        dbs = {
+            agent: AgentLogsDB(agent=agent, file=Path(temp_dir, LOGS_DB))
+            for agent in agents
+        }
+        collection.create_agent_dbs(dbs=dbs, max_workers=2)
+
+        for agent, db in dbs.items():
+            assert db.exists()
+            rows = db.select(behaviour_name="check_transaction_history_behaviour")
+            assert len(rows) == 3
+            assert rows[1][1] == "ERROR"
+            indexes = {
+                name
+                for (name,) in db.cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type='index' AND tbl_name=?;",
+                    (agent,),
+                )
+            }
+            assert indexes == {f"{agent}_{column}" for column in INDEXED_COLUMNS}
+            db.close()
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2022 Valory AG
+#   Copyright 2022-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -19,13 +19,20 @@
 
 """Test `benchmarks` command"""
 
+import csv
 import json
 import os
 from contextlib import suppress
 from pathlib import Path
 from typing import Dict, List, Tuple
 
-from autonomy.analyse.benchmark.aggregate import BlockTypes
+from autonomy.analyse.benchmark.aggregate import (
+    BlockTypes,
+    OutputFormats,
+    SUMMARY_FIELDS,
+    percentile,
+    summarize,
+)
 from autonomy.deploy.constants import BENCHMARKS_DIR
 
 from tests.test_autonomy.test_cli.base import BaseCliTest
@@ -140,3 +147,142 @@ class TestBenchmarks(BaseCliTest):
         """Test with only total blocks."""
 
         self._run_test(BlockTypes.TOTAL)
+
+    def test_csv_output(
+        self,
+    ) -> None:
+        """Test the CSV summary output."""
+
+        output_file = self.t / "benchmarks.csv"
+        result = self.run_cli(
+            (
+                str(self.benchmarks_dir),
+                "--output",
+                str(output_file),
+                f"--format={OutputFormats.CSV}",
+            ),
+        )
+
+        assert result.exit_code == 0, result.output
+        with output_file.open(encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+
+        assert len(rows) == NUMBER_OF_BEHAVIOURS * len(BlockTypes.types)
+        assert tuple(rows[0]) == SUMMARY_FIELDS
+        for row in rows:
+            assert int(row["count"]) == NUMBER_OF_AGENTS * NUMBER_OF_PERIODS
+            assert float(row["min"]) == float(row["max"])
+            assert row["executions"] == ""
+
+    def test_other_json_files_are_skipped(
+        self,
+    ) -> None:
+        """Test that the json files which are not named after a period are skipped."""
+
+        for agent_dir in self.benchmarks_dir.iterdir():
+            (agent_dir / "summary.json").write_text(json.dumps({"not": "a period"}))
+
+        result = self.run_cli(
+            (str(self.benchmarks_dir), f"--format={OutputFormats.JSON}"),
+        )
+
+        assert result.exit_code == 0, result.output
+        data = json.loads((self.t / "benchmarks.json").read_text())
+        assert data["count"] == [NUMBER_OF_AGENTS * NUMBER_OF_PERIODS] * len(
+            data["count"]
+        )
+
+    def test_json_output(
+        self,
+    ) -> None:
+        """Test the columnar JSON summary output, with a single block type and period."""
+
+        result = self.run_cli(
+            (
+                str(self.benchmarks_dir),
+                f"--block-type={BlockTypes.LOCAL}",
+                "--period=1",
+                f"--format={OutputFormats.JSON}",
+            ),
+        )
+
+        assert result.exit_code == 0, result.output
+        data = json.loads((self.t / "benchmarks.json").read_text())
+
+        assert tuple(data) == SUMMARY_FIELDS
+        assert data["block"] == [BlockTypes.LOCAL] * NUMBER_OF_BEHAVIOURS
+        assert data["count"] == [NUMBER_OF_AGENTS] * NUMBER_OF_BEHAVIOURS
+
+    def test_histograms(
+        self,
+    ) -> None:
+        """Test that execution histograms are merged across agents and periods."""
+
+        for agent_dir in self.benchmarks_dir.iterdir():
+            for period_file in agent_dir.iterdir():
+                period_data = json.loads(period_file.read_text())
+                for behaviour in period_data:
+                    behaviour["histograms"] = {
+                        BlockTypes.LOCAL: {"buckets": [[1000, 3], [2000, 1]]}
+                    }
+                period_file.write_text(json.dumps(period_data))
+
+        result = self.run_cli(
+            (str(self.benchmarks_dir), f"--format={OutputFormats.JSON}"),
+        )
+
+        assert result.exit_code == 0, result.output
+        data = json.loads((self.t / "benchmarks.json").read_text())
+        for block, executions, p50, p99 in zip(
+            data["block"],
+            data["executions"],
+            data["execution_p50"],
+            data["execution_p99"],
+        ):
+            if block != BlockTypes.LOCAL:
+                assert executions is None
+                continue
+            assert executions == 4 * NUMBER_OF_AGENTS * NUMBER_OF_PERIODS
+            assert p50 == 1e-06
+            assert p99 == 2e-06
+
+    def test_accumulated(
+        self,
+    ) -> None:
+        """Test that the accumulated times are summed across agents and periods."""
+
+        for agent_dir in self.benchmarks_dir.iterdir():
+            for period_file in agent_dir.iterdir():
+                period_data = json.loads(period_file.read_text())
+                for behaviour in period_data:
+                    behaviour["accumulated"] = {BlockTypes.LOCAL: 0.5}
+                period_file.write_text(json.dumps(period_data))
+
+        result = self.run_cli(
+            (str(self.benchmarks_dir), f"--format={OutputFormats.JSON}"),
+        )
+
+        assert result.exit_code == 0, result.output
+        data = json.loads((self.t / "benchmarks.json").read_text())
+        for block, accumulated in zip(data["block"], data["accumulated"]):
+            if block != BlockTypes.LOCAL:
+                assert accumulated is None
+                continue
+            assert accumulated == 0.5 * NUMBER_OF_AGENTS * NUMBER_OF_PERIODS
+
+
+def test_summarize() -> None:
+    """Test summary statistics."""
+
+    values = [float(value) for value in range(1, 101)]
+    summary = summarize(values)
+
+    assert summary["count"] == 100
+    assert summary["mean"] == 50.5
+    assert summary["min"] == 1.0
+    assert summary["max"] == 100.0
+    assert summary["p50"] == 50.0
+    assert summary["p95"] == 95.0
+    assert summary["p99"] == 99.0
+    assert summarize([1.0])["stdev"] == 0.0
+    assert percentile([1.0, 2.0], 0) == 1.0
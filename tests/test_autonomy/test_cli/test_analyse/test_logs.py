@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2023 Valory AG
+#   Copyright 2023-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -54,9 +54,14 @@ class BaseLogAnalyserTest(BaseCliTest):
     def teardown_class(cls) -> None:
         """Teardown class."""
 
-        with contextlib.suppress(PermissionError):
-            if LOGS_DB_FILE.exists():
-                os.remove(LOGS_DB_FILE)
+        for file in (
+            LOGS_DB_FILE,
+            LOGS_DB_FILE.with_name(f"{LOGS_DB}-wal"),
+            LOGS_DB_FILE.with_name(f"{LOGS_DB}-shm"),
+        ):
+            with contextlib.suppress(PermissionError):
+                if file.exists():
+                    os.remove(file)
 
 
 class TestAnalyseLogs(BaseLogAnalyserTest):
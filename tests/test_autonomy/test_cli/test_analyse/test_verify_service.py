@@ -273,6 +273,14 @@ def get_dummy_skill_config() -> Dict:
                     "slash_threshold_amount": 10_000_000_000_000_000,
                     "light_slash_unit_amount": 5_000_000_000_000_000,
                     "serious_slash_unit_amount": 8_000_000_000_000_000,
+                    "use_merkle_app_hash": False,
+                    "tx_verification_workers": 0,
+                    "binary_payload_encoding": False,
+                    "pipelined_a2a_transactions": False,
+                    "multicall2_addresses": {},
+                    "deduplicate_ipfs_uploads": False,
+                    "contract_state_cache_ttl": None,
+                    "blockchain_retention": None,
                 },
                 "class_name": "Params",
             },
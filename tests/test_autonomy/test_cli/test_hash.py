@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # ------------------------------------------------------------------------------
 #
-#   Copyright 2022 Valory AG
+#   Copyright 2022-2026 Valory AG
 #
 #   Licensed under the Apache License, Version 2.0 (the "License");
 #   you may not use this file except in compliance with the License.
@@ -21,9 +21,11 @@
 
 
 import json
+import os
 import shutil
 from pathlib import Path
 from typing import Dict, Tuple
+from unittest import mock
 
 import _strptime  # noqa  # pylint: disable=unsed-import
 
@@ -50,6 +52,15 @@ class TestHashAll(BaseCliTest):
 
         self.packages_dir = self.t / "packages"
         shutil.copytree(ROOT_DIR / "packages", self.packages_dir)
+        self.environ = mock.patch.dict(
+            os.environ, {"XDG_CACHE_HOME": str(self.t / "cache")}
+        )
+        self.environ.start()
+
+    def teardown(self) -> None:
+        """Teardown test."""
+        self.environ.stop()
+        super().teardown()
 
     def load_hashes(
         self,
@@ -90,6 +101,39 @@ class TestHashAll(BaseCliTest):
         assert result.exit_code == 0, result.output
         assert "Verifying packages.json" in result.output, result.output
 
+    def test_unchanged_packages_skipped(
+        self,
+    ) -> None:
+        """Check if `hash-all` skips the packages which have not changed since they were last hashed."""
+
+        result = self.run_cli(("--packages-dir", str(self.packages_dir)))
+        assert result.exit_code == 0, result.output
+        assert "Skipping unchanged package" not in result.output, result.output
+
+        result = self.run_cli(
+            ("--packages-dir", str(self.packages_dir), "--max-workers", "1")
+        )
+        assert result.exit_code == 0, result.output
+        assert "Processing package" not in result.output, result.output
+
+        readme = self.packages_dir / "valory" / "protocols" / "abci" / "README.md"
+        readme.write_text(readme.read_text() + "\n")
+        result = self.run_cli(("--packages-dir", str(self.packages_dir)))
+        assert result.exit_code == 0, result.output
+        assert "Processing package abci of type protocol" in result.output
+        assert "Processing package abstract_round_abci of type skill" in result.output
+        assert (
+            "Skipping unchanged package gnosis_safe of type contract" in result.output
+        )
+
+        # the hashes match the ones computed without any cache
+        cached = self.load_hashes()
+        with mock.patch.dict(os.environ, {"XDG_CACHE_HOME": str(self.t / "empty")}):
+            result = self.run_cli(("--packages-dir", str(self.packages_dir)))
+        assert result.exit_code == 0, result.output
+        assert "Skipping unchanged package" not in result.output, result.output
+        assert self.load_hashes() == cached
+
 
 class TestHashOne(BaseCliTest):
     """Test `hash one` command."""
@@ -19,12 +19,22 @@
 
 """Test for packages command"""
 
+import json
+import os
+import shutil
 from collections import namedtuple
-from typing import Any
+from pathlib import Path
+from typing import Any, Dict
 from unittest import mock
 
+from aea.configurations.data_types import PackageType
+from aea.helpers.ipfs.base import IPFSHashOnly
+from aea.package_manager.base import BasePackageManager
+
+from autonomy.cli import cli
 from autonomy.cli.packages import get_package_manager
 
+from tests.conftest import ROOT_DIR
 from tests.test_autonomy.test_cli.base import BaseCliTest
 
 
@@ -77,3 +87,92 @@ class TestPackages(BaseCliTest):
             result = self.run_cli(("--check",))
             assert result.exit_code == 1
             assert "Verification failed." in result.stdout
+
+
+class TestLockHashCache(BaseCliTest):
+    """Test that `packages lock` reuses the hashes of the unchanged packages."""
+
+    protocol = Path("valory", "protocols", "ipfs")
+    connection = Path("valory", "connections", "ipfs")
+
+    def setup(self) -> None:
+        """Setup test."""
+        super().setup()
+        self.environ = mock.patch.dict(
+            os.environ, {"XDG_CACHE_HOME": str(self.t / "cache")}
+        )
+        self.environ.start()
+        self.packages_dir = self.make_packages_dir("packages")
+
+    def teardown(self) -> None:
+        """Teardown test."""
+        self.environ.stop()
+        super().teardown()
+
+    def make_packages_dir(self, name: str) -> Path:
+        """Make a packages directory with a protocol and a connection which depends on it."""
+        packages_dir = self.t / name
+        for package in (self.protocol, self.connection):
+            shutil.copytree(ROOT_DIR / "packages" / package, packages_dir / package)
+        dev_packages = {
+            key: package_hash
+            for key, package_hash in json.loads(
+                (ROOT_DIR / "packages" / "packages.json").read_text()
+            )["dev"].items()
+            if key in ("protocol/valory/ipfs/0.1.0", "connection/valory/ipfs/0.1.0")
+        }
+        (packages_dir / "packages.json").write_text(
+            json.dumps({"dev": dev_packages, "third_party": {}})
+        )
+        return packages_dir
+
+    def lock(self, packages_dir: Path) -> Dict:
+        """Lock the packages and load the updated hashes."""
+        result = self.cli_runner.invoke(
+            cli=cli,
+            args=("--registry-path", str(packages_dir), "packages", "lock"),
+        )
+        assert result.exit_code == 0, result.output
+        return json.loads((packages_dir / "packages.json").read_text())
+
+    def test_dependency_hash_changed(self) -> None:
+        """Test that the cached hash of a package is not reused when only the hash of its dependency changes."""
+        self.lock(self.packages_dir)
+        cache_files = list((self.t / "cache").rglob("lock-*.json"))
+        assert len(cache_files) == 1
+        # nothing is written to the packages directory
+        assert sorted(path.name for path in self.packages_dir.iterdir()) == [
+            "packages.json",
+            "valory",
+        ]
+
+        # the hash of the protocol changes, the files of the connection do not
+        for packages_dir in (self.packages_dir, self.make_packages_dir("uncached")):
+            readme = packages_dir / self.protocol / "README.md"
+            readme.write_text(readme.read_text() + "\n")
+
+        with mock.patch.object(
+            BasePackageManager,
+            "calculate_hash_from_package_id",
+            autospec=True,
+            side_effect=BasePackageManager.calculate_hash_from_package_id,
+        ) as hash_mock:
+            cached = self.lock(self.packages_dir)
+        hashed = [
+            call.kwargs["package_id"].package_type for call in hash_mock.mock_calls
+        ]
+        assert hashed == [PackageType.PROTOCOL, PackageType.CONNECTION]
+
+        # the hashes match the ones of a lock without any cache
+        uncached = self.lock(self.t / "uncached")
+        assert cached == uncached
+        assert cached != json.loads(
+            (ROOT_DIR / "packages" / "packages.json").read_text()
+        )
+
+        # once nothing changes, neither the packages nor their files are hashed again
+        with mock.patch.object(
+            IPFSHashOnly, "get", wraps=IPFSHashOnly.get
+        ) as hash_mock:
+            assert self.lock(self.packages_dir) == cached
+        hash_mock.assert_not_called()